@@ -0,0 +1,95 @@
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.utils.config import Config
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the executor already holds as many jobs as it accepts."""
+
+
+class JobExecutor:
+    """
+    Bounded worker pool for the blocking video pipeline.
+    Runs at most `workers` jobs at once and keeps at most `queue_limit`
+    more waiting; anything beyond that is rejected with QueueFullError.
+    """
+
+    def __init__(self, kind="thread", workers=2, queue_limit=8):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.workers = max(1, int(workers))
+        self.queue_limit = max(0, int(queue_limit))
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                # spawn keeps torch / whisper state out of forked children
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="highlight-job",
+                )
+        return self._pool
+
+    @property
+    def capacity(self):
+        return self.workers + self.queue_limit
+
+    @property
+    def pending(self):
+        """Jobs currently running or waiting for a worker."""
+        with self._lock:
+            return self._pending
+
+    def is_full(self):
+        return self.pending >= self.capacity
+
+    def stats(self):
+        pending = self.pending
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "running": min(pending, self.workers),
+            "queued": max(0, pending - self.workers),
+            "queue_limit": self.queue_limit,
+        }
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise QueueFullError(
+                    f"Job queue is full ({self._pending}/{self.capacity}), retry later"
+                )
+            self._pending += 1
+        try:
+            future = self._get_pool().submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
+
+
+EXECUTOR = JobExecutor(
+    kind=Config.JOB_EXECUTOR,
+    workers=Config.JOB_WORKERS,
+    queue_limit=Config.JOB_QUEUE_LIMIT,
+)
@@ -1,16 +1,30 @@
 import os
 import uuid
 import json
-import asyncio
+import numpy as np
 import moviepy.editor as mp
 from src.utils.config import Config
-from src.audio.transcriber import extract_audio, transcribe_audio
-from src.text.chunker import merge_segments
+from src.utils.model_cache import ModelCache
+from api.executor import EXECUTOR, QueueFullError
+from src.audio.transcriber import load_audio, transcribe_audio
+from src.text.chunker import chunk_transcript, chunk_signature
 from src.text.embedding_builder import build_embeddings
-from src.text.highlight_selector import rerank_with_llm
+from src.text.highlight_selector import rerank_segments
 from src.video.cutter import create_highlight_reel, limit_highlight_duration
 from src.text.highlight_selector import generate_candidate_highlights
 from src.video.cutter import pad_and_merge_segments
+from src.utils.workspace import JobWorkspace
+from src.utils.helpers import file_sha256
+from src.utils.artifact_cache import (
+    ArtifactCache, transcript_key, chunks_key, embeddings_key, excitement_key, visual_key,
+)
+from src.video.probe import probe_video
+from src.streaming import StreamingPipeline
+from src.utils.video_store import VideoStore
+from src.text.library_index import get_library
+from src.text.highlight_selector import query_similar_chunks, apply_excitement_boost, apply_visual_boost
+from src.audio.excitement import excitement_curve
+from src.video.visual_signal import visual_signal, visual_curve, shot_cuts
 # ------------------------------------------------------------------
 # GLOBALS
 # ------------------------------------------------------------------
@@ -18,6 +32,8 @@ Config.ensure_dirs()
 JOBS = {}
 JOB_DIR = os.path.join(Config.PROCESSED_DIR, "jobs")
 os.makedirs(JOB_DIR, exist_ok=True)
+ARTIFACT_CACHE = ArtifactCache()
+VIDEO_STORE = VideoStore()
 
 # ------------------------------------------------------------------
 # HELPERS
@@ -41,61 +57,250 @@ def load_job_state(job_id):
 # ------------------------------------------------------------------
 # JOB CREATION
 # ------------------------------------------------------------------
-def create_job(filename: str, file_bytes: bytes, target_duration: int = 60):
+def new_job_workspace():
+    """Allocate a job id and its workspace so uploads can stream straight into it."""
+    JobWorkspace.purge_expired()
     job_id = str(uuid.uuid4())
+    return job_id, JobWorkspace(job_id).create()
+
+
+def create_job(job_id: str, video_path: str, target_duration: int = 60, video_hash: str = None,
+               render_backend: str = None, rerank_backend: str = None):
+    """
+    Register a job for an already-saved video and hand it to the bounded executor.
+    Only the file path (never the video bytes) travels to the worker.
+    Raises QueueFullError when the executor cannot take more work.
+    """
+    return submit_job(job_id, process_video_job, video_path, target_duration, video_hash, render_backend,
+                      rerank_backend)
+
+
+def submit_job(job_id, fn, *args):
+    """Save the queued state, then hand fn(job_id, *args) to the executor (QueueFullError propagates)."""
     JOBS[job_id] = {
         "state": "queued",
         "progress": 0,
-        "message": "Job created",
+        "message": "Waiting for a free worker",
         "result_path": None,
         "error": None,
     }
     save_job_state(job_id, JOBS[job_id])
-
-    loop = asyncio.get_event_loop()
-    loop.create_task(process_video_job(job_id, filename, file_bytes, target_duration))
+    try:
+        future = EXECUTOR.submit(fn, job_id, *args)
+    except QueueFullError:
+        JOBS.pop(job_id, None)
+        os.remove(os.path.join(JOB_DIR, f"{job_id}.json"))
+        raise
+    future.add_done_callback(lambda f: _on_job_finished(job_id, f))
     return job_id
 
 
+def _on_job_finished(job_id, future):
+    """Mark the job failed if the worker itself died (e.g. broken process pool)."""
+    if future.cancelled():
+        error = "Job cancelled"
+    else:
+        exc = future.exception()
+        if exc is None:
+            return
+        error = str(exc) or exc.__class__.__name__
+    job = load_job_state(job_id) or {}
+    job.update({"state": "failed", "message": error, "error": error})
+    JOBS[job_id] = job
+    save_job_state(job_id, job)
+
+
 # ------------------------------------------------------------------
-# MAIN ASYNC PIPELINE
+# CACHED TRANSCRIPT -> CHUNKS -> EMBEDDINGS
 # ------------------------------------------------------------------
-async def process_video_job(job_id: str, filename: str, file_bytes: bytes, target_duration: int):
-    job = JOBS[job_id]
-    try:
-        # Save uploaded file
-        job.update({"state": "running", "progress": 5, "message": "Saving uploaded video"})
+def prepare_index(job_id, job, workspace, video_path, video_hash=None):
+    """
+    Produce chunks.json, faiss_index.bin and embeddings.npy in the workspace.
+    Each stage is looked up in the artifact cache first (keyed by the video's
+    content hash + model names + chunking params), so repeat uploads skip
+    audio extraction, Whisper and the embedder entirely.
+    """
+    video_hash = video_hash or file_sha256(video_path)
+    job["video_hash"] = video_hash
+    params = (Config.WHISPER_MODEL, Config.CHUNK_MAX_SECONDS, Config.CHUNK_MERGE_GAP)
+    strategy = chunk_signature()
+    t_key = transcript_key(video_hash, Config.WHISPER_MODEL)
+    c_key = chunks_key(video_hash, *params, strategy=strategy)
+    embed_backend = ModelCache.embed_backend(Config.EMBED_MODEL)
+    e_key = embeddings_key(video_hash, *params, Config.EMBED_MODEL, embed_backend, strategy=strategy)
+
+    if (ARTIFACT_CACHE.fetch(c_key, JobWorkspace.CHUNKS, workspace.chunk_path)
+            and ARTIFACT_CACHE.fetch(e_key, JobWorkspace.INDEX, workspace.index_path)
+            and ARTIFACT_CACHE.fetch(e_key, JobWorkspace.EMBEDDINGS, workspace.embeddings_path)):
+        job.update({"progress": 55, "message": "Reusing cached transcript and embeddings"})
         save_job_state(job_id, job)
-        os.makedirs(Config.RAW_DIR, exist_ok=True)
-        video_path = os.path.join(Config.RAW_DIR, filename)
-        with open(video_path, "wb") as f:
-            f.write(file_bytes)
+        return workspace.index_path, workspace.chunk_path
+
+    segments = ARTIFACT_CACHE.load_json(t_key, JobWorkspace.TRANSCRIPT)
+    # The streaming chunker is time-based; other strategies need the whole transcript
+    if segments is None and Config.STREAM_PIPELINE and strategy == "time":
+        segments = stream_index(job_id, job, workspace, video_path)
+        ARTIFACT_CACHE.put_json(t_key, JobWorkspace.TRANSCRIPT, segments)
+        ARTIFACT_CACHE.put_file(c_key, JobWorkspace.CHUNKS, workspace.chunk_path)
+        ARTIFACT_CACHE.put_file(e_key, JobWorkspace.INDEX, workspace.index_path)
+        ARTIFACT_CACHE.put_file(e_key, JobWorkspace.EMBEDDINGS, workspace.embeddings_path)
+        return workspace.index_path, workspace.chunk_path
 
-        job.update({"progress": 15, "message": "Extracting audio"})
+    if segments is None:
+        job.update({"progress": 15, "message": "Decoding audio"})
         save_job_state(job_id, job)
-        audio_path = extract_audio(video_path)
+        audio = load_audio(video_path)
 
         job.update({"progress": 25, "message": "Transcribing"})
         save_job_state(job_id, job)
-        segments = transcribe_audio(audio_path, model_name="tiny")
+        segments = transcribe_audio(audio, model_name=Config.WHISPER_MODEL)
+        prepare_excitement(job, workspace, video_path, audio)
+        del audio
+        ARTIFACT_CACHE.put_json(t_key, JobWorkspace.TRANSCRIPT, segments)
+    else:
+        job.update({"progress": 25, "message": "Reusing cached transcript"})
+        save_job_state(job_id, job)
+
+    job.update({"progress": 40, "message": "Merging transcript chunks"})
+    save_job_state(job_id, job)
+    chunks, vectors = chunk_transcript(segments)
+    with open(workspace.chunk_path, "w", encoding="utf-8") as f:
+        json.dump(chunks, f, indent=2)
+    ARTIFACT_CACHE.put_file(c_key, JobWorkspace.CHUNKS, workspace.chunk_path)
+
+    job.update({"progress": 55, "message": "Building embeddings"})
+    save_job_state(job_id, job)
+    build_embeddings(workspace.chunk_path, workspace.index_path, embeddings_path=workspace.embeddings_path,
+                     model_name=Config.EMBED_MODEL, embeddings=vectors)
+    ARTIFACT_CACHE.put_file(e_key, JobWorkspace.INDEX, workspace.index_path)
+    ARTIFACT_CACHE.put_file(e_key, JobWorkspace.EMBEDDINGS, workspace.embeddings_path)
+    return workspace.index_path, workspace.chunk_path
+
+
+def stream_index(job_id, job, workspace, video_path):
+    """
+    Streaming variant of the transcript -> chunks -> embeddings stages.
+    Transcription, chunking and indexing overlap, and the job status carries
+    provisional highlights (plus how far transcription got) while it runs.
+    Writes the same workspace files as the batch path and returns the segments.
+    """
+    job.update({"progress": 15, "message": "Streaming transcription"})
+    save_job_state(job_id, job)
+    try:
+        duration = probe_video(video_path)["duration"]
+    except Exception:
+        duration = None
 
-        job.update({"progress": 40, "message": "Merging transcript chunks"})
+    pipeline = StreamingPipeline(video_path, Config.WHISPER_MODEL, Config.EMBED_MODEL)
+    for snap in pipeline.run():
+        done = min(1.0, snap["transcribed_until"] / duration) if duration else 0.0
+        job.update({
+            "progress": 15 + int(40 * done),
+            "message": f"Transcribed {snap['transcribed_until']:.0f}s, {snap['chunks']} chunks indexed",
+            "provisional_highlights": snap["candidates"],
+        })
         save_job_state(job_id, job)
-        chunks = merge_segments(segments)
-        chunk_path = os.path.join(Config.PROCESSED_DIR, f"{job_id}_chunks.json")
-        with open(chunk_path, "w", encoding="utf-8") as f:
-            json.dump(chunks, f, indent=2)
 
-        job.update({"progress": 55, "message": "Building embeddings"})
+    pipeline.save(workspace.index_path, workspace.chunk_path, workspace.embeddings_path)
+    return pipeline.segments
+
+
+def prepare_signal(workspace, name, key, compute):
+    """
+    Per-second signal array `name` in the workspace: from the workspace, the
+    artifact cache, or compute() (then cached). None if compute() fails,
+    e.g. when the video has no audio / video stream.
+    """
+    path = workspace.path(name)
+    if not os.path.exists(path) and not ARTIFACT_CACHE.fetch(key, name, path):
+        try:
+            signal = compute()
+        except RuntimeError as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            return None
+        np.save(path, signal)
+        ARTIFACT_CACHE.put_file(key, name, path)
+    return np.load(path)
+
+
+def prepare_excitement(job, workspace, video_path, audio=None):
+    """Per-second audio excitement curve (reuses already decoded audio when given)."""
+    if not Config.EXCITEMENT_ENABLED:
+        return None
+    key = excitement_key(job["video_hash"], Config.EXCITEMENT_WINDOW_SECONDS)
+    return prepare_signal(workspace, JobWorkspace.EXCITEMENT, key,
+                          lambda: excitement_curve(load_audio(video_path) if audio is None else audio))
+
+
+def prepare_visual(job, workspace, video_path):
+    """Per-second motion / shot-cut signal from low-resolution frames."""
+    if not Config.VISUAL_ENABLED:
+        return None
+    key = visual_key(job["video_hash"], Config.VISUAL_FPS, Config.VISUAL_WIDTH, Config.VISUAL_HEIGHT)
+    return prepare_signal(workspace, JobWorkspace.VISUAL, key, lambda: visual_signal(video_path))
+
+
+def store_video(job, workspace, video_path, video_duration):
+    """Keep the video's index in the VideoStore so later prompts skip the job entirely."""
+    video_id = job.get("video_hash")
+    try:
+        VIDEO_STORE.save(video_id, workspace, video_path, video_duration)
+    except OSError as e:
+        print(f"⚠️ Could not store index for video {video_id[:8]}: {e}")
+        return None
+    job["video_id"] = video_id
+    if Config.LIBRARY_ENABLED:
+        try:
+            with open(workspace.chunk_path, "r", encoding="utf-8") as f:
+                chunks = json.load(f)
+            get_library(VIDEO_STORE).add_video(video_id, chunks, np.load(workspace.embeddings_path))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not add video {video_id[:8]} to the library: {e}")
+    return video_id
+
+
+def finalize_highlights(ranked, video_duration, target_duration, visual=None):
+    """Sort, pad + merge (snapping edges to shot cuts when the visual signal is known) and trim."""
+    ranked = sorted(ranked, key=lambda x: x["start"])
+    ranked = pad_and_merge_segments(
+        ranked,
+        pad=1.5,          # seconds of padding before & after each clip
+        merge_gap=2.0,    # merge clips if they are within 2 seconds
+        video_duration=video_duration,
+        cuts=shot_cuts(visual)
+    )
+    return limit_highlight_duration(ranked, max_total_seconds=target_duration)
+
+
+# ------------------------------------------------------------------
+# MAIN PIPELINE (runs inside an executor worker)
+# ------------------------------------------------------------------
+def process_video_job(job_id: str, video_path: str, target_duration: int, video_hash: str = None,
+                      render_backend: str = None, rerank_backend: str = None):
+    # Process workers do not share JOBS with the API process
+    job = JOBS.setdefault(job_id, load_job_state(job_id) or {})
+    workspace = JobWorkspace(job_id).create()
+    try:
+        job.update({"state": "running", "progress": 5, "message": "Preparing uploaded video"})
         save_job_state(job_id, job)
-        build_embeddings(chunk_path)
+
+        index_path, chunk_path = prepare_index(job_id, job, workspace, video_path, video_hash)
+        job.update({"progress": 62, "message": "Analysing audio and visual signals"})
+        save_job_state(job_id, job)
+        excitement = prepare_excitement(job, workspace, video_path)
+        visual = prepare_visual(job, workspace, video_path)
+        video_clip = mp.VideoFileClip(video_path)
+        video_duration = video_clip.duration
+        video_clip.close()
+        store_video(job, workspace, video_path, video_duration)
 
         job.update({"progress": 70, "message": "Selecting highlights"})
         save_job_state(job_id, job)
 
-        index_path = os.path.join(Config.PROCESSED_DIR, "faiss_index.bin")
-        candidates = generate_candidate_highlights(index_path, chunk_path, top_k=30)
-        ranked = rerank_with_llm(candidates[:12], "A Cricket Video Editor", target_duration)
+        candidates = generate_candidate_highlights(index_path, chunk_path, embed_model=Config.EMBED_MODEL, top_k=30,
+                                                   excitement=excitement, visual=visual_curve(visual))
+        ranked = rerank_segments(candidates[:12], "A Cricket Video Editor", target_duration,
+                                 backend=rerank_backend, job_id=job_id)
         # results = query_similar_chunks(
         #     "video summary highlights",
         #     top_k=10,
@@ -109,29 +314,20 @@ async def process_video_job(job_id: str, filename: str, file_bytes: bytes, targe
         
         job.update({"progress": 75, "message": "Smoothing highlight segments"})
         save_job_state(job_id, job)
-        video_clip = mp.VideoFileClip(video_path)
-        video_duration = video_clip.duration
-        video_clip.close()
-        
-        ranked = sorted(ranked, key=lambda x: x["start"])
-        ranked = pad_and_merge_segments(
-            ranked,
-            pad=1.5,          # seconds of padding before & after each clip
-            merge_gap=2.0,    # merge clips if they are within 2 seconds
-            video_duration=video_duration
-        )
-        ranked = limit_highlight_duration(ranked, max_total_seconds=target_duration)
+        ranked = finalize_highlights(ranked, video_duration, target_duration, visual)
         if not ranked:
             raise ValueError("No highlight segments found after retrieval.")
         # Save ranked JSON for debugging
-        ranked_path = os.path.join(Config.PROCESSED_DIR, f"{job_id}_ranked.json")
+        ranked_path = workspace.ranked_path
         with open(ranked_path, "w", encoding="utf-8") as f:
             json.dump(ranked, f, indent=2)
 
         job.update({"progress": 85, "message": "Creating highlight reel"})
         save_job_state(job_id, job)
 
-        output_path = create_highlight_reel(video_path, ranked)  # returns real path
+        output_path = create_highlight_reel(video_path, ranked, output_path=workspace.output_path,
+                                            backend=render_backend,
+                                            video_hash=job.get("video_hash"))  # returns real path
         abs_path = os.path.abspath(output_path)
         print(f"✅ Highlight reel created at: {abs_path}")
 
@@ -145,6 +341,8 @@ async def process_video_job(job_id: str, filename: str, file_bytes: bytes, targe
             "download_url": f"http://127.0.0.1:8000/result/{job_id}"
         })
         save_job_state(job_id, job)
+        if not Config.KEEP_INTERMEDIATE:
+            workspace.cleanup(keep_outputs=True)
         print(f"✅ Job {job_id} completed successfully.")
 
     except Exception as e:
@@ -157,5 +355,70 @@ async def process_video_job(job_id: str, filename: str, file_bytes: bytes, targe
         save_job_state(job_id, job)
 
 
+# ------------------------------------------------------------------
+# RE-QUERYING A STORED VIDEO (no transcription / embedding)
+# ------------------------------------------------------------------
+def query_video(video_id: str, prompt: str, target_duration: int = 60, top_k: int = 15,
+                rerank_backend: str = None):
+    """
+    Rank segments of an already processed video for a new prompt: retrieval
+    on the stored (and kept open) index plus the rerank only.
+    Returns None when the video is not in the store.
+    """
+    session = VIDEO_STORE.session(video_id)
+    if session is None:
+        return None
+    meta = VIDEO_STORE.meta(video_id) or {}
+    results = query_similar_chunks(prompt, top_k=top_k, session=session)
+    if not results:
+        return []
+    if Config.EXCITEMENT_ENABLED:
+        results = apply_excitement_boost(results, VIDEO_STORE.signal(video_id, JobWorkspace.EXCITEMENT))
+    visual = VIDEO_STORE.signal(video_id, JobWorkspace.VISUAL) if Config.VISUAL_ENABLED else None
+    results = apply_visual_boost(results, visual_curve(visual))
+    ranked = rerank_segments(results, prompt, target_duration, backend=rerank_backend)
+    return finalize_highlights(ranked, meta.get("duration"), target_duration, visual)
+
+
+def create_render_job(video_id: str, ranked: list, render_backend: str = None):
+    """Render already ranked segments of a stored video as a job. Raises QueueFullError / FileNotFoundError."""
+    video_path = VIDEO_STORE.video_path(video_id)
+    if video_path is None:
+        raise FileNotFoundError(f"Source video for {video_id} is not stored")
+    job_id, workspace = new_job_workspace()
+    try:
+        return submit_job(job_id, render_video_job, video_path, ranked, render_backend, video_id)
+    except QueueFullError:
+        workspace.cleanup(keep_outputs=False)
+        raise
+
+
+def render_video_job(job_id: str, video_path: str, ranked: list, render_backend: str = None,
+                     video_id: str = None):
+    job = JOBS.setdefault(job_id, load_job_state(job_id) or {})
+    workspace = JobWorkspace(job_id).create()
+    try:
+        job.update({"state": "running", "progress": 85, "message": "Creating highlight reel",
+                    "video_id": video_id})
+        save_job_state(job_id, job)
+        with open(workspace.ranked_path, "w", encoding="utf-8") as f:
+            json.dump(ranked, f, indent=2)
+        output_path = create_highlight_reel(video_path, ranked, output_path=workspace.output_path,
+                                            backend=render_backend, video_hash=video_id)
+        job.update({
+            "state": "done",
+            "progress": 100,
+            "message": "completed",
+            "result_path": output_path,
+            "error": None,
+            "download_url": f"http://127.0.0.1:8000/result/{job_id}"
+        })
+        save_job_state(job_id, job)
+    except Exception as e:
+        print(f"❌ Render job {job_id} failed: {e}")
+        job.update({"state": "failed", "message": str(e), "error": str(e)})
+        save_job_state(job_id, job)
+
+
 def get_job_status(job_id: str):
     return load_job_state(job_id) or {"error": "Job not found"}
@@ -1,11 +1,23 @@
 import os
 import uvicorn
-from fastapi import FastAPI, UploadFile, Form
+from fastapi import FastAPI, UploadFile, Form, Request
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.utils.helpers import create_dirs
-from api.jobs import create_job, get_job_status, load_job_state
+from api.jobs import (
+    create_job, get_job_status, load_job_state, new_job_workspace,
+    VIDEO_STORE, query_video, create_render_job,
+)
+from api.uploads import (
+    save_upload_file, create_upload, get_upload, append_part, upload_digest,
+    discard_upload, part_path, upload_lock, UploadOffsetError,
+)
+from api.executor import EXECUTOR, QueueFullError
 from src.utils.model_cache import ModelCache
+from src.utils.workspace import JobWorkspace
+from src.utils.config import Config
+from src.text.library_index import get_library
+from src.text.highlight_selector import RERANK_BACKENDS
 
 # ------------------------------------------------------------------
 app = FastAPI(title="🎬 GenAI Video Highlight API")
@@ -22,24 +34,188 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     create_dirs()
+    JobWorkspace.purge_expired()
     print("✅ Directories created. API Ready.")
-    ModelCache.load_whisper("tiny")
-    ModelCache.load_embedder("all-mpnet-base-v2")
+    ModelCache.load_whisper(Config.WHISPER_MODEL)
+    ModelCache.load_embedder(Config.EMBED_MODEL)
     print("🔥 Models pre-loaded successfully.")
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    EXECUTOR.shutdown(wait=False)
+
+
 @app.get("/")
 def root():
     return {"message": "Welcome to GenAI Video Highlights API"}
 
 
+def queue_full_response(message):
+    return JSONResponse(status_code=429, content={"error": message}, headers={"Retry-After": "30"})
+
+
+RENDER_BACKENDS = ("ffmpeg", "copy", "parallel", "moviepy")
+
+
+def bad_render_backend_response(render_backend):
+    return JSONResponse(status_code=400, content={
+        "error": f"Unknown render_backend '{render_backend}', expected one of {list(RENDER_BACKENDS)}"
+    })
+
+
+def bad_rerank_backend_response(rerank_backend):
+    return JSONResponse(status_code=400, content={
+        "error": f"Unknown rerank_backend '{rerank_backend}', expected one of {list(RERANK_BACKENDS)}"
+    })
+
+
 @app.post("/jobs")
-async def start_job(video_file: UploadFile, target_duration: int = Form(60)):
-    file_bytes = await video_file.read()
-    job_id = create_job(video_file.filename, file_bytes, target_duration)
+async def start_job(video_file: UploadFile, target_duration: int = Form(60),
+                    render_backend: str = Form(None), rerank_backend: str = Form(None)):
+    if render_backend and render_backend not in RENDER_BACKENDS:
+        return bad_render_backend_response(render_backend)
+    if rerank_backend and rerank_backend not in RERANK_BACKENDS:
+        return bad_rerank_backend_response(rerank_backend)
+    # Reject before reading the upload when there is no room for the job
+    if EXECUTOR.is_full():
+        return queue_full_response("Job queue is full, retry later")
+    job_id, workspace = new_job_workspace()
+    video_path = workspace.video_path(video_file.filename)
+    # Stream to disk in chunks while hashing; the video never sits in memory
+    size, video_hash = await save_upload_file(video_file, video_path)
+    print(f"📥 Received {video_file.filename} ({size / 1024 ** 2:.1f} MB) for job {job_id[:6]}")
+    try:
+        create_job(job_id, video_path, target_duration, video_hash, render_backend, rerank_backend)
+    except QueueFullError as e:
+        workspace.cleanup(keep_outputs=False)
+        return queue_full_response(str(e))
+    return {"job_id": job_id}
+
+
+# ------------------------------------------------------------------
+# Resumable uploads: POST /uploads -> PUT parts -> POST .../complete
+# ------------------------------------------------------------------
+@app.post("/uploads")
+def start_upload(filename: str = Form(...)):
+    upload_id = create_upload(filename)
+    return {"upload_id": upload_id, "offset": 0}
+
+
+@app.get("/uploads/{upload_id}")
+def upload_status(upload_id: str):
+    upload = get_upload(upload_id)
+    if not upload:
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+    return upload
+
+
+@app.put("/uploads/{upload_id}")
+async def upload_part(upload_id: str, request: Request, offset: int = 0):
+    """Append the raw request body (streamed, never buffered) at byte `offset`."""
+    if not get_upload(upload_id):
+        return JSONResponse(status_code=404, content={"error": "Upload not found"})
+    try:
+        size = await append_part(upload_id, offset, request.stream())
+    except UploadOffsetError as e:
+        return JSONResponse(status_code=409, content={"error": str(e), "offset": e.expected})
+    return {"upload_id": upload_id, "offset": size}
+
+
+@app.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, target_duration: int = Form(60),
+                          render_backend: str = Form(None), rerank_backend: str = Form(None)):
+    if render_backend and render_backend not in RENDER_BACKENDS:
+        return bad_render_backend_response(render_backend)
+    if rerank_backend and rerank_backend not in RERANK_BACKENDS:
+        return bad_rerank_backend_response(rerank_backend)
+    # Held until the file is handed to a job: a concurrent /complete for the
+    # same upload waits here, then finds it gone and gets a 404
+    async with upload_lock(upload_id):
+        upload = get_upload(upload_id)
+        if not upload:
+            discard_upload(upload_id)  # drops the lock created for an unknown / finished id
+            return JSONResponse(status_code=404, content={"error": "Upload not found"})
+        # The upload is kept on 429 so the client can simply retry /complete
+        if EXECUTOR.is_full():
+            return queue_full_response("Job queue is full, retry later")
+
+        video_hash = await upload_digest(upload_id)
+        job_id, workspace = new_job_workspace()
+        video_path = workspace.video_path(upload["filename"])
+        try:
+            os.replace(part_path(upload_id), video_path)
+        except FileNotFoundError:
+            # Completed by another worker process in the meantime
+            workspace.cleanup(keep_outputs=False)
+            return JSONResponse(status_code=404, content={"error": "Upload not found"})
+        try:
+            create_job(job_id, video_path, target_duration, video_hash, render_backend, rerank_backend)
+        except QueueFullError as e:
+            os.replace(video_path, part_path(upload_id))
+            workspace.cleanup(keep_outputs=False)
+            return queue_full_response(str(e))
+        discard_upload(upload_id)
     return {"job_id": job_id}
 
 
+@app.get("/jobs/queue")
+def job_queue_stats():
+    return EXECUTOR.stats()
+
+
+# ------------------------------------------------------------------
+# Stored videos: new prompts reuse the persisted index (no re-transcription)
+# ------------------------------------------------------------------
+@app.get("/videos")
+def list_videos():
+    return {"videos": VIDEO_STORE.list_videos()}
+
+
+@app.get("/videos/{video_id}")
+def video_info(video_id: str):
+    meta = VIDEO_STORE.meta(video_id)
+    if not meta:
+        return JSONResponse(status_code=404, content={"error": "Video not found"})
+    return meta
+
+
+@app.post("/videos/{video_id}/query")
+def query_stored_video(video_id: str, prompt: str = Form(...), target_duration: int = Form(60),
+                       render: bool = Form(False), render_backend: str = Form(None),
+                       rerank_backend: str = Form(None)):
+    """Rank segments for a prompt; with render=true also start a render job for them."""
+    if render_backend and render_backend not in RENDER_BACKENDS:
+        return bad_render_backend_response(render_backend)
+    if rerank_backend and rerank_backend not in RERANK_BACKENDS:
+        return bad_rerank_backend_response(rerank_backend)
+    if render and EXECUTOR.is_full():
+        return queue_full_response("Job queue is full, retry later")
+    ranked = query_video(video_id, prompt, target_duration, rerank_backend=rerank_backend)
+    if ranked is None:
+        return JSONResponse(status_code=404, content={"error": "Video not found"})
+    response = {"video_id": video_id, "prompt": prompt, "segments": ranked}
+    if render and ranked:
+        try:
+            response["job_id"] = create_render_job(video_id, ranked, render_backend)
+        except QueueFullError as e:
+            return queue_full_response(str(e))
+        except FileNotFoundError as e:
+            return JSONResponse(status_code=404, content={"error": str(e), "segments": ranked})
+    return response
+
+
+@app.get("/library")
+def library_stats():
+    return get_library(VIDEO_STORE).stats()
+
+
+@app.post("/library/search")
+def search_library(prompt: str = Form(...), top_k: int = Form(20)):
+    """Search the chunks of every processed video at once (ANN index)."""
+    return {"prompt": prompt, "results": get_library(VIDEO_STORE).search(prompt, top_k=top_k)}
+
+
 @app.get("/status/{job_id}")
 def check_job_status(job_id: str):
     job_info = load_job_state(job_id)
@@ -69,8 +245,8 @@ def warmup_models():
     Useful to avoid cold-start latency.
     """
     try:
-        whisper_model = ModelCache.load_whisper("tiny")
-        embed_model = ModelCache.load_embedder("all-mpnet-base-v2")
+        whisper_model = ModelCache.load_whisper(Config.WHISPER_MODEL)
+        embed_model = ModelCache.load_embedder(Config.EMBED_MODEL)
         return {
             "message": "✅ Models warmed up and cached.",
             "whisper_device": str(whisper_model.device),
@@ -0,0 +1,145 @@
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+from starlette.concurrency import run_in_threadpool
+from src.utils.config import Config
+from src.utils.helpers import file_sha256
+
+# ------------------------------------------------------------------
+# GLOBALS
+# ------------------------------------------------------------------
+CHUNK_SIZE = Config.UPLOAD_CHUNK_MB * 1024 * 1024
+os.makedirs(Config.UPLOAD_DIR, exist_ok=True)
+
+# upload_id -> (sha256 hasher, bytes hashed). Lost on restart; rebuilt from disk on complete.
+_HASHERS = {}
+_LOCKS = {}
+
+
+class UploadOffsetError(ValueError):
+    """Raised when a resumable part does not start at the current upload size."""
+
+    def __init__(self, expected):
+        super().__init__(f"Upload offset mismatch, resume from byte {expected}")
+        self.expected = expected
+
+
+# ------------------------------------------------------------------
+# STREAMING WRITE + INCREMENTAL HASH
+# ------------------------------------------------------------------
+async def stream_to_file(chunks, dest_path, hasher=None, mode="wb"):
+    """
+    Write an async iterator of byte chunks to dest_path, updating hasher as
+    it goes. File writes run in the threadpool so the event loop stays free.
+    Returns the number of bytes written.
+    """
+    written = 0
+    f = await run_in_threadpool(open, dest_path, mode)
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if hasher is not None:
+                hasher.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+            written += len(chunk)
+    finally:
+        await run_in_threadpool(f.close)
+    return written
+
+
+async def _iter_upload_file(upload):
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def save_upload_file(upload, dest_path):
+    """Stream a multipart UploadFile to disk. Returns (bytes written, sha256 hex)."""
+    hasher = hashlib.sha256()
+    size = await stream_to_file(_iter_upload_file(upload), dest_path, hasher)
+    return size, hasher.hexdigest()
+
+
+# ------------------------------------------------------------------
+# RESUMABLE UPLOADS
+# ------------------------------------------------------------------
+def _meta_path(upload_id):
+    return os.path.join(Config.UPLOAD_DIR, f"{upload_id}.json")
+
+
+def part_path(upload_id):
+    return os.path.join(Config.UPLOAD_DIR, f"{upload_id}.part")
+
+
+def create_upload(filename):
+    upload_id = str(uuid.uuid4())
+    with open(_meta_path(upload_id), "w", encoding="utf-8") as f:
+        json.dump({"filename": os.path.basename(filename or "video.mp4")}, f)
+    open(part_path(upload_id), "wb").close()
+    _HASHERS[upload_id] = (hashlib.sha256(), 0)
+    return upload_id
+
+
+def get_upload(upload_id):
+    """Return {"upload_id", "filename", "offset"} or None for unknown ids."""
+    if not os.path.exists(_meta_path(upload_id)) or not os.path.exists(part_path(upload_id)):
+        return None
+    with open(_meta_path(upload_id), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    meta.update({"upload_id": upload_id, "offset": os.path.getsize(part_path(upload_id))})
+    return meta
+
+
+def upload_lock(upload_id):
+    """Per-upload lock serialising appends and /complete for one upload id."""
+    return _LOCKS.setdefault(upload_id, asyncio.Lock())
+
+
+async def append_part(upload_id, offset, chunks):
+    """
+    Append one part (a streamed request body) at `offset`.
+    Parts must arrive in order; a mismatched offset raises UploadOffsetError
+    so the client can resume from the size the server actually has.
+    """
+    async with upload_lock(upload_id):
+        current = os.path.getsize(part_path(upload_id))
+        if offset != current:
+            raise UploadOffsetError(current)
+
+        hasher, hashed = _HASHERS.get(upload_id, (None, -1))
+        if hashed != current:
+            hasher = None  # hash state lost or stale; recomputed on complete
+        try:
+            await stream_to_file(chunks, part_path(upload_id), hasher, mode="ab")
+        except BaseException:
+            # A broken part may leave the hasher ahead of the file; drop it
+            _HASHERS.pop(upload_id, None)
+            raise
+        size = os.path.getsize(part_path(upload_id))
+        if hasher is not None:
+            _HASHERS[upload_id] = (hasher, size)
+        else:
+            _HASHERS.pop(upload_id, None)
+        return size
+
+
+async def upload_digest(upload_id):
+    """sha256 of the assembled upload, from the incremental hash when it is still valid."""
+    hasher, hashed = _HASHERS.get(upload_id, (None, -1))
+    if hasher is not None and hashed == os.path.getsize(part_path(upload_id)):
+        return hasher.hexdigest()
+    return await run_in_threadpool(file_sha256, part_path(upload_id))
+
+
+def discard_upload(upload_id):
+    """Forget an upload once its file has been handed to a job (or abandoned)."""
+    for path in (part_path(upload_id), _meta_path(upload_id)):
+        if os.path.exists(path):
+            os.remove(path)
+    _HASHERS.pop(upload_id, None)
+    _LOCKS.pop(upload_id, None)
@@ -0,0 +1,86 @@
+"""
+Candidate fusion at scale: the list-of-dicts path (collect hits, dedup by
+overlap, keyword / excitement / visual boosts, each re-sorting) vs the
+columnar CandidateTable (one union, one merge, one fused scoring pass).
+FAISS output is simulated, so no embedder is needed. As in the pipeline,
+chunk keyword scores are computed once per session and then looked up.
+
+    python -m benchmarks.bench_candidates --candidates 10000 50000
+"""
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+from src.text.candidates import CandidateTable
+from src.text.highlight_selector import (
+    RetrievalSession, dedup_by_overlap, apply_keyword_boost, apply_excitement_boost, apply_visual_boost,
+)
+from benchmarks.bench_retrieval import WORDS
+
+KEYWORDS = ["six", "four", "wicket", "catch", "boundary", "amazing"]
+
+
+def synthetic_hits(n_candidates, rng, queries=3):
+    """Chunks spanning a long video plus (D, I) arrays as a batched FAISS search would return."""
+    n_chunks = n_candidates * 2
+    lengths = rng.uniform(3, 25, n_chunks)
+    starts = np.concatenate([[0.0], np.cumsum(lengths)[:-1]])
+    chunks = [{"start": float(s), "end": float(s + l + rng.choice([0.0, 2.0])), "text": " ".join(rng.choice(WORDS, 8))}
+              for s, l in zip(starts, lengths)]
+    k = n_candidates // queries
+    I = np.stack([rng.choice(n_chunks, k, replace=False) for _ in range(queries)]).astype("int64")
+    D = np.sort(rng.uniform(0.1, 0.8, (queries, k)).astype("float32"), axis=1)[:, ::-1]
+    seconds = int(starts[-1] + lengths[-1]) + 1
+    return chunks, D, I, rng.uniform(0, 1, seconds).astype("float32"), rng.uniform(0, 1, seconds).astype("float32")
+
+
+def dict_path(session, D, I, excitement, visual):
+    results = []
+    for q in range(len(I)):
+        results += session._collect(I[q], D[q], 0.15)
+    results = dedup_by_overlap(results)
+    results = apply_keyword_boost(results, KEYWORDS)
+    results = apply_excitement_boost(results, excitement, 0.1)
+    return apply_visual_boost(results, visual, 0.05)
+
+
+def table_path(session, D, I, excitement, visual):
+    table = CandidateTable.from_search(I, D, session.chunks, 0.15, bounds=session.bounds).merge_overlaps()
+    table.set_signal("keyword", 0.05 * session.keyword_scores(KEYWORDS)[table.rows["chunk_id"]])
+    table.sample_signal("excitement", excitement).sample_signal("visual", visual)
+    return table.fuse({"keyword": 1.0, "excitement": 0.1, "visual": 0.05}).sort_by_score()
+
+
+def timed(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'candidates':>10} {'dicts (ms)':>11} {'table (ms)':>11} {'+ dict view':>12} {'speedup':>8} {'same':>5}")
+    for n in args.candidates:
+        chunks, D, I, excitement, visual = synthetic_hits(n, rng)
+        session = RetrievalSession(None, chunks, embedder=object())
+        dict_ms, old = timed(lambda: dict_path(session, D, I, excitement, visual), args.repeat)
+        table_ms, table = timed(lambda: table_path(session, D, I, excitement, visual), args.repeat)
+        view_ms, new = timed(lambda: table.to_dicts(), args.repeat)
+        same = [(r["chunk_id"], round(r["score"], 9)) for r in old] == \
+               [(r["chunk_id"], round(r["score"], 9)) for r in new]
+        total = table_ms + view_ms
+        print(f"{n:>10} {dict_ms:>11.1f} {table_ms:>11.1f} {total:>12.1f} {dict_ms / total:>7.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
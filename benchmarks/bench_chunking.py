@@ -0,0 +1,165 @@
+"""
+Retrieval quality vs chunk count per chunking strategy. A synthetic
+commentary transcript switches topic every few segments; each query asks
+for one topic, and the top-k chunks are scored on the seconds they cover:
+precision (share of retrieved seconds on the query's topic), recall (share
+of that topic's seconds retrieved) and the text size handed on to MMR / the
+LLM. "time" chunks are embedded from their text; "sliding" / "semantic"
+pool segment vectors embedded once, as chunk_transcript does. The "cand"
+columns run the pipeline's RetrievalSession.candidate_table (hit union +
+overlap dedup) per query: candidates, their precision, and how much of
+each candidate's span its text actually covers.
+
+    python -m benchmarks.bench_chunking --segments 2000
+    python -m benchmarks.bench_chunking --configs time:25 semantic:25:0.5 sliding:15:7.5
+"""
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+import faiss
+from src.utils.config import Config
+from src.utils.model_cache import ModelCache
+from src.utils.intervals import as_arrays
+from src.text.embedding_builder import encode_texts
+from src.text.chunker import merge_segments, sliding_spans, semantic_spans, pool_chunks
+from src.text.highlight_selector import RetrievalSession
+
+TOPICS = {
+    "wicket": "bowled stumps lbw caught edge keeper appeal umpire out wicket review dismissed",
+    "boundary": "four six boundary rope crowd drive pull sweep lofted cleared fence",
+    "bowling": "yorker bouncer pace spin over seam swing length line delivery",
+    "milestone": "century fifty hundred partnership milestone innings helmet raised applause",
+    "chase": "target chase runs required rate overs remaining equation pressure",
+    "fielding": "dive fielder throw direct hit run out misfield catch dropped slip",
+}
+FILLER = "and the is a he they now there that what just so well here with on".split()
+DEFAULT_CONFIGS = ["time:10", "time:25", "sliding:15:7.5", "sliding:10:5", "semantic:15:0.5", "semantic:25:0.5"]
+
+
+def synthetic_transcript(n, rng):
+    """Whisper-like segments (2-6 s) in topic runs of 2-8 segments; returns (segments, topic per segment)."""
+    names = list(TOPICS)
+    segments, topics, t = [], [], 0.0
+    while len(segments) < n:
+        topic = rng.choice(names)
+        vocab = TOPICS[topic].split()
+        for _ in range(int(rng.integers(2, 9))):
+            words = [rng.choice(vocab) if rng.random() < 0.6 else rng.choice(FILLER)
+                     for _ in range(int(rng.integers(6, 15)))]
+            d = rng.uniform(2, 6)
+            segments.append({"start": t, "end": t + d, "text": " ".join(words)})
+            topics.append(topic)
+            t += d + rng.choice([0.0, 0.3, 3.0], p=[0.5, 0.4, 0.1])
+    return segments[:n], np.array(topics[:n])
+
+
+def build_chunks(spec, segments, seg_vectors, embedder):
+    """(chunks, spans, chunk vectors, embed seconds) for one "strategy:params" spec."""
+    kind, *params = spec.split(":")
+    params = [float(p) for p in params]
+    starts, ends = as_arrays(segments)
+    t0 = time.perf_counter()
+    if kind == "time":
+        # merge_segments' chunks, mapped back to segment ranges by their first segment
+        chunks = merge_segments(segments, params[0], Config.CHUNK_MERGE_GAP)
+        first = np.searchsorted(starts, [c["start"] for c in chunks])
+        spans = list(zip(first.tolist(), np.r_[first[1:], len(segments)].tolist()))
+        vectors = encode_texts(embedder, [c["text"] for c in chunks])
+        return chunks, spans, vectors, time.perf_counter() - t0
+    if kind == "sliding":
+        spans = sliding_spans(starts, ends, params[0], params[1])
+    else:
+        spans = semantic_spans(starts, ends, seg_vectors, params[0], Config.CHUNK_MERGE_GAP,
+                               Config.CHUNK_MIN_SECONDS, params[1])
+    chunks, vectors = pool_chunks(segments, seg_vectors, spans)
+    return chunks, spans, vectors, time.perf_counter() - t0
+
+
+def evaluate(spans, vectors, queries, query_topics, segments, topics, k):
+    """Mean precision / recall of retrieved seconds and mean characters of the top-k chunks."""
+    durations = np.array([s["end"] - s["start"] for s in segments])
+    lengths = np.array([len(s["text"]) + 1 for s in segments])
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    _, I = index.search(queries, min(k, len(spans)))
+    precision, recall, chars = [], [], []
+    for ids, topic in zip(I, query_topics):
+        members = np.zeros(len(segments), dtype=bool)
+        for i in ids:
+            a, b = spans[i]
+            members[a:b] = True
+            chars.append(lengths[a:b].sum())
+        relevant = topics == topic
+        hit = durations[members & relevant].sum()
+        precision.append(hit / max(durations[members].sum(), 1e-9))
+        recall.append(hit / max(durations[relevant].sum(), 1e-9))
+    return np.mean(precision), np.mean(recall), np.sum(chars) / len(I)
+
+
+def evaluate_candidates(chunks, vectors, embedder, query_texts, query_topics, segments, topics, k):
+    """
+    Per query, the candidate_table rows the pipeline would score: mean count,
+    precision of their seconds, and text coverage (segment text inside each
+    candidate's span that its chunk text actually contains).
+    """
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    session = RetrievalSession(index, chunks, embedder=embedder, embeddings=vectors)
+    starts, ends = as_arrays(segments)
+    mids, durations = (starts + ends) / 2, ends - starts
+    lengths = np.array([len(s["text"]) + 1 for s in segments])
+    counts, precision, coverage = [], [], []
+    for text, topic in zip(query_texts, query_topics):
+        with contextlib.redirect_stdout(io.StringIO()):
+            table = session.candidate_table([text], top_k=k, dynamic_topk=False)
+        inside = np.zeros(len(segments), dtype=bool)
+        for start, end, cid in zip(table.rows["start"], table.rows["end"], table.rows["chunk_id"]):
+            members = (mids >= start) & (mids <= end)
+            inside |= members
+            coverage.append(min(1.0, (len(chunks[cid]["text"]) + 1) / max(lengths[members].sum(), 1)))
+        counts.append(len(table))
+        precision.append(durations[inside & (topics == topic)].sum() / max(durations[inside].sum(), 1e-9))
+    return np.mean(counts), np.mean(precision), np.mean(coverage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=60)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--model", default=Config.EMBED_MODEL)
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS,
+                        help="time:max_chunk | sliding:window:stride | semantic:max_chunk:drop")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    segments, topics = synthetic_transcript(args.segments, rng)
+    with contextlib.redirect_stdout(io.StringIO()):
+        embedder = ModelCache.load_embedder(model_name=args.model)
+    query_topics = rng.choice(list(TOPICS), args.queries)
+    query_texts = [" ".join(rng.choice(TOPICS[t].split(), 3)) for t in query_topics]
+    queries = encode_texts(embedder, query_texts)
+
+    t0 = time.perf_counter()
+    seg_vectors = encode_texts(embedder, [s["text"] for s in segments])
+    seg_seconds = time.perf_counter() - t0
+
+    print(f"\n{args.segments} segments ({seg_seconds:.1f}s to embed once), {args.queries} queries, top-{args.k}")
+    print(f"{'config':<16} {'chunks':>7} {'avg s':>6} {'embed s':>8} {'precision':>10} {'recall':>7} "
+          f"{'chars/query':>12} {'cands':>6} {'cand prec':>10} {'text/span':>10}")
+    for spec in args.configs:
+        chunks, spans, vectors, embed_seconds = build_chunks(spec, segments, seg_vectors, embedder)
+        if not spec.startswith("time"):
+            embed_seconds += seg_seconds
+        avg = np.mean([segments[b - 1]["end"] - segments[a]["start"] for a, b in spans])
+        p, r, chars = evaluate(spans, vectors, queries, query_topics, segments, topics, args.k)
+        cands, cand_p, text_span = evaluate_candidates(chunks, vectors, embedder, query_texts, query_topics,
+                                                       segments, topics, args.k)
+        print(f"{spec:<16} {len(spans):>7} {avg:>6.1f} {embed_seconds:>8.1f} {p:>10.3f} {r:>7.3f} "
+              f"{chars:>12.0f} {cands:>6.1f} {cand_p:>10.3f} {text_span:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
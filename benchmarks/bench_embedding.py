@@ -0,0 +1,79 @@
+"""
+Embedding throughput vs retrieval quality per embedder configuration.
+Reports chunks/sec and, for a fixed query set, the overlap of each
+configuration's top-k chunks with the baseline (first config, by default
+all-mpnet-base-v2 / torch).
+
+    python -m benchmarks.bench_embedding --chunks 1000
+    python -m benchmarks.bench_embedding --configs all-mpnet-base-v2:torch:64 all-MiniLM-L6-v2:int8:64
+"""
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+import faiss
+from src.utils.model_cache import build_embedder
+from src.text.embedding_builder import encode_texts
+from benchmarks.bench_retrieval import WORDS, synthetic_chunks
+
+DEFAULT_CONFIGS = [
+    "all-mpnet-base-v2:torch:32",
+    "all-mpnet-base-v2:torch:128",
+    "all-mpnet-base-v2:int8:64",
+    "all-mpnet-base-v2:onnx:64",
+    "all-MiniLM-L6-v2:torch:64",
+    "all-MiniLM-L6-v2:int8:64",
+]
+
+
+def top_k_ids(vectors, queries, k):
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    _, I = index.search(queries, k)
+    return I
+
+
+def overlap(ids, baseline):
+    k = baseline.shape[1]
+    return np.mean([len(set(a) & set(b)) / k for a, b in zip(ids, baseline)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS, help="model:backend:batch_size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    texts = [c["text"] for c in synthetic_chunks(args.chunks, rng)]
+    queries = [" ".join(rng.choice(WORDS, size=3)) for _ in range(args.queries)]
+
+    print(f"\n{args.chunks} chunks, {args.queries} queries, top-{args.k} overlap vs the first config")
+    print(f"{'model':<22} {'backend':<8} {'batch':>5} {'load (s)':>9} {'chunks/s':>9} {'overlap':>8}")
+    baseline = None
+    for spec in args.configs:
+        model_name, backend, batch = spec.split(":")
+        t0 = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                embedder = build_embedder(model_name, backend)
+        except (RuntimeError, ImportError, ValueError) as e:
+            print(f"{model_name:<22} {backend:<8} {batch:>5}  skipped: {e}")
+            continue
+        load = time.perf_counter() - t0
+
+        encode_texts(embedder, texts[:32], int(batch))  # warm up
+        t0 = time.perf_counter()
+        vectors = encode_texts(embedder, texts, int(batch))
+        rate = len(texts) / (time.perf_counter() - t0)
+        ids = top_k_ids(vectors, encode_texts(embedder, queries, int(batch)), args.k)
+        if baseline is None:
+            baseline = ids
+        print(f"{model_name:<22} {backend:<8} {batch:>5} {load:>9.1f} {rate:>9.1f} {overlap(ids, baseline):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
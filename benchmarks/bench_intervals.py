@@ -0,0 +1,94 @@
+"""
+Interval merging at scale: the previous per-segment loops in clean_segments
+and pad_and_merge_segments (which grew merged text one concatenation at a
+time) vs the NumPy interval engine in src/utils/intervals.py, with text
+joined once per group. Each row also checks both give identical output.
+
+    python -m benchmarks.bench_intervals --sizes 1000 10000 100000
+"""
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+from src.text.highlight_selector import clean_segments
+from src.video.cutter import pad_and_merge_segments
+
+
+def synthetic_segments(n, rng):
+    """Transcript-like segments of 0.5-8 s with small gaps and some overlaps."""
+    lengths = rng.uniform(0.5, 8, n)
+    gaps = rng.choice([-1.0, 0.0, 0.3, 1.5, 4.0], n, p=[0.1, 0.3, 0.3, 0.2, 0.1])
+    starts = np.maximum(0, np.cumsum(np.concatenate([[0], lengths[:-1]]) + gaps))
+    scores = rng.uniform(0, 1, n)
+    return [{"start": float(s), "end": float(s + l), "text": f"word{i} word{i + 1}", "score": float(sc)}
+            for i, (s, l, sc) in enumerate(zip(starts, lengths, scores))]
+
+
+def legacy_clean(highlights, min_duration=1.0):
+    cleaned = [{"start": float(s["start"]), "end": float(s["end"]), "text": s.get("text", ""), "score": s.get("score", 0)}
+               for s in highlights if s["end"] - s["start"] >= min_duration]
+    cleaned.sort(key=lambda x: x["start"])
+    merged = [cleaned[0]]
+    for seg in cleaned[1:]:
+        if seg["start"] - merged[-1]["end"] < 1.0:
+            merged[-1]["end"] = max(merged[-1]["end"], seg["end"])
+            merged[-1]["score"] = max(merged[-1]["score"], seg["score"])
+            merged[-1]["text"] += " " + seg.get("text", "")
+        else:
+            merged.append(seg)
+    return merged
+
+
+def legacy_pad_and_merge(segments, pad=1.5, merge_gap=2.0, video_duration=None):
+    merged = []
+    for seg in sorted(segments, key=lambda x: x["start"]):
+        s = max(0, seg["start"] - pad)
+        e = seg["end"] + pad
+        if video_duration:
+            e = min(e, video_duration)
+        if merged and s - merged[-1]["end"] <= merge_gap:
+            last = merged[-1]
+            last["end"] = max(last["end"], e)
+            last["score"] = max(last["score"], seg.get("score", 0.0))
+            if seg.get("text"):
+                last["text"] = (last["text"] + " " + seg["text"]).strip()
+        else:
+            merged.append({"start": s, "end": e, "text": seg.get("text", ""), "score": seg.get("score", 0.0)})
+    return merged
+
+
+def timed(fn, segments, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        batch = [dict(s) for s in segments]   # the legacy loops mutate their input
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = fn(batch)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("clean", legacy_clean, clean_segments),
+        ("pad+merge", legacy_pad_and_merge, pad_and_merge_segments),
+    ]
+    rng = np.random.default_rng(0)
+    print(f"\n{'segments':>9} {'op':>10} {'loop (ms)':>10} {'numpy (ms)':>11} {'speedup':>8} {'same':>5}")
+    for n in args.sizes:
+        segments = synthetic_segments(n, rng)
+        for name, old_fn, new_fn in cases:
+            old_ms, old = timed(old_fn, segments, args.repeat)
+            new_ms, new = timed(new_fn, segments, args.repeat)
+            same = old == new
+            print(f"{n:>9} {name:>10} {old_ms:>10.1f} {new_ms:>11.1f} {old_ms / new_ms:>7.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
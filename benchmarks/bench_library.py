@@ -0,0 +1,88 @@
+"""
+Recall / latency of the library index types against exact search.
+Clustered synthetic vectors stand in for transcript-chunk embeddings
+(~1 chunk per 15 s, so 100k chunks is roughly 400 hours of video).
+
+    python -m benchmarks.bench_library --vectors 100000 --dim 768
+"""
+import time
+import argparse
+import numpy as np
+import faiss
+from src.utils.config import Config
+from src.text.library_index import make_ann_index, set_search_params
+
+
+def synthetic_vectors(n, dim, rng, clusters=256, latent=48):
+    """
+    Normalised vectors with embedding-like structure: topic clusters in a
+    low-dimensional latent space, projected up to `dim` with a little noise.
+    """
+    centres = rng.standard_normal((clusters, latent)).astype("float32")
+    z = centres[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, latent)).astype("float32")
+    projection = np.random.default_rng(1).standard_normal((latent, dim)).astype("float32")
+    x = z @ projection + 0.5 * rng.standard_normal((n, dim)).astype("float32")
+    faiss.normalize_L2(x)
+    return x
+
+
+def recall_at_k(found, truth):
+    k = truth.shape[1]
+    return np.mean([len(set(f[:k]) & set(t)) / k for f, t in zip(found, truth)])
+
+
+def add_all(index, data):
+    t0 = time.perf_counter()
+    index.add_with_ids(data, np.arange(len(data), dtype="int64"))
+    return time.perf_counter() - t0
+
+
+def report(label, index, queries, truth, k, build=None):
+    """Single-query latency (the API case) and batched recall."""
+    index.search(queries[:10], k)  # warm up
+    t0 = time.perf_counter()
+    for q in queries:
+        index.search(q[None, :], k)
+    per_query = (time.perf_counter() - t0) / len(queries)
+    _, I = index.search(queries, k)
+    build = f"{build:.2f}" if build is not None else "-"
+    print(f"{label:<24} {build:>9} {per_query * 1000:>10.3f} {recall_at_k(I, truth):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 64, 128])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = synthetic_vectors(args.vectors, args.dim, rng)
+    queries = synthetic_vectors(args.queries, args.dim, rng)
+
+    flat = make_ann_index(args.dim, "flat")
+    flat_build = add_all(flat, data)
+    _, truth = flat.search(queries, args.k)
+
+    print(f"\n{args.vectors} vectors, dim {args.dim}, recall@{args.k} vs exact search")
+    print(f"{'index':<24} {'build (s)':>9} {'ms/query':>10} {'recall':>10}")
+    report("flat", flat, queries, truth, args.k, flat_build)
+
+    hnsw = make_ann_index(args.dim, "hnsw")
+    hnsw_build = add_all(hnsw, data)
+    for ef in args.ef_search:
+        report(f"hnsw efSearch={ef}", set_search_params(hnsw, ef_search=ef), queries, truth, args.k, hnsw_build)
+
+    train = data[rng.choice(len(data), min(len(data), Config.LIBRARY_TRAIN_SIZE), replace=False)]
+    t0 = time.perf_counter()
+    ivfpq = make_ann_index(args.dim, "ivfpq", train_vectors=train)
+    ivfpq_build = time.perf_counter() - t0 + add_all(ivfpq, data)
+    for nprobe in args.nprobe:
+        report(f"ivfpq nprobe={nprobe}", set_search_params(ivfpq, nprobe=nprobe), queries, truth, args.k, ivfpq_build)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Render benchmark: MoviePy re-encode vs single-pass ffmpeg filtergraph.
+Each backend runs in a fresh child process so wall time and peak RSS
+(the child plus the ffmpeg processes it spawns) are measured in isolation.
+
+    python -m benchmarks.bench_render data/raw/sample.mp4 --segments 12 --clip 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from src.video.probe import probe_video
+
+BACKENDS = ["moviepy", "ffmpeg"]
+
+
+def synthetic_highlights(duration, n, clip):
+    """n evenly spaced clips of `clip` seconds across the video."""
+    step = duration / n
+    return [{"start": round(i * step, 2), "end": round(min(duration, i * step + clip), 2),
+             "text": "", "score": 1.0} for i in range(n)]
+
+
+def run_child(backend, video_path, highlights_path, output_path):
+    from src.video.cutter import create_highlight_reel
+
+    with open(highlights_path, "r", encoding="utf-8") as f:
+        highlights = json.load(f)
+    t0 = time.perf_counter()
+    create_highlight_reel(video_path, highlights, output_path=output_path, backend=backend)
+    wall = time.perf_counter() - t0
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print("RESULT " + json.dumps({"wall": wall, "peak_mb": peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video")
+    parser.add_argument("--segments", type=int, default=12)
+    parser.add_argument("--clip", type=float, default=8.0, help="seconds per highlight clip")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--highlights", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.video, args.highlights, args.output)
+        return
+
+    duration = probe_video(args.video)["duration"]
+    highlights = synthetic_highlights(duration, args.segments, args.clip)
+    tmp = tempfile.mkdtemp(prefix="bench_render_")
+    highlights_path = os.path.join(tmp, "highlights.json")
+    with open(highlights_path, "w", encoding="utf-8") as f:
+        json.dump(highlights, f)
+
+    print(f"\n{args.segments} x {args.clip:.0f}s clips from {duration:.0f}s video")
+    print(f"{'backend':>10} {'wall (s)':>10} {'peak RSS (MB)':>14}")
+    for backend in args.backends:
+        output_path = os.path.join(tmp, f"reel_{backend}.mp4")
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_render", args.video, "--child", backend,
+             "--highlights", highlights_path, "--output", output_path],
+            capture_output=True, text=True,
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:>10} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        result = json.loads(lines[-1][len("RESULT "):])
+        print(f"{backend:>10} {result['wall']:>10.2f} {result['peak_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
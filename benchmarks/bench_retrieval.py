@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: per-query retrieval + MMR re-encoding (old path) vs one
+batched search + MMR on stored chunk vectors (RetrievalSession).
+
+    python -m benchmarks.bench_retrieval --chunks 2000
+"""
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+import faiss
+from src.utils.config import Config
+from src.utils.model_cache import ModelCache
+from src.text.highlight_selector import RetrievalSession, mmr_diversify
+
+WORDS = ("four six wicket catch appeal review boundary crowd cheers bowler batter "
+         "over run out dropped edge slip keeper umpire spin pace yorker bouncer "
+         "century fifty partnership target chase innings drive pull sweep").split()
+
+
+def synthetic_chunks(n, rng):
+    return [{
+        "start": i * 10.0,
+        "end": i * 10.0 + 8.0,
+        "text": " ".join(rng.choice(WORDS, size=int(rng.integers(12, 40)))),
+    } for i in range(n)]
+
+
+def build_session(chunks, embedder):
+    emb = np.array(embedder.encode([c["text"] for c in chunks]), dtype="float32")
+    faiss.normalize_L2(emb)
+    index = faiss.IndexFlatIP(emb.shape[1])
+    index.add(emb)
+    return RetrievalSession(index, chunks, embedder=embedder, embeddings=emb)
+
+
+def old_path(session, queries, top_k, max_items):
+    """One encode + search per query, then MMR re-encodes candidate text."""
+    cands = []
+    for q in queries:
+        q_emb = np.array(session.embedder.encode([q]), dtype="float32")
+        faiss.normalize_L2(q_emb)
+        D, I = session.index.search(q_emb, top_k)
+        cands += [{"text": session.chunks[i]["text"], "start": session.chunks[i]["start"],
+                   "end": session.chunks[i]["end"], "score": float(d)} for i, d in zip(I[0], D[0]) if i >= 0]
+    return mmr_diversify(cands, embedder=session.embedder, max_items=max_items)
+
+
+def new_path(session, queries, top_k, max_items):
+    """One batched encode + search, MMR vectors looked up by chunk id."""
+    cands = []
+    for results in session.search_many(queries, top_k=top_k, min_cosine=-1.0, dynamic_topk=False):
+        cands += results
+    return session.mmr(cands, max_items=max_items)
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):  # silence pipeline logging
+            t0 = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - t0
+        best = min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, nargs="+", default=[1, 3, 8, 16])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[10, 30, 50])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--model", default=Config.EMBED_MODEL)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embedder = ModelCache.load_embedder(args.model)
+    session = build_session(synthetic_chunks(args.chunks, rng), embedder)
+
+    print(f"\n{'queries':>8} {'top_k':>6} {'cands':>6} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8}")
+    for n_q in args.queries:
+        queries = [" ".join(rng.choice(WORDS, size=3)) for _ in range(n_q)]
+        for top_k in args.top_k:
+            old = timed(lambda: old_path(session, queries, top_k, 15), args.repeats)
+            new = timed(lambda: new_path(session, queries, top_k, 15), args.repeats)
+            print(f"{n_q:>8} {top_k:>6} {n_q * top_k:>6} {old * 1000:>10.1f} {new * 1000:>10.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Duration-constrained segment selection: the old chronological greedy fill
+(stops at the first clip that does not fit) vs the knapsack in
+src/video/selection.py. Reports runtime, budget fill and the total
+score-weighted seconds kept.
+
+    python -m benchmarks.bench_selection --sizes 100 1000 5000 10000 --budget 360
+"""
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+from src.video.selection import select_segments
+
+
+def synthetic_candidates(n, rng):
+    """Non-overlapping segments of 2-60 s with skewed scores, in chronological order."""
+    lengths = rng.uniform(2, 60, n)
+    gaps = rng.exponential(20, n)
+    starts = np.cumsum(gaps + np.concatenate([[0], lengths[:-1]]))
+    scores = rng.beta(2, 5, n)
+    return [{"start": float(s), "end": float(s + l), "score": float(sc), "text": f"chunk {i}"}
+            for i, (s, l, sc) in enumerate(zip(starts, lengths, scores))]
+
+
+def legacy_limit(segments, max_total_seconds):
+    """The previous limit_highlight_duration: split >40 s clips, keep chronological until one doesn't fit."""
+    ranked = sorted(segments, key=lambda x: x["start"])
+    refined = []
+    for seg in ranked:
+        start, end = seg["start"], seg["end"]
+        if end - start > 40:
+            for s in np.arange(start, end, 20):
+                refined.append({"start": s, "end": min(s + 20, end), "score": seg["score"]})
+        else:
+            refined.append(seg)
+    selected, total = [], 0.0
+    for seg in refined:
+        dur = seg["end"] - seg["start"]
+        if total + dur > max_total_seconds:
+            break
+        selected.append(seg)
+        total += dur
+    return selected
+
+
+def summarise(selected):
+    seconds = sum(s["end"] - s["start"] for s in selected)
+    value = sum(s["score"] * (s["end"] - s["start"]) for s in selected)
+    return seconds, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 10000])
+    parser.add_argument("--budget", type=float, default=360.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"\nbudget {args.budget:g}s; value = sum(score x seconds)")
+    print(f"{'candidates':>10} {'method':<9} {'ms':>9} {'seconds':>8} {'value':>8} {'mean score':>10}")
+    for n in args.sizes:
+        segments = synthetic_candidates(n, rng)
+        for name, fn in (("greedy", legacy_limit), ("knapsack", select_segments)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    selected = fn(segments, args.budget)
+                best = min(best, time.perf_counter() - t0)
+            seconds, value = summarise(selected)
+            mean = value / seconds if seconds else 0.0
+            print(f"{n:>10} {name:<9} {best * 1000:>9.2f} {seconds:>8.1f} {value:>8.1f} {mean:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
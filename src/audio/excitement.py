@@ -0,0 +1,84 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.utils.config import Config
+from src.audio.pcm import SAMPLE_RATE
+
+# Analysis frames: 64 ms windows every 50 ms at 16 kHz
+FRAME = 1024
+HOP = 800
+# Frames per FFT batch; bounds the spectrogram memory (~17 MB) whatever the audio length
+BLOCK_FRAMES = 4096
+
+
+def frame_features(audio, sr=SAMPLE_RATE, frame=FRAME, hop=HOP):
+    """
+    Per-frame loudness (RMS in dB) and spectral flux (summed positive change
+    of the log-magnitude spectrum). Frames are strided views of the samples;
+    FFTs run a block of frames at a time.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if len(audio) < frame:
+        audio = np.pad(audio, (0, frame - len(audio)))
+    frames = sliding_window_view(audio, frame)[::hop]
+    window = np.hanning(frame).astype(np.float32)
+
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    loudness = 20.0 * np.log10(rms + 1e-6)
+
+    flux = np.zeros(len(frames), dtype=np.float32)
+    prev = None
+    for b in range(0, len(frames), BLOCK_FRAMES):
+        mag = np.log1p(np.abs(np.fft.rfft(frames[b:b + BLOCK_FRAMES] * window, axis=1))).astype(np.float32)
+        # Difference against the previous frame, carrying the last frame across blocks
+        before = np.vstack([mag[:1] if prev is None else prev, mag[:-1]])
+        flux[b:b + len(mag)] = np.maximum(mag - before, 0.0).sum(axis=1)
+        prev = mag[-1:]
+    return loudness, flux
+
+
+def per_second(values, sr=SAMPLE_RATE, hop=HOP, seconds=None):
+    """Mean of frame values per whole second of audio."""
+    second = np.arange(len(values)) * hop // sr
+    seconds = seconds or int(second[-1]) + 1
+    second = np.minimum(second, seconds - 1)
+    counts = np.maximum(np.bincount(second, minlength=seconds), 1)
+    return np.bincount(second, weights=values, minlength=seconds) / counts
+
+
+def rolling_zscore(x, window_seconds):
+    """z-score of each second against a centred rolling window (cumulative sums, no loops)."""
+    x = np.asarray(x, dtype=np.float64)
+    n, half = len(x), max(1, int(window_seconds) // 2)
+    c1 = np.concatenate([[0.0], np.cumsum(x)])
+    c2 = np.concatenate([[0.0], np.cumsum(x * x)])
+    idx = np.arange(n)
+    lo, hi = np.clip(idx - half, 0, n), np.clip(idx + half + 1, 0, n)
+    count = hi - lo
+    mean = (c1[hi] - c1[lo]) / count
+    var = np.maximum((c2[hi] - c2[lo]) / count - mean * mean, 0.0)
+    return (x - mean) / np.sqrt(var + 1e-6)
+
+
+def excitement_curve(audio, sr=SAMPLE_RATE, window_seconds=None):
+    """
+    Per-second excitement in [0, 1] for mono float32 audio: how far loudness
+    and spectral flux (crowd noise, raised commentary) rise above their local
+    average. 0 means at or below the surrounding level, 1 means 3+ std above.
+    """
+    window_seconds = window_seconds or Config.EXCITEMENT_WINDOW_SECONDS
+    seconds = max(1, int(np.ceil(len(audio) / float(sr))))
+    loudness, flux = frame_features(audio, sr)
+    z = 0.5 * (rolling_zscore(per_second(loudness, sr, seconds=seconds), window_seconds)
+               + rolling_zscore(per_second(flux, sr, seconds=seconds), window_seconds))
+    return (np.clip(z, 0.0, 3.0) / 3.0).astype(np.float32)
+
+
+def segment_means(curve, starts, ends):
+    """Mean curve value over each [start, end) in seconds (vectorised via cumulative sums)."""
+    curve = np.asarray(curve, dtype=np.float64)
+    if not len(curve):
+        return np.zeros(len(starts))
+    c = np.concatenate([[0.0], np.cumsum(curve)])
+    lo = np.clip(np.floor(np.asarray(starts, dtype=np.float64)).astype(int), 0, len(curve) - 1)
+    hi = np.clip(np.ceil(np.asarray(ends, dtype=np.float64)).astype(int), lo + 1, len(curve))
+    return (c[hi] - c[lo]) / (hi - lo)
@@ -0,0 +1,152 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.utils.config import Config
+from src.utils.model_cache import ModelCache
+from src.audio.pcm import SAMPLE_RATE, load_audio_pcm, iter_audio_windows
+from src.audio.transcriber import WHISPER_OPTIONS, to_segments
+
+# Energy resolution used to look for quiet split points
+FRAME_SECONDS = 0.1
+
+
+def frame_energy(audio, sr=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+    """RMS energy of consecutive non-overlapping frames (vectorised)."""
+    n = max(1, int(sr * frame_seconds))
+    usable = len(audio) // n * n
+    frames = audio[:usable].reshape(-1, n)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def plan_windows(audio, sr=SAMPLE_RATE, window_seconds=None, search_seconds=None):
+    """
+    Split the audio roughly every window_seconds, moving each split to the
+    quietest frame within ±search_seconds so cuts land between phrases.
+    Returns [(core_start, core_end)] in seconds covering the whole audio.
+    """
+    window_seconds = window_seconds or Config.TRANSCRIBE_WINDOW_SECONDS
+    search_seconds = search_seconds or min(15.0, window_seconds * 0.1)
+    total = len(audio) / float(sr)
+    energy = frame_energy(audio, sr)
+
+    cuts = [0.0]
+    nominal = window_seconds
+    # Stop once the remainder is short enough to fold into the last window
+    while nominal < total - window_seconds * 0.5:
+        lo = max(0, int((nominal - search_seconds) / FRAME_SECONDS))
+        hi = min(len(energy), int((nominal + search_seconds) / FRAME_SECONDS) + 1)
+        quiet = lo + int(np.argmin(energy[lo:hi])) if hi > lo else int(nominal / FRAME_SECONDS)
+        cut = (quiet + 0.5) * FRAME_SECONDS
+        cuts.append(cut)
+        nominal = cut + window_seconds
+    cuts.append(total)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+# -----------------------------------------------------------
+# Worker side: every process keeps its own cached Whisper model
+# -----------------------------------------------------------
+def _init_worker(model_name, threads):
+    import torch
+    torch.set_num_threads(threads)
+    ModelCache.load_whisper(model_name)
+
+
+def transcribe_window(model_name, samples, offset, core_start, core_end):
+    """
+    Transcribe one window (core plus overlap context) and keep only segments
+    whose midpoint falls inside the core, with timestamps made global.
+    """
+    model = ModelCache.load_whisper(model_name)
+    result = model.transcribe(samples, **WHISPER_OPTIONS)
+    return [s for s in to_segments(result, offset)
+            if core_start <= (s["start"] + s["end"]) / 2.0 < core_end]
+
+
+def _stitch(last, seg):
+    """seg as it should follow `last`: None for an overlap duplicate, else with its start clipped."""
+    if last is None or seg["start"] >= last["end"]:
+        return seg
+    if seg["text"] == last["text"]:
+        return None
+    seg = dict(seg, start=last["end"])
+    return seg if seg["end"] > seg["start"] else None
+
+
+def stitch_segments(window_results):
+    """Join per-window segments in order, dropping duplicates repeated across an overlap."""
+    merged = []
+    for segments in window_results:
+        for seg in segments:
+            seg = _stitch(merged[-1] if merged else None, seg)
+            if seg is not None:
+                merged.append(seg)
+    return merged
+
+
+def iter_transcript(video_path, model_name="tiny", window_seconds=None, overlap_seconds=None):
+    """
+    Transcribe a video while its audio is still being decoded.
+    Fixed windows are read from the ffmpeg PCM pipe (memory stays bounded),
+    each is transcribed as soon as it arrives, and overlapping windows are
+    split at the middle of their overlap.
+    Yields (transcribed_until_seconds, new_segments) per window.
+    """
+    window_seconds = window_seconds or Config.STREAM_WINDOW_SECONDS
+    overlap = Config.TRANSCRIBE_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+    windows = iter_audio_windows(video_path, window_seconds, overlap_seconds=overlap)
+    core_start, last = 0.0, None
+    upcoming = next(windows, None)
+    while upcoming is not None:
+        offset, samples = upcoming
+        upcoming = next(windows, None)  # look ahead one window to know if this is the last
+        end = offset + len(samples) / float(SAMPLE_RATE)
+        core_end = end - overlap / 2.0 if upcoming is not None else float("inf")
+        fresh = []
+        for seg in transcribe_window(model_name, samples, offset, core_start, core_end):
+            seg = _stitch(last, seg)
+            if seg is not None:
+                fresh.append(seg)
+                last = seg
+        yield min(end, core_end), fresh
+        core_start = core_end
+
+
+def transcribe_parallel(audio, model_name="tiny", workers=None, window_seconds=None, overlap_seconds=None):
+    """
+    Windowed Whisper transcription for long inputs. `audio` is a path or a
+    16 kHz float32 array. Windows are split at quiet points, padded with
+    overlap for context, transcribed across worker processes and stitched
+    back with global timestamps.
+    """
+    if isinstance(audio, str):
+        audio = load_audio_pcm(audio)
+    workers = workers or Config.TRANSCRIBE_WORKERS
+    overlap = Config.TRANSCRIBE_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+    total = len(audio) / float(SAMPLE_RATE)
+
+    jobs = []
+    for core_start, core_end in plan_windows(audio, SAMPLE_RATE, window_seconds):
+        start = max(0.0, core_start - overlap)
+        end = min(total, core_end + overlap)
+        samples = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+        jobs.append((model_name, samples, start, core_start, core_end))
+
+    workers = max(1, min(workers, len(jobs)))
+    print(f"Transcribing {total / 60:.1f} min of audio in {len(jobs)} windows on {workers} workers...")
+    if workers == 1:
+        results = [transcribe_window(*job) for job in jobs]
+    else:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, threads),
+        ) as pool:
+            results = list(pool.map(transcribe_window, *zip(*jobs)))
+
+    segments = stitch_segments(results)
+    print(f"✅ Stitched {len(segments)} segments from {len(jobs)} windows")
+    return segments
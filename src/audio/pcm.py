@@ -0,0 +1,103 @@
+import subprocess
+import numpy as np
+
+# Whisper's native input: mono float32 at 16 kHz
+SAMPLE_RATE = 16000
+
+# ffmpeg raw format -> (numpy dtype, scale to [-1, 1])
+PCM_FORMATS = {
+    "f32le": (np.float32, None),
+    "s16le": (np.int16, 32768.0),
+}
+READ_SIZE = 1 << 20
+
+
+def _open_pcm(video_path, sr, fmt):
+    """Start ffmpeg decoding the first audio stream to raw mono PCM on stdout."""
+    if fmt not in PCM_FORMATS:
+        raise ValueError(f"Unsupported PCM format: {fmt}")
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "error",
+           "-i", video_path, "-map", "0:a:0", "-vn",
+           "-ac", "1", "-ar", str(sr), "-f", fmt, "pipe:1"]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def _close_pcm(proc, complete=True):
+    """Reap ffmpeg; raise RuntimeError if it failed while we still wanted its output."""
+    if not complete:
+        proc.kill()
+    proc.stdout.close()
+    err = proc.stderr.read().decode("utf-8", "replace").strip()
+    proc.stderr.close()
+    if proc.wait() != 0 and complete:
+        raise RuntimeError("ffmpeg audio decode failed: " + " | ".join(err.splitlines()[-5:]))
+
+
+def _to_float32(buf, fmt):
+    """Raw PCM bytes -> float32 samples in [-1, 1] (no copy for f32le)."""
+    dtype, scale = PCM_FORMATS[fmt]
+    samples = np.frombuffer(buf, dtype=dtype, count=len(buf) // np.dtype(dtype).itemsize)
+    if scale:
+        samples = samples.astype(np.float32) / scale
+    return samples
+
+
+def load_audio_pcm(video_path: str, sr: int = SAMPLE_RATE, fmt: str = "f32le") -> np.ndarray:
+    """
+    Decode a video's audio track straight into memory as mono float32 PCM.
+    ffmpeg pipes raw samples over stdout, so there is no WAV file and the
+    array can go to Whisper (or any other audio analysis) without decoding
+    again. fmt="s16le" halves the pipe traffic at 16-bit precision.
+    """
+    proc = _open_pcm(video_path, sr, fmt)
+    buf = bytearray()
+    try:
+        while True:
+            chunk = proc.stdout.read(READ_SIZE)
+            if not chunk:
+                break
+            buf += chunk
+    except BaseException:
+        _close_pcm(proc, complete=False)
+        raise
+    _close_pcm(proc)
+    # bytearray keeps the array writable, which torch.from_numpy expects
+    return _to_float32(buf, fmt)
+
+
+def iter_audio_windows(video_path: str, window_seconds: float = 30.0, sr: int = SAMPLE_RATE,
+                       fmt: str = "f32le", overlap_seconds: float = 0.0):
+    """
+    Stream a video's audio as fixed-size windows without holding the whole
+    track in memory. Yields (offset_seconds, samples); each window after the
+    first starts with the last overlap_seconds of the previous one. The final
+    window may be shorter.
+    """
+    proc = _open_pcm(video_path, sr, fmt)
+    itemsize = np.dtype(PCM_FORMATS[fmt][0]).itemsize
+    step = int(window_seconds * sr)
+    overlap = min(int(overlap_seconds * sr), step - 1) if overlap_seconds > 0 else 0
+    complete = False
+    try:
+        tail = np.zeros(0, dtype=np.float32)
+        consumed = 0  # samples of new audio read so far
+        while True:
+            buf = bytearray()
+            want = (step - len(tail)) * itemsize
+            while len(buf) < want:
+                chunk = proc.stdout.read(want - len(buf))
+                if not chunk:
+                    break
+                buf += chunk
+            fresh = _to_float32(buf, fmt)
+            if not len(fresh):
+                break
+            window = np.concatenate([tail, fresh]) if len(tail) else fresh
+            yield (consumed - len(tail)) / float(sr), window
+            consumed += len(fresh)
+            if len(buf) < want:
+                break
+            tail = window[len(window) - overlap:].copy() if overlap else tail
+        complete = True
+    finally:
+        _close_pcm(proc, complete=complete)
@@ -1,7 +1,10 @@
 import os, sys, json, ffmpeg
+import wave
 import subprocess
 import whisper
+import numpy as np
 from src.utils.config import Config
+from src.audio.pcm import SAMPLE_RATE, load_audio_pcm
 from src.utils.model_cache import ModelCache
 
 
@@ -10,10 +13,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')
 def extract_audio(video_path: str, out_audio: str = None) -> str:
     """
     Extract mono 16kHz WAV for Whisper.
+    Pass out_audio (e.g. JobWorkspace.audio_path) when jobs run concurrently.
+    Prefer load_audio() when the samples are only needed in memory.
     """
     if out_audio is None:
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        out_audio = os.path.join(base_dir, "data", "processed", "audio.wav")
+        out_audio = os.path.join(Config.PROCESSED_DIR, "audio.wav")
 
     os.makedirs(os.path.dirname(out_audio), exist_ok=True)
 
@@ -27,27 +31,66 @@ def extract_audio(video_path: str, out_audio: str = None) -> str:
     return out_audio
 
 
-def transcribe_audio(audio_path: str, model_name: str = "tiny") -> list:
-    """
-    Transcribes an audio file using Whisper and returns a list of segments
-    with timestamps and text.
-    """
-    print(f"Loading Whisper model: {model_name}")
-    # model = whisper.load_model(model_name)
-    model = ModelCache.load_whisper(model_name)
-    print("Transcribing...")
-    result = model.transcribe(audio_path, fp16=False, # CPU must be False
-                            verbose=False,# keep logs clean
-                            word_timestamps=False, # optional; set True if you need per-word timing
-                            temperature=0.0,         # deterministic
-                            condition_on_previous_text=False  # helps with segment drift on long files
-                            )
+def load_audio(video_path: str) -> np.ndarray:
+    """Decode the audio track straight to 16 kHz float32 samples (no temp WAV, one decode)."""
+    return load_audio_pcm(video_path, sr=SAMPLE_RATE)
+
+
+# Shared by the single-call and windowed transcription paths
+WHISPER_OPTIONS = dict(
+    fp16=False,                       # CPU must be False
+    verbose=False,                    # keep logs clean
+    word_timestamps=False,            # optional; set True if you need per-word timing
+    temperature=0.0,                  # deterministic
+    condition_on_previous_text=False  # helps with segment drift on long files
+)
+
+
+def to_segments(result, offset=0.0):
+    """Whisper result -> [{"text", "start", "end"}], shifted by offset seconds."""
     segments = []
     for seg in result.get("segments", []):
         segments.append({
             "text": seg.get("text", "").strip(),
-            "start": float(seg.get("start", 0.0)),
-            "end": float(seg.get("end", 0.0)),
+            "start": float(seg.get("start", 0.0)) + offset,
+            "end": float(seg.get("end", 0.0)) + offset,
         })
     return segments
+
+
+def audio_duration(audio) -> float:
+    """Duration of a 16 kHz sample array, or of a WAV file from its header (no decoding)."""
+    if isinstance(audio, np.ndarray):
+        return len(audio) / float(SAMPLE_RATE)
+    with wave.open(audio, "rb") as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+def transcribe_audio(audio_path, model_name: str = "tiny", mode: str = None) -> list:
+    """
+    Transcribes audio using Whisper and returns a list of segments with
+    timestamps and text. audio_path may also be a 16 kHz float32 array
+    from load_audio(), which Whisper uses without decoding again.
+    mode: "single" (one model.transcribe call), "parallel" (windowed, across
+    worker processes) or "auto" (parallel once audio exceeds MAX_VIDEO_LENGTH).
+    """
+    mode = (mode or Config.TRANSCRIBE_MODE).lower()
+    if mode == "auto":
+        try:
+            long_audio = audio_duration(audio_path) > Config.MAX_VIDEO_LENGTH
+        except (wave.Error, EOFError):
+            long_audio = False
+        mode = "parallel" if long_audio else "single"
+    if mode == "parallel":
+        from src.audio.parallel_transcriber import transcribe_parallel
+        return transcribe_parallel(audio_path, model_name=model_name)
+    if mode != "single":
+        raise ValueError(f"Unknown transcribe mode: {mode}")
+
+    print(f"Loading Whisper model: {model_name}")
+    # model = whisper.load_model(model_name)
+    model = ModelCache.load_whisper(model_name)
+    print("Transcribing...")
+    result = model.transcribe(audio_path, **WHISPER_OPTIONS)
+    return to_segments(result)
     # return result["segments"]
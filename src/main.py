@@ -5,10 +5,11 @@ from src.utils.config import Config
 from src.utils.helpers import create_dirs
 
 # Import pipeline modules
-from src.audio.transcriber import extract_audio, transcribe_audio
-from src.text.chunker import merge_segments
+from src.audio.transcriber import load_audio, transcribe_audio
+from src.text.chunker import chunk_transcript
 from src.text.embedding_builder import build_embeddings
-from src.text.highlight_selector import query_similar_chunks, rerank_with_llm
+from src.text.highlight_selector import query_similar_chunks, rerank_with_llm, apply_excitement_boost
+from src.audio.excitement import excitement_curve
 from src.video.cutter import create_highlight_reel
 from src.video.cutter import limit_highlight_duration
 
@@ -18,23 +19,28 @@ def run_pipeline(video_path, user_prompt, target_duration=60):
     create_dirs()
 
     print("\nStep 1: Audio Extraction & Transcription...")
-    audio_path = extract_audio(video_path)
-    segments = transcribe_audio(audio_path)
+    audio = load_audio(video_path)
+    segments = transcribe_audio(audio)
+    excitement = excitement_curve(audio) if Config.EXCITEMENT_ENABLED else None
+    del audio
     transcript_path = os.path.join(Config.PROCESSED_DIR, "transcript_segments.json")
     with open(transcript_path, "w", encoding="utf-8") as f:
         json.dump(segments, f, indent=2)
 
     print("\nStep 2: Merging transcript segments...")
-    chunks = merge_segments(segments, 10.0) #Chunks(2nd param) are of 30 seconds by default
+    # Same chunking (CHUNK_STRATEGY / CHUNK_MAX_SECONDS) as the API, so both build the same index
+    chunks, vectors = chunk_transcript(segments)
     chunk_path = os.path.join(Config.PROCESSED_DIR, "chunks.json")
     with open(chunk_path, "w", encoding="utf-8") as f:
         json.dump(chunks, f, indent=2)
 
     print("\nStep 3: Building embeddings + FAISS index...")
-    build_embeddings(chunk_path)
+    build_embeddings(chunk_path, embeddings_path=os.path.join(Config.PROCESSED_DIR, "embeddings.npy"),
+                     embeddings=vectors)
 
     print("\nStep 4: Selecting creative highlights via LLM...")
     results = query_similar_chunks(user_prompt, top_k=15) # Getting top 15 chunks for better selection
+    results = apply_excitement_boost(results, excitement)
     ranked = rerank_with_llm(results, user_prompt, target_duration)#user_prompt, target duration passed here and is input from user.
     ranked = limit_highlight_duration(ranked, max_total_seconds=target_duration)
     highlight_path = os.path.join(Config.PROCESSED_DIR, "highlight_candidates.json")
@@ -0,0 +1,72 @@
+from src.utils.config import Config
+from src.audio.parallel_transcriber import iter_transcript
+from src.text.chunker import IncrementalChunker
+from src.text.embedding_builder import IncrementalIndex
+from src.text.highlight_selector import generate_candidate_highlights
+
+
+class StreamingPipeline:
+    """
+    Transcript -> chunks -> index -> candidates as a generator pipeline.
+    Whisper segments flow into an IncrementalChunker, finished chunks are
+    embedded in micro-batches into a growing FAISS index, and provisional
+    candidates are recomputed whenever new chunks were indexed, all while
+    the rest of the video is still being transcribed.
+    """
+
+    def __init__(self, video_path, whisper_model=None, embed_model=None, max_chunk=None,
+                 merge_gap=None, batch_size=None, top_k=30):
+        self.video_path = video_path
+        self.whisper_model = whisper_model or Config.WHISPER_MODEL
+        self.top_k = top_k
+        self.chunker = IncrementalChunker(
+            Config.CHUNK_MAX_SECONDS if max_chunk is None else max_chunk,
+            Config.CHUNK_MERGE_GAP if merge_gap is None else merge_gap,
+        )
+        self.index = IncrementalIndex(embed_model, batch_size or Config.STREAM_BATCH_SIZE)
+        self.segments = []
+        self.candidates = []
+        self.transcribed_until = 0.0
+
+    def run(self):
+        """
+        Generator: after every transcribed window yields a snapshot
+        {"transcribed_until", "segments", "chunks", "candidates"}.
+        The last snapshot covers the whole video with every chunk indexed.
+        """
+        for until, fresh in iter_transcript(self.video_path, self.whisper_model):
+            self.segments.extend(fresh)
+            self.transcribed_until = until
+            finished = []
+            for seg in fresh:
+                finished.extend(self.chunker.add(seg))
+            if self.index.add(finished):
+                self.refresh_candidates()
+            yield self.snapshot()
+
+        self.index.add(self.chunker.flush())
+        if self.index.flush():
+            self.refresh_candidates()
+        yield self.snapshot()
+
+    def refresh_candidates(self):
+        session = self.index.session()
+        if session is not None:
+            self.candidates = generate_candidate_highlights(None, None, self.index.model_name,
+                                                            top_k=self.top_k, session=session)
+        return self.candidates
+
+    def snapshot(self):
+        return {
+            "transcribed_until": round(self.transcribed_until, 2),
+            "segments": len(self.segments),
+            "chunks": len(self.index.chunks),
+            "candidates": [
+                {"start": c["start"], "end": c["end"], "text": c["text"], "score": round(float(c.get("score", 0)), 4)}
+                for c in self.candidates
+            ],
+        }
+
+    def save(self, index_path, chunk_path=None, embeddings_path=None):
+        """Write the finished index, chunks.json and embeddings.npy (same files as the batch pipeline)."""
+        return self.index.save(index_path, chunk_path, embeddings_path)
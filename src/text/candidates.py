@@ -0,0 +1,164 @@
+import numpy as np
+from src.utils.config import Config
+from src.audio.excitement import segment_means
+from src.utils.intervals import sort_order, merge_groups, group_heads, reduce_groups
+
+# One row per candidate; text stays in the chunk list and is looked up by chunk_id on output
+CANDIDATE_DTYPE = np.dtype([
+    ("start", "f8"),
+    ("end", "f8"),
+    ("chunk_id", "i8"),
+    ("similarity", "f8"),
+    ("keyword", "f8"),
+    ("excitement", "f8"),
+    ("visual", "f8"),
+    ("score", "f8"),
+])
+SIGNALS = ("keyword", "excitement", "visual")
+
+
+def chunk_bounds(chunks):
+    """(starts, ends) float arrays over a chunk list, for vectorised lookups by chunk id."""
+    starts = np.fromiter((float(c["start"]) for c in chunks), dtype="f8", count=len(chunks))
+    ends = np.fromiter((float(c["end"]) for c in chunks), dtype="f8", count=len(chunks))
+    return starts, ends
+
+
+def default_weights():
+    """Fusion weights per signal column (keyword hits are already scaled by keyword_boost)."""
+    return {"keyword": 1.0, "excitement": Config.EXCITEMENT_WEIGHT, "visual": Config.VISUAL_WEIGHT}
+
+
+class CandidateTable:
+    """
+    Columnar candidate set: a NumPy structured array (CANDIDATE_DTYPE) plus
+    the chunk list it points into. Retrieval, signal fusion, dedup and
+    sorting work on whole columns; to_dicts() gives the usual
+    {"text", "start", "end", "score", "chunk_id"} dicts for JSON outputs.
+    """
+
+    __slots__ = ("rows", "chunks")
+
+    def __init__(self, rows, chunks=None):
+        self.rows = rows
+        self.chunks = chunks
+
+    def __len__(self):
+        return len(self.rows)
+
+    # -----------------------------------------------------------
+    # Construction
+    # -----------------------------------------------------------
+    @classmethod
+    def empty(cls, n, chunks=None):
+        rows = np.zeros(n, dtype=CANDIDATE_DTYPE)
+        rows["chunk_id"] = -1
+        return cls(rows, chunks)
+
+    @classmethod
+    def from_search(cls, ids, scores, chunks, min_cosine=0.15, bounds=None):
+        """
+        Union of FAISS hits (ids / scores of shape (queries, k)). Per query,
+        hits under min_cosine are dropped unless that leaves nothing; a chunk
+        found by several queries keeps its best similarity.
+        bounds: (starts, ends) arrays of every chunk, see chunk_bounds().
+        """
+        ids, scores = np.atleast_2d(ids), np.atleast_2d(scores)
+        valid = (ids >= 0) & (ids < len(chunks))
+        keep = valid & (scores >= min_cosine)
+        # Queries with nothing above the threshold fall back to all their hits
+        keep |= valid & ~keep.any(axis=1, keepdims=True)
+        flat_ids, flat_scores = ids[keep], scores[keep].astype("f8")
+
+        # Best score per chunk: sort by (id, -score) and take each id's first row
+        order = np.lexsort((-flat_scores, flat_ids))
+        flat_ids, flat_scores = flat_ids[order], flat_scores[order]
+        first = np.r_[True, flat_ids[1:] != flat_ids[:-1]] if len(flat_ids) else np.zeros(0, bool)
+
+        table = cls.empty(int(first.sum()), chunks)
+        table.rows["chunk_id"] = flat_ids[first]
+        table.rows["similarity"] = table.rows["score"] = flat_scores[first]
+        starts, ends = chunk_bounds(chunks) if bounds is None else bounds
+        table.rows["start"] = starts[table.rows["chunk_id"]]
+        table.rows["end"] = ends[table.rows["chunk_id"]]
+        return table
+
+    # -----------------------------------------------------------
+    # Column operations
+    # -----------------------------------------------------------
+    def texts(self):
+        return [self.chunks[i]["text"] if i >= 0 else "" for i in self.rows["chunk_id"]]
+
+    def set_signal(self, name, values):
+        self.rows[name] = values
+        return self
+
+    def sample_signal(self, name, curve):
+        """Fill a signal column with each segment's mean of a per-second curve."""
+        if curve is not None and len(self):
+            self.rows[name] = segment_means(curve, self.rows["start"], self.rows["end"])
+        return self
+
+    def fuse(self, weights=None):
+        """score = similarity + sum(weight x signal), in one pass over the columns."""
+        weights = default_weights() if weights is None else weights
+        score = self.rows["similarity"].copy()
+        for name, w in weights.items():
+            if w:
+                score += w * self.rows[name]
+        self.rows["score"] = score
+        return self
+
+    def merge_overlaps(self):
+        """
+        Chronological rows with overlapping ranges merged (same rule as
+        dedup_by_overlap): a merged row keeps the first row's chunk, the
+        furthest end and the best value of every score column.
+        """
+        if len(self) < 2:
+            return self.sort_by_start()
+        rows = self.rows[sort_order(self.rows["start"])]
+        heads = group_heads(merge_groups(rows["start"], rows["end"]))
+        merged = rows[heads].copy()
+        for name in ("end", "similarity") + SIGNALS + ("score",):
+            merged[name] = reduce_groups(rows[name], heads)
+        return CandidateTable(merged, self.chunks)
+
+    def suppress_overlaps(self, max_overlap=0.5):
+        """
+        Dedup for chunk sets that overlap by design (sliding windows): best
+        score first, a row is dropped when it overlaps an already kept row by
+        max_overlap of its own length or more. Unlike merge_overlaps, no row
+        is stretched, so every candidate's text and vector still match its
+        span. Returns chronological rows.
+        """
+        rows = self.rows[np.argsort(-self.rows["score"], kind="stable")]
+        starts, ends = rows["start"], rows["end"]
+        limits = max_overlap * np.maximum(ends - starts, 1e-9)
+        keep = np.zeros(len(rows), dtype=bool)
+        for i in range(len(rows)):
+            kept = np.flatnonzero(keep[:i])
+            overlap = np.minimum(ends[kept], ends[i]) - np.maximum(starts[kept], starts[i])
+            keep[i] = not len(kept) or overlap.max() < limits[i]
+        return CandidateTable(rows[keep], self.chunks).sort_by_start()
+
+    def sort_by_score(self):
+        order = np.argsort(-self.rows["score"], kind="stable")
+        return CandidateTable(self.rows[order], self.chunks)
+
+    def sort_by_start(self):
+        return CandidateTable(self.rows[sort_order(self.rows["start"])], self.chunks)
+
+    def head(self, n):
+        return CandidateTable(self.rows[:n], self.chunks)
+
+    # -----------------------------------------------------------
+    # Output
+    # -----------------------------------------------------------
+    def to_dicts(self):
+        """Dict view in the shape the JSON outputs and the LLM prompt expect."""
+        rows = self.rows
+        columns = zip(self.texts(), rows["start"].tolist(), rows["end"].tolist(), rows["score"].tolist(),
+                      rows["chunk_id"].tolist())
+        return [{"text": text, "start": start, "end": end, "score": score, "chunk_id": cid}
+                for text, start, end, score, cid in columns]
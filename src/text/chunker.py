@@ -1,24 +1,153 @@
 from typing import List, Dict
+import numpy as np
+from src.utils.config import Config
+from src.utils.intervals import as_arrays
 
+CHUNK_STRATEGIES = ("time", "sliding", "semantic")
 
-def merge_segments(segments, max_chunk=25.0, merge_gap=2.0):
-    chunks = []
-    cur = []
-    cur_start, cur_end = None, None
 
-    for seg in segments:
+class IncrementalChunker:
+    """
+    merge_segments() one segment at a time: add() returns the chunks that are
+    finished by the new segment, flush() returns the last open chunk.
+    """
+
+    def __init__(self, max_chunk=25.0, merge_gap=2.0):
+        self.max_chunk = max_chunk
+        self.merge_gap = merge_gap
+        self.cur = []
+        self.cur_start, self.cur_end = None, None
+
+    def add(self, seg):
+        done = []
         s, e, text = seg["start"], seg["end"], seg["text"]
-        if cur and (s - cur_end > merge_gap or e - cur_start > max_chunk):
-            chunks.append({"start": cur_start, "end": cur_end, "text": " ".join(cur)})
-            cur, cur_start = [], None
-        if cur_start is None:
-            cur_start = s
-        cur_end = e
-        cur.append(text)
-
-    if cur:
-        chunks.append({"start": cur_start, "end": cur_end, "text": " ".join(cur)})
-    return chunks
+        if self.cur and (s - self.cur_end > self.merge_gap or e - self.cur_start > self.max_chunk):
+            done.append(self._close())
+        if self.cur_start is None:
+            self.cur_start = s
+        self.cur_end = e
+        self.cur.append(text)
+        return done
+
+    def flush(self):
+        return [self._close()] if self.cur else []
+
+    def _close(self):
+        chunk = {"start": self.cur_start, "end": self.cur_end, "text": " ".join(self.cur)}
+        self.cur, self.cur_start = [], None
+        return chunk
+
+
+def iter_chunks(segments, max_chunk=25.0, merge_gap=2.0):
+    """Yield chunks as soon as they are complete, from any iterable of segments."""
+    chunker = IncrementalChunker(max_chunk, merge_gap)
+    for seg in segments:
+        yield from chunker.add(seg)
+    yield from chunker.flush()
+
+
+def merge_segments(segments, max_chunk=25.0, merge_gap=2.0):
+    return list(iter_chunks(segments, max_chunk, merge_gap))
+
+
+# -----------------------------------------------------------
+# Sliding-window and semantic chunking on segment embeddings
+# -----------------------------------------------------------
+def sliding_spans(starts, ends, window, stride):
+    """
+    (first, stop) segment ranges of windows `window` seconds long, one every
+    `stride` seconds. A window holds the segments starting inside it (at
+    least one); windows with the same members are kept once.
+    """
+    t = np.arange(starts[0], ends.max(), stride)
+    first = np.searchsorted(starts, t, side="left")
+    stop = np.maximum(np.searchsorted(starts, t + window, side="left"), first + 1)
+    keep = first < len(starts)
+    first, stop = first[keep], stop[keep]
+    new = np.r_[True, (first[1:] != first[:-1]) | (stop[1:] != stop[:-1])]
+    return list(zip(first[new].tolist(), stop[new].tolist()))
+
+
+def semantic_spans(starts, ends, vectors, max_chunk=25.0, merge_gap=2.0, min_chunk=5.0, drop=0.5):
+    """
+    (first, stop) segment ranges split where the cosine similarity of adjacent
+    segments falls `drop` std below its mean (a topic shift), once the chunk
+    is min_chunk seconds long. Gaps over merge_gap and max_chunk still split
+    as in merge_segments.
+    """
+    n = len(starts)
+    sims = np.einsum("ij,ij->i", vectors[1:], vectors[:-1])
+    cutoff = sims.mean() - drop * sims.std() if len(sims) else 0.0
+    shift = np.r_[False, sims < cutoff].tolist()
+    gap = np.r_[False, starts[1:] - ends[:-1] > merge_gap].tolist()
+    starts, ends = starts.tolist(), ends.tolist()
+    spans, first = [], 0
+    for i in range(1, n):
+        if (gap[i] or ends[i] - starts[first] > max_chunk
+                or (shift[i] and ends[i - 1] - starts[first] >= min_chunk)):
+            spans.append((first, i))
+            first = i
+    spans.append((first, n))
+    return spans
+
+
+def pool_chunks(segments, vectors, spans):
+    """Chunk dicts for segment ranges plus their mean-pooled, re-normalised segment vectors."""
+    chunks = [{
+        "start": segments[a]["start"],
+        "end": segments[b - 1]["end"],
+        "text": " ".join(seg["text"] for seg in segments[a:b]),
+    } for a, b in spans]
+    cumulative = np.vstack([np.zeros((1, vectors.shape[1]), dtype="float64"), np.cumsum(vectors, axis=0, dtype="float64")])
+    first, stop = np.array(spans).T
+    pooled = cumulative[stop] - cumulative[first]
+    pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+    return chunks, pooled.astype("float32")
+
+
+def chunk_signature(strategy=None):
+    """Cache-key part for the chunking strategy ("time" keeps the previous keys)."""
+    strategy = (strategy or Config.CHUNK_STRATEGY).lower()
+    if strategy == "sliding":
+        params = (Config.CHUNK_WINDOW_SECONDS, Config.CHUNK_STRIDE_SECONDS)
+    elif strategy == "semantic":
+        params = (Config.CHUNK_SPLIT_DROP, Config.CHUNK_MIN_SECONDS)
+    else:
+        return strategy
+    # Segment vectors come from the embedder, so it is part of the chunking
+    from src.utils.model_cache import ModelCache
+    backend = ModelCache.embed_backend(Config.EMBED_MODEL)
+    return ":".join(map(str, (strategy,) + params + (Config.EMBED_MODEL, backend)))
+
+
+def chunk_transcript(segments, strategy=None, embedder=None, max_chunk=None, merge_gap=None):
+    """
+    Chunk Whisper segments with CHUNK_STRATEGY. Returns (chunks, vectors):
+    "sliding" and "semantic" embed every segment once in a batch and return
+    the pooled chunk vectors, so the chunks need no second encoding pass;
+    "time" returns None and the chunks are embedded as before.
+    """
+    strategy = (strategy or Config.CHUNK_STRATEGY).lower()
+    if strategy not in CHUNK_STRATEGIES:
+        raise ValueError(f"Unknown chunk strategy '{strategy}', expected one of {CHUNK_STRATEGIES}")
+    max_chunk = Config.CHUNK_MAX_SECONDS if max_chunk is None else max_chunk
+    merge_gap = Config.CHUNK_MERGE_GAP if merge_gap is None else merge_gap
+    if strategy == "time" or not segments:
+        return merge_segments(segments, max_chunk, merge_gap), None
+
+    from src.utils.model_cache import ModelCache
+    from src.text.embedding_builder import encode_texts
+    embedder = embedder or ModelCache.load_embedder(model_name=Config.EMBED_MODEL)
+    vectors = encode_texts(embedder, [seg["text"] for seg in segments])
+    starts, ends = as_arrays(segments)
+    if strategy == "sliding":
+        spans = sliding_spans(starts, ends, Config.CHUNK_WINDOW_SECONDS, Config.CHUNK_STRIDE_SECONDS)
+    else:
+        spans = semantic_spans(starts, ends, vectors, max_chunk, merge_gap,
+                               Config.CHUNK_MIN_SECONDS, Config.CHUNK_SPLIT_DROP)
+    chunks, pooled = pool_chunks(segments, vectors, spans)
+    print(f"🧩 {strategy} chunking: {len(segments)} segments → {len(chunks)} chunks")
+    return chunks, pooled
 
 
 # def merge_segments(segments: List[Dict], chunk_seconds: float = 15.0) -> List[Dict]:
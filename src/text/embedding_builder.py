@@ -5,22 +5,121 @@ import faiss
 from src.utils.model_cache import ModelCache
 from src.utils.config import Config
 
-def build_embeddings(chunk_path):
-    # if embedder is None:
-    #     embedder = SentenceTransformer("all-MiniLM-L6-v2")
-    embedder = ModelCache.load_embedder(model_name="all-mpnet-base-v2")
-
-    with open(chunk_path, "r", encoding="utf-8") as f:
-        chunks = json.load(f)
-
-    print(f"Loaded {len(chunks)} chunks for embedding")
-    texts = [c["text"] for c in chunks]
-    # embeddings = embedder.encode(texts, convert_to_numpy=True, show_progress_bar=True, normalize_embeddings=False)
-    embeddings = embedder.encode(texts)
-    embeddings = np.array(embeddings, dtype="float32")
-    faiss.normalize_L2(embeddings)
+def encode_texts(embedder, texts, batch_size=None):
+    """
+    Encode texts into L2-normalised float32 vectors, EMBED_BATCH_SIZE at a time.
+    SentenceTransformer.encode sorts the texts by length before batching, so
+    every batch pads to similar lengths; rows come back in input order.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype="float32")
+    vectors = embedder.encode(list(texts), batch_size=batch_size or Config.EMBED_BATCH_SIZE,
+                              convert_to_numpy=True, show_progress_bar=False)
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def build_embeddings(chunk_path, index_path=None, embeddings_path=None, model_name=None, embeddings=None):
+    """
+    Embed every chunk and write a FAISS inner-product index to index_path.
+    The normalised embedding matrix is also saved to embeddings_path (.npy) when given.
+    Precomputed chunk vectors (e.g. pooled by chunk_transcript) skip the embedder.
+    """
+    if index_path is None:
+        index_path = os.path.join(Config.PROCESSED_DIR, "faiss_index.bin")
+
+    if embeddings is None:
+        # if embedder is None:
+        #     embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        embedder = ModelCache.load_embedder(model_name=model_name or Config.EMBED_MODEL)
+
+        with open(chunk_path, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+
+        print(f"Loaded {len(chunks)} chunks for embedding")
+        texts = [c["text"] for c in chunks]
+        # embeddings = embedder.encode(texts, convert_to_numpy=True, show_progress_bar=True, normalize_embeddings=False)
+        embeddings = encode_texts(embedder, texts)
+    else:
+        print(f"Indexing {len(embeddings)} precomputed chunk vectors")
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
     index = faiss.IndexFlatIP(embeddings.shape[1])
     index.add(embeddings)
-    faiss.write_index(index, os.path.join(Config.PROCESSED_DIR, "faiss_index.bin"))
-    print("FAISS index saved at data/processed/faiss_index.bin")
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    faiss.write_index(index, index_path)
+    print(f"FAISS index saved at {index_path}")
+    if embeddings_path:
+        np.save(embeddings_path, embeddings)
+    return index_path
+
+
+
+class IncrementalIndex:
+    """
+    A FAISS inner-product index that grows while the transcript is still
+    being produced: add() embeds finished chunks in micro-batches and appends
+    them, so the index is queryable at any point. save() writes the same
+    files as build_embeddings().
+    """
+
+    def __init__(self, model_name=None, batch_size=16):
+        self.model_name = model_name or Config.EMBED_MODEL
+        self.embedder = ModelCache.load_embedder(model_name=self.model_name)
+        self.batch_size = batch_size
+        self.index = None
+        self.chunks = []
+        self.pending = []
+        self._vectors = []
+
+    def add(self, chunks):
+        """Queue chunks and embed every full micro-batch. Returns the number of chunks indexed."""
+        self.pending.extend(chunks)
+        added = 0
+        while len(self.pending) >= self.batch_size:
+            added += self._embed(self.batch_size)
+        return added
+
+    def flush(self):
+        """Embed whatever is still queued."""
+        return self._embed(len(self.pending)) if self.pending else 0
+
+    def _embed(self, n):
+        batch, self.pending = self.pending[:n], self.pending[n:]
+        vectors = encode_texts(self.embedder, [c["text"] for c in batch])
+        if self.index is None:
+            self.index = faiss.IndexFlatIP(vectors.shape[1])
+        self.index.add(vectors)
+        self.chunks.extend(batch)
+        self._vectors.append(vectors)
+        return len(batch)
+
+    @property
+    def embeddings(self):
+        """Normalised vectors of every indexed chunk, row i = self.chunks[i]."""
+        if len(self._vectors) > 1:
+            self._vectors = [np.concatenate(self._vectors)]
+        return self._vectors[0] if self._vectors else None
+
+    def session(self):
+        """A RetrievalSession over what has been indexed so far (None while empty)."""
+        from src.text.highlight_selector import RetrievalSession
+        if self.index is None:
+            return None
+        return RetrievalSession(self.index, list(self.chunks), self.model_name,
+                                embedder=self.embedder, embeddings=self.embeddings)
 
+    def save(self, index_path, chunk_path=None, embeddings_path=None):
+        """Flush and write the index (plus chunks.json / embeddings.npy when paths are given)."""
+        self.flush()
+        if self.index is None:
+            raise ValueError("No chunks were indexed.")
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        faiss.write_index(self.index, index_path)
+        if chunk_path:
+            with open(chunk_path, "w", encoding="utf-8") as f:
+                json.dump(self.chunks, f, indent=2)
+        if embeddings_path:
+            np.save(embeddings_path, self.embeddings)
+        print(f"FAISS index saved at {index_path} ({self.index.ntotal} chunks)")
+        return index_path
@@ -1,15 +1,21 @@
 import os
 import json
+import time
 import faiss
 from string import Template
-from openai import OpenAI
-from sentence_transformers import SentenceTransformer
 from src.utils.config import Config
+from src.utils.model_cache import ModelCache
+from src.text.embedding_builder import encode_texts
+from src.text.llm_client import complete_json, LLMError
+from src.text.local_ranker import rerank_local
+from src.audio.excitement import segment_means
+from src.text.candidates import CandidateTable, chunk_bounds
+from src.text.keywords import KEYWORD_BOOST, get_matcher
+from src.utils.intervals import as_arrays, sort_order, merge as merge_intervals, reduce_groups, join_groups
 import numpy as np
 from datetime import datetime
 
 
-client = OpenAI(api_key=Config.OPENAI_API_KEY)
 # -----------------------------------------------------------
 # Utility functions
 # -----------------------------------------------------------
@@ -33,78 +39,196 @@ def load_chunks(chunk_path):
 # Step 1 - Semantic retrieval
 # -----------------------------------------------------------
 
+class RetrievalSession:
+    """
+    Retrieval state for one job: the embedder (shared through ModelCache),
+    the FAISS index and the chunk list are loaded once, then reused by every
+    query and by MMR instead of being rebuilt / re-read per call.
+    """
+
+    def __init__(self, index, chunks, model_name="all-mpnet-base-v2", embedder=None, embeddings=None):
+        self.index = index
+        self.chunks = chunks
+        self.model_name = model_name
+        self.embedder = embedder if embedder is not None else ModelCache.load_embedder(model_name)
+        self._embeddings = embeddings
+        self._bounds = None
+        self._overlapping = None
+        self._keyword_scores = {}
+
+    @classmethod
+    def from_paths(cls, index_path=None, chunk_path=None, model_name="all-mpnet-base-v2", embeddings_path=None):
+        """
+        Open a job's index + chunks. Jobs pass their own workspace paths; the defaults are the CLI's shared files.
+        The chunk embedding matrix is read from embeddings_path (default: embeddings.npy next to the index).
+        """
+        if index_path is None:
+            index_path = os.path.join(Config.PROCESSED_DIR, "faiss_index.bin")
+        if chunk_path is None:
+            chunk_path = os.path.join(Config.PROCESSED_DIR, "chunks.json")
+        if embeddings_path is None:
+            embeddings_path = os.path.join(os.path.dirname(index_path), "embeddings.npy")
+
+        index = load_index(index_path)
+        embeddings = None
+        if os.path.exists(embeddings_path):
+            embeddings = np.load(embeddings_path)
+            if embeddings.shape[0] != index.ntotal:
+                print(f"⚠️ Ignoring stale embeddings ({embeddings.shape[0]} rows vs {index.ntotal} in index)")
+                embeddings = None
+        return cls(index, load_chunks(chunk_path), model_name, embeddings=embeddings)
+
+    @property
+    def embeddings(self):
+        """Normalised chunk vectors, row i = chunk i (reconstructed from the index if not persisted)."""
+        if self._embeddings is None:
+            self._embeddings = self.index.reconstruct_n(0, self.index.ntotal)
+        return self._embeddings
+
+    @property
+    def bounds(self):
+        """(starts, ends) arrays of every chunk, for columnar candidate tables."""
+        if self._bounds is None:
+            self._bounds = chunk_bounds(self.chunks)
+        return self._bounds
+
+    @property
+    def overlapping(self):
+        """True when chunks overlap in time (CHUNK_STRATEGY=sliding windows)."""
+        if self._overlapping is None:
+            starts, ends = self.bounds
+            order = sort_order(starts)
+            reach = np.maximum.accumulate(ends[order])[:-1]
+            self._overlapping = bool(np.any(starts[order][1:] < reach - 1e-6))
+        return self._overlapping
+
+    def keyword_scores(self, keywords=None):
+        """
+        Keyword weight sum of every chunk for a profile / keyword set, scored
+        in bulk on the first query that uses it (the profile is chosen per
+        request, so nothing is scored at index-build time) and then a lookup
+        by chunk id for the life of the session.
+        """
+        matcher = get_matcher(keywords)
+        scores = self._keyword_scores.get(matcher)
+        if scores is None:
+            scores = self._keyword_scores[matcher] = matcher.score_many([c["text"] for c in self.chunks])
+        return scores
+
+    def encode(self, texts):
+        """Encode texts into L2-normalised float32 vectors."""
+        return encode_texts(self.embedder, texts)
+
+    def _search(self, queries, top_k, dynamic_topk):
+        """One batched index.search over all query vectors -> (D, I)."""
+        if dynamic_topk:
+            top_k = max(8, min(50, int((len(self.chunks) ** 0.5) * 2)))
+        print(f"Querying top {top_k} relevant transcript chunks for {len(queries)} queries...")
+        D, I = self.index.search(self.encode(list(queries)), top_k)
+        print(f"🔍 Cosine score sample: {D[0][:10]}")
+        return D, I
+
+    def search_many(self, queries, top_k=10, min_cosine=0.15, dynamic_topk=True):
+        """
+        Encode all queries in one batch and run a single index.search over the
+        query matrix. Returns one result list per query.
+        """
+        D, I = self._search(queries, top_k, dynamic_topk)
+        return [self._collect(I[q], D[q], min_cosine) for q in range(len(queries))]
+
+    def candidate_table(self, queries, top_k=10, min_cosine=0.15, dynamic_topk=True):
+        """
+        Union of the hits of all queries as a CandidateTable. Overlapping hits
+        are merged, except over overlapping chunks (sliding windows) where
+        merging would chain whole runs of windows: there the best of each
+        mostly-overlapping set of windows is kept instead.
+        """
+        D, I = self._search(queries, top_k, dynamic_topk)
+        table = CandidateTable.from_search(I, D, self.chunks, min_cosine, bounds=self.bounds)
+        print(f"🔹 Before dedup: {len(table)} unique chunks")
+        table = table.suppress_overlaps() if self.overlapping else table.merge_overlaps()
+        print(f"🔹 After dedup: {len(table)} kept")
+        return table
+
+    def _collect(self, ids, scores, min_cosine):
+        chunks = self.chunks
+        hits = [(int(idx), float(score)) for idx, score in zip(ids, scores) if 0 <= idx < len(chunks)]
+        # FAISS returns *similarity* since the index is normalized
+        results = [(idx, score) for idx, score in hits if score >= min_cosine]
+        if len(results) == 0:
+            print(f"⚠️ No results above cosine threshold {min_cosine}. Returning top_k fallback.")
+            # ✅ Always append fallback even if threshold logic misfires
+            results = hits
+        print(f"Retrieved {len(results)} candidate segments.")
+        return [{
+            "text": chunks[idx]["text"],
+            "start": float(chunks[idx]["start"]),
+            "end": float(chunks[idx]["end"]),
+            "score": score,
+            "chunk_id": idx,
+        } for idx, score in results]
+
+    def query(self, query, top_k=10, min_cosine=0.15, dynamic_topk=True):
+        """Get top_k most semantically similar transcript chunks."""
+        return self.search_many([query], top_k=top_k, min_cosine=min_cosine, dynamic_topk=dynamic_topk)[0]
+
+    def multi_query_union(self, queries, top_k, min_cosine=0.15):
+        all_cands = []
+        for results in self.search_many(queries, top_k=top_k, min_cosine=min_cosine):
+            all_cands += results
+        return dedup_by_overlap(all_cands)
+
+    def candidate_vectors(self, candidates):
+        """
+        Stored chunk vectors for candidates carrying a chunk_id; only candidates
+        without one (e.g. LLM-edited segments) are encoded again.
+        """
+        E = np.empty((len(candidates), self.index.d), dtype="float32")
+        missing = []
+        for i, c in enumerate(candidates):
+            cid = c.get("chunk_id")
+            if cid is not None and 0 <= cid < self.index.ntotal:
+                E[i] = self.embeddings[cid]
+            else:
+                missing.append(i)
+        if missing:
+            E[missing] = self.encode([candidates[i]["text"] for i in missing])
+        return E
+
+    def mmr(self, candidates, lambda_=0.7, max_items=12):
+        if not candidates:
+            return []
+        return mmr_diversify(candidates, lambda_=lambda_, max_items=max_items,
+                             embeddings=self.candidate_vectors(candidates))
+
+
 def query_similar_chunks(query, top_k=10, index_path=None, chunk_path=None,
-                         min_cosine=0.15, dynamic_topk=True, model_name: str = "all-mpnet-base-v2"):#"all-MiniLM-L6-v2"
+                         min_cosine=0.15, dynamic_topk=True, model_name: str = "all-mpnet-base-v2",
+                         session=None):#"all-MiniLM-L6-v2"
     """
     Get top_k most semantically similar transcript chunks.
-    Dynamically loads the correct FAISS index and chunk file.
+    Pass an open RetrievalSession to avoid reloading the index and chunks.
     """
-    if index_path is None:
-        index_path = "data/processed/faiss_index.bin"
-    if chunk_path is None:
-        chunk_path = "data/processed/chunks.json"
-
-    print(f"Querying top {top_k} relevant transcript chunks...")
-    model = SentenceTransformer(model_name)
-
-    index = load_index(index_path)
-    chunks = load_chunks(chunk_path)
-    q_emb = model.encode([query])
-    q_emb = np.array(q_emb, dtype="float32")
-    # q_emb = model.encode([query], convert_to_numpy=True, normalize_embeddings=False)
-    faiss.normalize_L2(q_emb)
-
-    if dynamic_topk:
-        top_k = max(8, min(50, int((len(chunks) ** 0.5) * 2)))
-    
-    D, I = index.search(q_emb, top_k)
-    print(f"🔍 Cosine score sample: {D[0][:10]}")
-    results = []
-    # print(f"⚠️ No results above cosine threshold {min_cosine}. Returning top_k fallback.")
-    for idx, score in zip(I[0], D[0]):
-        if idx < 0 or idx >= len(chunks):
-            continue
-        # FAISS returns *similarity* if index is normalized; else convert to cosine-ish
-        cosine = float(score)
-        if cosine >= min_cosine:
-            c = chunks[idx]
-            results.append({
-                "text": c["text"],
-                "start": float(c["start"]),
-                "end": float(c["end"]),
-                "score": cosine
-            })
-    if len(results) == 0:
-        print(f"⚠️ No results above cosine threshold {min_cosine}. Returning top_k fallback.")
-        # ✅ Always append fallback even if threshold logic misfires
-        for idx, score in zip(I[0], D[0]):
-            if 0 <= idx < len(chunks):
-                c = chunks[idx]
-                results.append({
-                    "text": c["text"],
-                    "start": float(c["start"]),
-                    "end": float(c["end"]),
-                    "score": float(score)
-                })
-                # results.append({
-            #     "text": chunks[idx]["text"],
-            #     "start": chunks[idx]["start"],
-            #     "end": chunks[idx]["end"],
-            #     "score": float(score)
-            # })
-    print(f"Retrieved {len(results)} candidate segments.")
-    return results
+    if session is None:
+        session = RetrievalSession.from_paths(index_path, chunk_path, model_name)
+    return session.query(query, top_k=top_k, min_cosine=min_cosine, dynamic_topk=dynamic_topk)
 
-def mmr_diversify(candidates, embedder=None, lambda_=0.7, max_items=12):
-    """Re-rank candidates using Maximal Marginal Relevance (diversity)."""
+def mmr_diversify(candidates, embedder=None, lambda_=0.7, max_items=12, embeddings=None):
+    """
+    Re-rank candidates using Maximal Marginal Relevance (diversity).
+    Pass `embeddings` (normalised, one row per candidate) to skip re-encoding.
+    Picks come back chronological, each with its MMR pick order as "mmr_rank".
+    """
     if not candidates:
         return []
-    texts = [c["text"] for c in candidates]
-    if embedder is None:
-        embedder = SentenceTransformer("all-mpnet-base-v2")
-    # print("🔍 Type of embedder:", type(embedder))
-    E = embedder.encode(texts)#, convert_to_numpy=True, normalize_embeddings=True
-    faiss.normalize_L2(E)
+    if embeddings is not None:
+        E = embeddings
+    else:
+        texts = [c["text"] for c in candidates]
+        if embedder is None:
+            embedder = ModelCache.load_embedder("all-mpnet-base-v2")
+        E = np.array(embedder.encode(texts), dtype="float32")#, convert_to_numpy=True, normalize_embeddings=True
+        faiss.normalize_L2(E)
 
     selected_idx = []
     remaining = set(range(len(candidates)))
@@ -123,17 +247,16 @@ def mmr_diversify(candidates, embedder=None, lambda_=0.7, max_items=12):
         selected_idx.append(pick_global)
         remaining.remove(pick_global)
 
-    selected = [candidates[i] for i in selected_idx]
+    selected = [dict(candidates[i], mmr_rank=rank) for rank, i in enumerate(selected_idx)]
     return sorted(selected, key=lambda x: x["start"])
 # ---------------------------------------------------------------------
 # Keyword boost
 # ---------------------------------------------------------------------
-def keyword_boost(text, keywords):
-    t = text.lower()
-    boost = sum(1.0 for k in keywords if k in t)
-    return 0.05 * boost  # 5% per keyword hit
+def keyword_boost(text, keywords=None):
+    """5% per unit of keyword weight; keywords = profile name, term list / dict or KeywordMatcher."""
+    return KEYWORD_BOOST * get_matcher(keywords).score(text)
 
-def apply_keyword_boost(results, keywords):
+def apply_keyword_boost(results, keywords=None):
     if not results:
         return []
     for r in results:
@@ -141,18 +264,33 @@ def apply_keyword_boost(results, keywords):
     results.sort(key=lambda x: x["score"], reverse=True)
     return results
 
+def apply_signal_boost(results, curve, weight):
+    """Add weight x the segment's mean value of a per-second signal curve to each score."""
+    if not results or curve is None or not weight:
+        return results
+    boost = segment_means(curve, [r["start"] for r in results], [r["end"] for r in results])
+    for r, b in zip(results, boost):
+        r["score"] += weight * float(b)
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results
+
+def apply_excitement_boost(results, excitement, weight=None):
+    """Fuse the per-second audio excitement curve into the scores."""
+    return apply_signal_boost(results, excitement, Config.EXCITEMENT_WEIGHT if weight is None else weight)
+
+def apply_visual_boost(results, visual, weight=None):
+    """Fuse the per-second visual activity curve (motion + shot cuts) into the scores."""
+    return apply_signal_boost(results, visual, Config.VISUAL_WEIGHT if weight is None else weight)
+
 # Multi-query retrieval (E)
 def multi_query_union(queries, top_k, index_path, chunk_path,
-                      min_cosine=0.15, embed_model="all-mpnet-base-v2"):
-    all_cands = []
-    for q in queries:
-        all_cands += query_similar_chunks(
-            q, top_k=top_k,
-            index_path=index_path,
-            chunk_path=chunk_path,
-            min_cosine=min_cosine,
-            model_name=embed_model
-        )
+                      min_cosine=0.15, embed_model="all-mpnet-base-v2", session=None):
+    if session is None:
+        session = RetrievalSession.from_paths(index_path, chunk_path, embed_model)
+    return session.multi_query_union(queries, top_k=top_k, min_cosine=min_cosine)
+
+
+def dedup_by_overlap(all_cands):
     print(f"🔹 Before dedup: {len(all_cands)} total candidates")
     # de-duplicate by temporal overlap (~1s gap)
     all_cands.sort(key=lambda x: (x["start"]))#-x["score"],
@@ -199,6 +337,8 @@ def clean_segments(highlights, min_duration=1.0, merge_short=True):
                 "text": s.get("text", ""),
                 "score": s.get("score", 0)
             })
+            if "mmr_rank" in s:
+                cleaned[-1]["mmr_rank"] = s["mmr_rank"]
 
     if not cleaned:
         print("⚠️ No valid segments after cleaning.")
@@ -207,17 +347,20 @@ def clean_segments(highlights, min_duration=1.0, merge_short=True):
     # 2️⃣ Sort chronologically
     cleaned.sort(key=lambda x: x["start"])
 
-    # 3️⃣ Merge very close short clips (optional)
+    # 3️⃣ Merge very close short clips (optional): gaps under 1s
     if merge_short:
-        merged = [cleaned[0]]
-        for seg in cleaned[1:]:
-            # If gap between clips is small (<1s), merge them
-            if seg["start"] - merged[-1]["end"] < 1.0:
-                merged[-1]["end"] = max(merged[-1]["end"], seg["end"])
-                merged[-1]["score"] = max(merged[-1]["score"], seg["score"])
-                merged[-1]["text"] += " " + seg.get("text", "")
-            else:
-                merged.append(seg)
+        starts, ends = as_arrays(cleaned)
+        _, merged_ends, heads = merge_intervals(starts, ends, gap=1.0, strict=True)
+        scores = reduce_groups([seg["score"] for seg in cleaned], heads)
+        texts = join_groups([seg["text"] for seg in cleaned], heads)
+        merged = [dict(cleaned[h], end=e, score=sc, text=t)
+                  for h, e, sc, t in zip(heads.tolist(), merged_ends.tolist(), scores.tolist(), texts)]
+        if any("mmr_rank" in seg for seg in cleaned):
+            # A merged clip keeps its earliest MMR pick; unranked clips sort after every pick
+            unranked = max(seg.get("mmr_rank", -1) for seg in cleaned) + 1
+            ranks = reduce_groups([seg.get("mmr_rank", unranked) for seg in cleaned], heads, np.minimum)
+            for seg, rank in zip(merged, ranks.tolist()):
+                seg["mmr_rank"] = rank
         cleaned = merged
 
     print(f"🧹 Cleaned {len(cleaned)} segments (min_dur={min_duration}s, merged={merge_short})")
@@ -232,12 +375,21 @@ def generate_candidate_highlights(
     chunk_path,
     embed_model="all-mpnet-base-v2",#"all-MiniLM-L6-v2",
     top_k=30,
-    target_duration=60
+    target_duration=60,
+    session=None,
+    excitement=None,
+    visual=None,
+    keyword_profile=None
 ):
     """
     High-level pipeline combining multi-query, keyword boost, and MMR.
     Returns clean, diverse candidate highlights.
+    The model, index and chunks are loaded once and shared by every step.
+    excitement / visual: optional per-second audio excitement and visual activity
+    curves fused into the scores. keyword_profile defaults to KEYWORD_PROFILE.
     """
+    if session is None:
+        session = RetrievalSession.from_paths(index_path, chunk_path, embed_model)
 
     print("🚀 Starting semantic highlight candidate generation...")
 
@@ -251,30 +403,20 @@ def generate_candidate_highlights(
         "wickets and catches",
         "loud voices and cheers",
     ]
-    results = multi_query_union(
-        queries, top_k=top_k,
-        index_path=index_path,
-        chunk_path=chunk_path,
-        min_cosine=0.15,
-        embed_model=embed_model
-    )
-    print(f"🔸 Total retrieved (multi-query): {len(results)}")
+    table = session.candidate_table(queries, top_k=top_k, min_cosine=0.15)
+    print(f"🔸 Total retrieved (multi-query): {len(table)}")
 
     # ---- Step 2: Keyword boosting ----
-    KEYWORDS = [
-        "exicement", "amazing", "incredible", "unbelievable", "dramatic",
-        "goal", "score", "touchdown", "home run", "emotional", "missed",
-        "highlight", "clutch", "comeback", "record", "championship", "centuary"
-        "six", "four", "wicket", "appeal", "catch", "review",
-        "out", "boundary", "milestone", "hundred", "fifty",
-        "target", "win", "pressure", "decision", "goal",
-        "achievement", "success", "deadline", "important", "dropped", "unplayable"
-    ]
-    boosted = apply_keyword_boost(results, KEYWORDS)
-    print(f"🔸 After keyword boost: {len(boosted)}")
+    # Every chunk is scored once per profile (src/prompts/keyword_profiles.json); here it is a lookup.
+    # Keyword hits, audio excitement and visual activity are fused in one columnar pass.
+    keyword_scores = session.keyword_scores(keyword_profile)
+    table.set_signal("keyword", KEYWORD_BOOST * keyword_scores[table.rows["chunk_id"]])
+    table.sample_signal("excitement", excitement).sample_signal("visual", visual)
+    boosted = table.fuse().sort_by_score().to_dicts()
+    print(f"🔸 After keyword / signal fusion: {len(boosted)}")
 
     # ---- Step 3: MMR diversification ----
-    diverse = mmr_diversify(boosted, lambda_=0.7, max_items=15)
+    diverse = session.mmr(boosted, lambda_=0.7, max_items=15)
     print(f"🔸 After MMR diversification: {len(diverse)}")
 
     # ---- Step 4: Clean up segments ----
@@ -332,32 +474,120 @@ def load_prompt(template_name="highlight_prompt.txt"):
 # Step 3 - Re-rank with LLM
 # -----------------------------------------------------------
 
-def rerank_with_llm(results, custom_prompt, target_duration=60, template_name="highlight_prompt.txt"):
+COMPACT_TEMPLATE = "highlight_prompt_compact.txt"
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def encode_candidates(results, token_budget=None):
     """
-    Uses LLM to re-select highlight-worthy segments
-    based on user's creative instructions.
+    Compact one-line-per-candidate encoding for the LLM: short integer id,
+    rounded times and transcript text trimmed so the whole block fits in
+    about token_budget tokens. Line id i refers to results[i].
     """
+    token_budget = token_budget or Config.LLM_CANDIDATE_TOKENS
+    if not results:
+        return ""
+    # Split the budget evenly; ~12 tokens of each line go to the id and times
+    max_chars = max(40, (token_budget // len(results) - 12) * 4)
+    lines = []
+    for i, r in enumerate(results):
+        text = " ".join(str(r.get("text", "")).split())
+        if len(text) > max_chars:
+            text = text[:max_chars - 1].rstrip() + "…"
+        lines.append(f"{i}|{float(r['start']):.1f}-{float(r['end']):.1f}|{text}")
+    return "\n".join(lines)
+
+
+def decode_selection(data, results):
+    """Map the LLM's {"ids": [...]} answer back to the original segments (unknown / repeated ids dropped)."""
+    ids = data.get("ids") if isinstance(data, dict) else data
+    if not isinstance(ids, list):
+        return None
+    picked, seen = [], set()
+    for i in ids:
+        try:
+            i = int(i)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= i < len(results) and i not in seen:
+            seen.add(i)
+            picked.append(results[i])
+    return picked or None
+
+
+def log_llm_usage(job_id, mode, n_candidates, prompt_tokens, full_tokens, latency_ms, output_dir=None):
+    """Append estimated prompt tokens (vs the full JSON prompt) and latency per rerank call."""
+    import csv
+    output_dir = output_dir or Config.PROCESSED_DIR
+    path = os.path.join(output_dir, "llm_usage.csv")
+    file_exists = os.path.exists(path)
+    os.makedirs(output_dir, exist_ok=True)
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(["timestamp", "job_id", "mode", "candidates", "prompt_tokens", "full_prompt_tokens",
+                             "latency_ms"])
+        writer.writerow([datetime.now().isoformat(), job_id or "", mode, n_candidates, prompt_tokens,
+                         full_tokens, round(latency_ms, 1)])
+
+
+def fill_full_prompt(results, custom_prompt, target_duration, template_name="highlight_prompt.txt"):
     template = load_prompt(template_name)
-    results_json = json.dumps(results, indent=2)
+    results_json = json.dumps(results, indent=2, default=float)
 
-    filled_prompt = template.substitute(
+    return template.substitute(
         target_duration=target_duration,
         custom_prompt=custom_prompt,
         results_json=results_json
     )
 
+
+def rerank_with_llm(results, custom_prompt, target_duration=60, template_name=None, job_id=None):
+    """
+    Uses LLM to re-select highlight-worthy segments
+    based on user's creative instructions.
+    With LLM_PROMPT_MODE=compact (default) candidates are sent as short id
+    lines and the LLM answers with ids only; "full" sends the JSON segments
+    using template_name.
+    """
+    if not results:
+        return results
+    full_prompt = fill_full_prompt(results, custom_prompt, target_duration, template_name or "highlight_prompt.txt")
+    if Config.LLM_PROMPT_MODE == "compact":
+        filled_prompt = load_prompt(COMPACT_TEMPLATE).substitute(
+            target_duration=target_duration,
+            custom_prompt=custom_prompt,
+            candidates=encode_candidates(results),
+        )
+    else:
+        filled_prompt = full_prompt
+    prompt_tokens, full_tokens = estimate_tokens(filled_prompt), estimate_tokens(full_prompt)
+    print(f"📝 Prompt ≈{prompt_tokens} tokens ({Config.LLM_PROMPT_MODE}; full JSON would be ≈{full_tokens})")
+
     print(f"🧠 Calling LLM for creative highlight selection...")
     # print(filled_prompt)
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": filled_prompt}],
-        response_format={"type": "json_object"}
-    )
-
+    t0 = time.perf_counter()
     try:
-        raw = response.choices[0].message.content
-        data = json.loads(raw)
+        data = complete_json(filled_prompt)
+    except LLMError as e:
+        print(f"⚠️ LLM unavailable ({e}), keeping the retrieval ranking.")
+        return results
+    finally:
+        log_llm_usage(job_id, Config.LLM_PROMPT_MODE, len(results), prompt_tokens, full_tokens,
+                      (time.perf_counter() - t0) * 1000)
+
+    if Config.LLM_PROMPT_MODE == "compact":
+        picked = decode_selection(data, results)
+        if picked is None:
+            print("⚠️ Unexpected format from LLM, using fallback results.")
+            return results
+        return picked
 
+    try:
         # unwrap possible nesting keys
         if isinstance(data, dict):
             for key in ["segments", "selected_segments", "highlights"]:
@@ -378,3 +608,19 @@ def rerank_with_llm(results, custom_prompt, target_duration=60, template_name="h
     except Exception as e:
         print(f"⚠️ Parsing fallback due to error: {e}")
         return results
+
+
+# -----------------------------------------------------------
+# Step 4 - Pick the rerank backend
+# -----------------------------------------------------------
+RERANK_BACKENDS = ("llm", "local")
+
+
+def rerank_segments(results, custom_prompt, target_duration=60, backend=None, job_id=None):
+    """Rerank with the LLM or, for backend="local", offline scoring (custom_prompt is unused there)."""
+    backend = (backend or Config.RERANK_BACKEND).lower()
+    if backend not in RERANK_BACKENDS:
+        raise ValueError(f"Unknown rerank backend: {backend}")
+    if backend == "local":
+        return rerank_local(results, target_duration)
+    return rerank_with_llm(results, custom_prompt, target_duration, job_id=job_id)
@@ -0,0 +1,117 @@
+import re
+import json
+import threading
+import numpy as np
+from src.utils.config import Config
+
+# Score added per unit of keyword weight (a weight-1 hit is a 5% boost)
+KEYWORD_BOOST = 0.05
+
+
+WORD_RE = re.compile(r"\w+")
+
+
+def plural_forms(word):
+    """The word and its regular English plural ("six" -> "sixes", "century" -> "centuries")."""
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        return (word, word + "es")
+    if len(word) > 1 and word.endswith("y") and word[-2] not in "aeiou":
+        return (word, word[:-1] + "ies")
+    return (word, word + "s")
+
+
+class KeywordMatcher:
+    """
+    Weighted keyword set built once and matched on whole words, so "out" no
+    longer hits "without" and "four" not "fourteen". Regular plurals count
+    as the term ("wickets", "sixes", "centuries", "home runs"). A text is
+    tokenised once and single-word terms (and their plurals) are a set
+    intersection; multi-word terms ("home run", "hat-trick") go through one
+    compiled word-bounded regex, run only when the text contains one of
+    their first words. A term counts once per text however often it appears.
+    """
+
+    def __init__(self, terms):
+        if not isinstance(terms, dict):
+            terms = {t: 1.0 for t in terms}
+        self.weights = {}
+        for term, weight in terms.items():
+            key = " ".join(WORD_RE.findall(term.lower()))
+            if key:
+                self.weights[key] = float(weight)
+        # Every accepted form -> term; explicit terms win over another term's plural
+        self.forms = {}
+        for term in self.weights:
+            *head, last = term.split()
+            for form in plural_forms(last):
+                self.forms.setdefault(" ".join(head + [form]), term)
+        self.forms.update({t: t for t in self.weights})
+        self.word_forms = {f: t for f, t in self.forms.items() if " " not in t}
+        phrases = sorted((t for t in self.weights if " " in t), key=len, reverse=True)
+        self.phrase_starts = {t.split()[0] for t in phrases}
+        # Any run of non-word characters between the words ("hat-trick", "home  run")
+        alternation = "|".join(
+            r"\W+".join([*map(re.escape, t.split()[:-1]), "(?:" + "|".join(plural_forms(t.split()[-1])[::-1]) + ")"])
+            for t in phrases
+        )
+        self.phrase_re = re.compile(rf"\b(?:{alternation})\b") if phrases else None
+
+    def hits(self, text):
+        """Distinct terms found in text."""
+        if not text:
+            return set()
+        text = text.lower()
+        tokens = WORD_RE.findall(text)
+        found = {self.word_forms[t] for t in self.word_forms.keys() & tokens}
+        if self.phrase_re is not None and not self.phrase_starts.isdisjoint(tokens):
+            found.update(self.forms[" ".join(WORD_RE.findall(m))] for m in self.phrase_re.findall(text))
+        return found
+
+    def score(self, text):
+        """Sum of the weights of the distinct terms in text."""
+        return sum(self.weights[t] for t in self.hits(text))
+
+    def score_many(self, texts):
+        """Scores for many texts as a float array (bulk scoring of a chunk list)."""
+        return np.fromiter((self.score(t) for t in texts), dtype="f8", count=len(texts))
+
+
+# -----------------------------------------------------------
+# Profiles (per-domain keyword sets) and compiled-matcher cache
+# -----------------------------------------------------------
+_MATCHERS = {}
+_PROFILES = {}
+_LOCK = threading.Lock()
+
+
+def load_profiles(path=None):
+    """{profile: {term: weight}} from KEYWORD_PROFILES_PATH (read once per file)."""
+    path = path or Config.KEYWORD_PROFILES_PATH
+    with _LOCK:
+        if path not in _PROFILES:
+            with open(path, "r", encoding="utf-8") as f:
+                _PROFILES[path] = json.load(f)
+        return _PROFILES[path]
+
+
+def get_matcher(keywords=None):
+    """
+    Compiled matcher for a profile name (default KEYWORD_PROFILE), a term
+    list or a {term: weight} dict. Built once per keyword set.
+    """
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+    if keywords is None or isinstance(keywords, str):
+        name = keywords or Config.KEYWORD_PROFILE
+        profiles = load_profiles()
+        if name not in profiles:
+            raise ValueError(f"Unknown keyword profile '{name}', expected one of {sorted(profiles)}")
+        key, terms = ("profile", Config.KEYWORD_PROFILES_PATH, name), profiles[name]
+    else:
+        terms = keywords if isinstance(keywords, dict) else {t: 1.0 for t in keywords}
+        key = ("terms", tuple(sorted(terms.items())))
+    with _LOCK:
+        matcher = _MATCHERS.get(key)
+        if matcher is None:
+            matcher = _MATCHERS[key] = KeywordMatcher(terms)
+        return matcher
@@ -0,0 +1,267 @@
+import os
+import fcntl
+import sqlite3
+import threading
+import numpy as np
+import faiss
+from src.utils.config import Config
+from src.utils.model_cache import ModelCache
+from src.text.embedding_builder import encode_texts
+
+LIBRARY_INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+
+def make_ann_index(dim, kind=None, train_vectors=None):
+    """
+    Empty inner-product index of the configured type, wrapped so vectors
+    carry our own int64 ids. IVF-PQ is trained on train_vectors.
+    """
+    kind = (kind or Config.LIBRARY_INDEX).lower()
+    if kind == "flat":
+        base = faiss.IndexFlatIP(dim)
+    elif kind == "hnsw":
+        base = faiss.IndexHNSWFlat(dim, Config.LIBRARY_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        base.hnsw.efConstruction = max(40, 2 * Config.LIBRARY_HNSW_M)
+    elif kind == "ivfpq":
+        nlist = Config.LIBRARY_NLIST
+        # PQ needs dim divisible by the sub-quantizer count
+        m = next(m for m in (Config.LIBRARY_PQ_M, 64, 48, 32, 16, 8, 4, 2, 1) if dim % m == 0)
+        base = faiss.index_factory(dim, f"IVF{nlist},PQ{m}", faiss.METRIC_INNER_PRODUCT)
+        if train_vectors is None:
+            raise ValueError("IVF-PQ needs training vectors")
+        base.train(np.ascontiguousarray(train_vectors, dtype="float32"))
+    else:
+        raise ValueError(f"Unknown library index type: {kind}")
+    return faiss.IndexIDMap2(base)
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """Apply query-time knobs (IVF nprobe / HNSW efSearch) to a wrapped index."""
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = nprobe or Config.LIBRARY_NPROBE
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = ef_search or Config.LIBRARY_EF_SEARCH
+    return index
+
+
+class LibraryIndex:
+    """
+    One approximate-nearest-neighbour index over the chunks of every
+    processed video (LIBRARY_DIR). Vector ids map to (video_id, start, end,
+    text) rows in SQLite, so results point straight at a moment in a video.
+
+    Videos are added incrementally. For "ivfpq" the library stays exact
+    (flat) until LIBRARY_TRAIN_SIZE vectors exist, then the quantizer is
+    trained on them once and the index switched over. Writers hold a file
+    lock and reload the index first, so process-pool workers can add
+    videos safely.
+    """
+
+    INDEX_FILE = "library.faiss"
+    DB_FILE = "library.sqlite"
+
+    def __init__(self, root=None, kind=None, model_name=None):
+        self.root = root or Config.LIBRARY_DIR
+        self.kind = (kind or Config.LIBRARY_INDEX).lower()
+        if self.kind not in LIBRARY_INDEX_TYPES:
+            raise ValueError(f"Unknown library index type: {self.kind}")
+        self.model_name = model_name or Config.EMBED_MODEL
+        os.makedirs(self.root, exist_ok=True)
+        self.index_path = os.path.join(self.root, self.INDEX_FILE)
+        self.lock_path = os.path.join(self.root, ".lock")
+        self._lock = threading.RLock()
+        self._loaded_mtime = None
+        self.index = None
+        self.db = sqlite3.connect(os.path.join(self.root, self.DB_FILE), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY, video_id TEXT NOT NULL,
+                start REAL NOT NULL, "end" REAL NOT NULL, text TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS chunks_video ON chunks(video_id);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        self._check_model()
+
+    def _check_model(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'embed_model'").fetchone()
+        if row is None:
+            with self.db:
+                self.db.execute("INSERT INTO meta VALUES ('embed_model', ?)", (self.model_name,))
+        elif row[0] != self.model_name:
+            raise ValueError(f"Library was built with {row[0]}, not {self.model_name}")
+
+    # -----------------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------------
+    def _reload(self):
+        """(Re)load the index if another process saved a newer one."""
+        if not os.path.exists(self.index_path):
+            return self.index
+        mtime = os.path.getmtime(self.index_path)
+        if self.index is None or mtime != self._loaded_mtime:
+            self.index = set_search_params(faiss.read_index(self.index_path))
+            self._loaded_mtime = mtime
+        return self.index
+
+    def _save(self):
+        tmp = self.index_path + ".tmp"
+        faiss.write_index(self.index, tmp)
+        os.replace(tmp, self.index_path)
+        self._loaded_mtime = os.path.getmtime(self.index_path)
+
+    # -----------------------------------------------------------
+    # Writes
+    # -----------------------------------------------------------
+    def has_video(self, video_id):
+        with self._lock:
+            row = self.db.execute("SELECT 1 FROM chunks WHERE video_id = ? LIMIT 1", (video_id,)).fetchone()
+        return row is not None
+
+    def add_video(self, video_id, chunks, embeddings):
+        """Append one video's chunks (row i of embeddings = chunks[i], L2-normalised). Returns vectors added."""
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        if len(chunks) != len(embeddings):
+            raise ValueError(f"{len(chunks)} chunks but {len(embeddings)} embeddings")
+        if not len(chunks):
+            return 0
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if self.has_video(video_id):
+                return 0
+            self._reload()
+            try:
+                with self.db:
+                    first = self.db.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM chunks").fetchone()[0]
+                    ids = np.arange(first, first + len(chunks), dtype="int64")
+                    self.db.executemany(
+                        'INSERT INTO chunks (id, video_id, start, "end", text) VALUES (?, ?, ?, ?, ?)',
+                        [(int(i), video_id, float(c["start"]), float(c["end"]), c["text"])
+                         for i, c in zip(ids, chunks)],
+                    )
+                    if self.index is None:
+                        kind = "flat" if self.kind == "ivfpq" else self.kind
+                        self.index = set_search_params(make_ann_index(embeddings.shape[1], kind))
+                    self.index.add_with_ids(embeddings, ids)
+                    self._maybe_train()
+                    self._save()
+            except Exception:
+                # The rows were rolled back; drop the in-memory vectors too
+                self.index, self._loaded_mtime = None, None
+                raise
+        print(f"📚 Library: +{len(chunks)} chunks from video {video_id[:8]} ({self.index.ntotal} total)")
+        return len(chunks)
+
+    def _maybe_train(self):
+        """Switch a still-exact "ivfpq" library to a trained IVF-PQ index once it is big enough."""
+        if self.kind != "ivfpq" or self.index.ntotal < Config.LIBRARY_TRAIN_SIZE:
+            return
+        base = faiss.downcast_index(self.index.index)
+        if not isinstance(base, faiss.IndexFlat):
+            return
+        ids = faiss.vector_to_array(self.index.id_map).astype("int64")
+        vectors = base.reconstruct_n(0, base.ntotal)
+        print(f"📚 Training IVF-PQ library index on {len(vectors)} vectors...")
+        trained = make_ann_index(vectors.shape[1], "ivfpq", train_vectors=vectors)
+        trained.add_with_ids(vectors, ids)
+        self.index = set_search_params(trained)
+
+    def sync_from_store(self, store):
+        """
+        Add every video in a VideoStore that the library does not have yet,
+        skipping videos embedded with another model or backend.
+        """
+        backend = ModelCache.embed_backend(self.model_name)
+        added = 0
+        for meta in store.list_videos():
+            video_id = meta["video_id"]
+            if (self.has_video(video_id) or meta.get("embed_model", self.model_name) != self.model_name
+                    or meta.get("embed_backend", "torch") != backend):
+                continue
+            chunks = store.load_json(video_id, "chunks.json", touch=False)
+            emb_path = store.get(video_id, "embeddings.npy", touch=False)
+            if chunks and emb_path:
+                added += self.add_video(video_id, chunks, np.load(emb_path))
+        return added
+
+    # -----------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------
+    def stats(self):
+        with self._lock:
+            self._reload()
+            videos = self.db.execute("SELECT COUNT(DISTINCT video_id) FROM chunks").fetchone()[0]
+        base = faiss.downcast_index(self.index.index) if self.index is not None else None
+        return {
+            "videos": videos,
+            "vectors": self.index.ntotal if self.index is not None else 0,
+            "index_type": type(base).__name__ if base is not None else None,
+            "embed_model": self.model_name,
+        }
+
+    def search_vectors(self, query_vectors, top_k=10, video_ids=None):
+        """Batched ANN search. Returns one result list per query row."""
+        with self._lock:
+            index = self._reload()
+        if index is None or index.ntotal == 0:
+            return [[] for _ in range(len(query_vectors))]
+        query_vectors = np.ascontiguousarray(query_vectors, dtype="float32")
+        # Over-fetch when filtering so the filter still leaves top_k hits
+        k = min(index.ntotal, top_k * (4 if video_ids else 1))
+        D, I = index.search(query_vectors, k)
+        wanted = set(video_ids) if video_ids else None
+
+        rows = {}
+        hit_ids = sorted({int(i) for i in I.ravel() if i >= 0})
+        with self._lock:
+            for start in range(0, len(hit_ids), 900):  # SQLite parameter limit
+                part = hit_ids[start:start + 900]
+                marks = ",".join("?" * len(part))
+                sql = f'SELECT id, video_id, start, "end", text FROM chunks WHERE id IN ({marks})'
+                for row in self.db.execute(sql, part):
+                    rows[row[0]] = row
+
+        results = []
+        for scores, ids in zip(D, I):
+            hits = []
+            for score, i in zip(scores, ids):
+                row = rows.get(int(i))
+                if row is None or (wanted and row[1] not in wanted):
+                    continue
+                hits.append({"video_id": row[1], "start": row[2], "end": row[3], "text": row[4],
+                             "score": float(score)})
+                if len(hits) == top_k:
+                    break
+            results.append(hits)
+        return results
+
+    def search(self, queries, top_k=10, video_ids=None):
+        """Embed one query (str) or many (list) and search the whole library."""
+        single = isinstance(queries, str)
+        texts = [queries] if single else list(queries)
+        embedder = ModelCache.load_embedder(self.model_name)
+        q = encode_texts(embedder, texts)
+        results = self.search_vectors(q, top_k, video_ids)
+        return results[0] if single else results
+
+
+_LIBRARY = None
+_LIBRARY_LOCK = threading.Lock()
+
+
+def get_library(store=None):
+    """
+    Process-wide LibraryIndex (opened lazily). On open it picks up videos
+    already in the VideoStore (store, or one on VIDEO_STORE_DIR): one SQLite
+    lookup per stored video, plus loading the embeddings of any it lacks.
+    """
+    global _LIBRARY
+    with _LIBRARY_LOCK:
+        if _LIBRARY is None:
+            from src.utils.video_store import VideoStore
+            library = LibraryIndex()
+            added = library.sync_from_store(store if store is not None else VideoStore())
+            if added:
+                print(f"📚 Library: synced {added} chunks from the video store")
+            _LIBRARY = library
+        return _LIBRARY
@@ -0,0 +1,126 @@
+import json
+import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from src.utils.config import Config
+from src.utils.artifact_cache import ArtifactCache
+
+
+class LLMError(RuntimeError):
+    """The LLM call failed or missed its deadline; callers fall back to retrieval ranking."""
+
+
+class OpenAIChatClient:
+    """
+    Chat-completions client with a per-request timeout and bounded retries.
+    base_url points it at any OpenAI-compatible server (e.g. a local stub).
+    """
+
+    def __init__(self, model=None, base_url=None, api_key=None, timeout=None, retries=None):
+        from openai import OpenAI
+        self.model = model or Config.LLM_MODEL
+        self.client = OpenAI(
+            api_key=api_key or Config.OPENAI_API_KEY or "not-needed",
+            base_url=base_url or Config.LLM_BASE_URL or None,
+            timeout=Config.LLM_TIMEOUT if timeout is None else timeout,
+            max_retries=Config.LLM_RETRIES if retries is None else retries,
+        )
+
+    def complete(self, prompt):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+        )
+        return response.choices[0].message.content
+
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_llm_client():
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = OpenAIChatClient()
+        return _CLIENT
+
+
+def set_llm_client(client):
+    """Swap the LLM backend (anything with .model and .complete(prompt) -> str)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = client
+
+
+# -----------------------------------------------------------
+# Response cache (TTL + size bound) and in-flight coalescing
+# -----------------------------------------------------------
+_CACHE = None
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+RESPONSE = "response.json"
+
+
+def response_cache():
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ArtifactCache(Config.LLM_CACHE_DIR, int(Config.LLM_CACHE_MB * 1024 ** 2))
+    return _CACHE
+
+
+def cached_response(key, ttl_seconds=None):
+    ttl_seconds = Config.LLM_CACHE_TTL_HOURS * 3600 if ttl_seconds is None else ttl_seconds
+    entry = response_cache().load_json(key, RESPONSE)
+    if entry is None or time.time() - entry.get("created", 0) > ttl_seconds:
+        return None
+    return entry["data"]
+
+
+def complete_json(prompt, timeout=None, use_cache=True):
+    """
+    Parsed JSON answer for a filled prompt.
+    Answers are cached by hash(model + prompt) for LLM_CACHE_TTL_HOURS, and
+    identical concurrent requests share one in-flight call. Raises LLMError
+    on API errors, unparsable output or when `timeout` seconds pass.
+    """
+    timeout = Config.LLM_DEADLINE if timeout is None else timeout
+    client = get_llm_client()
+    key = ArtifactCache.make_key("llm", getattr(client, "model", ""), prompt)
+    if use_cache:
+        data = cached_response(key)
+        if data is not None:
+            print("♻️ Reusing cached LLM response")
+            return data
+
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[key] = Future()
+
+    if owner:
+        # The call runs on its own thread so the deadline holds even if the HTTP client stalls
+        threading.Thread(target=_call, args=(client, prompt, key, future, use_cache), daemon=True).start()
+    else:
+        print("⏳ Identical LLM request in flight, waiting for it")
+    try:
+        # Every waiter parses its own copy of the shared answer
+        return json.loads(future.result(timeout=timeout))
+    except FutureTimeout as e:
+        raise LLMError(f"LLM call exceeded {timeout:g}s") from e
+
+
+def _call(client, prompt, key, future, use_cache):
+    try:
+        raw = client.complete(prompt)
+        data = json.loads(raw)
+        if use_cache:
+            response_cache().put_json(key, RESPONSE, {"created": time.time(), "data": data})
+        future.set_result(raw)
+    except Exception as e:
+        future.set_exception(LLMError(str(e) or e.__class__.__name__))
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
@@ -0,0 +1,64 @@
+import numpy as np
+from src.video.selection import knapsack_select
+
+# Feature weights for the offline rerank (features are scaled to [0, 1])
+LOCAL_WEIGHTS = {
+    "relevance": 0.55,   # retrieval cosine (+ keyword boost), min-max scaled over the candidates
+    "novelty": 0.20,     # MMR pick order ("mmr_rank"): earlier picks are less redundant
+    "speech_rate": 0.15, # words/sec; excited commentary speeds up
+    "length": 0.10,      # penalises fragments shorter than MIN_LOCAL_CLIP seconds
+}
+MIN_LOCAL_CLIP = 4.0
+
+
+def _scale(x):
+    """Min-max scale to [0, 1]; a constant column maps to 1."""
+    x = np.asarray(x, dtype="float64")
+    span = x.max() - x.min() if len(x) else 0.0
+    return (x - x.min()) / span if span > 0 else np.ones_like(x)
+
+
+def score_candidates(results, weights=None):
+    """
+    Per-candidate value for the offline rerank. `results` is the output of
+    generate_candidate_highlights (keyword-boosted, chronological, with the
+    MMR pick order in "mmr_rank"; candidates without one get full novelty).
+    Returns a float array aligned with results.
+    """
+    weights = weights or LOCAL_WEIGHTS
+    starts = np.array([float(r["start"]) for r in results])
+    ends = np.array([float(r["end"]) for r in results])
+    durations = np.maximum(ends - starts, 1e-3)
+    words = np.array([len(str(r.get("text", "")).split()) for r in results])
+    # Ranks count MMR picks, which can outnumber results after merging / truncation
+    ranks = np.array([float(r.get("mmr_rank", 0)) for r in results])
+
+    features = {
+        "relevance": _scale([float(r.get("score", 0.0)) for r in results]),
+        "novelty": np.clip(1.0 - ranks / (ranks.max(initial=0.0) + 1), 0.0, 1.0),
+        "speech_rate": _scale(words / durations),
+        "length": np.minimum(durations / MIN_LOCAL_CLIP, 1.0),
+    }
+    return sum(w * features[name] for name, w in weights.items())
+
+
+def rerank_local(results, target_duration=60, pad=1.5, weights=None):
+    """
+    Offline alternative to rerank_with_llm: score candidates from retrieval
+    features and pick the best set that fits target_duration (each clip costs
+    its length plus the padding added later by pad_and_merge_segments).
+    Returns the picked segments in chronological order with a "local_score".
+    """
+    if not results:
+        return results
+    values = score_candidates(results, weights)
+    costs = [float(r["end"]) - float(r["start"]) + 2 * pad for r in results]
+    picked = knapsack_select(values, costs, float(target_duration))
+    if not picked:
+        # Nothing fits whole: keep the single best clip and let trimming shorten it
+        picked = [int(np.argmax(values))]
+    selected = [dict(results[i], local_score=round(float(values[i]), 4)) for i in picked]
+    selected.sort(key=lambda r: float(r["start"]))
+    print(f"🧮 Local rerank kept {len(selected)}/{len(results)} candidates "
+          f"({sum(costs[i] for i in picked):.1f}s of {target_duration}s budget incl. padding)")
+    return selected
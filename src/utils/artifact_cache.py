@@ -0,0 +1,172 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from src.utils.config import Config
+
+
+class ArtifactCache:
+    """
+    Content-addressed on-disk cache for expensive pipeline artifacts.
+    Each key maps to a directory CACHE_DIR/<key>/ holding one or more files.
+    Entry directory mtimes track last access; once the cache grows past
+    max_bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or Config.CACHE_DIR
+        if max_bytes is None:
+            max_bytes = int(Config.CACHE_MAX_GB * 1024 ** 3)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """Stable hash of any JSON-serialisable key parts."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    # -----------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------
+    def get(self, key, name, touch=True):
+        """Return the cached file path (and, with touch, mark the entry as used) or None."""
+        path = os.path.join(self.entry_dir(key), name)
+        if not os.path.isfile(path):
+            return None
+        if touch and not self.touch(key):
+            return None
+        return path
+
+    def touch(self, key):
+        """Mark an entry as just used for LRU eviction. False if it is gone."""
+        try:
+            os.utime(self.entry_dir(key))
+        except OSError:
+            return False
+        return True
+
+    def has(self, key, *names, touch=True):
+        return all(self.get(key, n, touch) for n in names)
+
+    def fetch(self, key, name, dest):
+        """Copy a cached file to dest. Returns False on a miss (or a racing eviction)."""
+        path = self.get(key, name)
+        if path is None:
+            return False
+        try:
+            os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+            shutil.copyfile(path, dest)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def load_json(self, key, name, touch=True):
+        path = self.get(key, name, touch)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # -----------------------------------------------------------
+    # Writes (atomic: temp file + os.replace)
+    # -----------------------------------------------------------
+    def put_file(self, key, name, src_path):
+        entry = self.entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=entry, prefix=".tmp-")
+        os.close(fd)
+        shutil.copyfile(src_path, tmp)
+        os.replace(tmp, os.path.join(entry, name))
+        self.evict()
+        return os.path.join(entry, name)
+
+    def put_json(self, key, name, obj):
+        entry = self.entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=entry, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f)
+        os.replace(tmp, os.path.join(entry, name))
+        self.evict()
+        return os.path.join(entry, name)
+
+    # -----------------------------------------------------------
+    # LRU eviction
+    # -----------------------------------------------------------
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries, total = [], 0
+            for key in os.listdir(self.root):
+                entry = self.entry_dir(key)
+                if not os.path.isdir(entry):
+                    continue
+                size = _dir_size(entry)
+                entries.append((os.path.getmtime(entry), size, entry))
+                total += size
+            if total <= self.max_bytes:
+                return 0
+
+            removed = 0
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                removed += 1
+            print(f"🧹 Artifact cache evicted {removed} entries ({total / 1024 ** 2:.1f} MB kept)")
+            return removed
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+# -----------------------------------------------------------
+# Stage keys: each stage key covers everything its output depends on
+# -----------------------------------------------------------
+def transcript_key(video_hash, whisper_model):
+    return ArtifactCache.make_key("transcript", video_hash, whisper_model)
+
+
+def excitement_key(video_hash, window_seconds):
+    return ArtifactCache.make_key("excitement", video_hash, window_seconds)
+
+
+def visual_key(video_hash, fps, width, height):
+    return ArtifactCache.make_key("visual", video_hash, fps, width, height)
+
+
+def chunks_key(video_hash, whisper_model, max_chunk, merge_gap, strategy="time"):
+    # Non-"time" strategies (see chunk_signature) extend the key; "time" keeps the old one
+    parts = (video_hash, whisper_model, max_chunk, merge_gap)
+    if strategy != "time":
+        parts += (strategy,)
+    return ArtifactCache.make_key("chunks", *parts)
+
+
+def embeddings_key(video_hash, whisper_model, max_chunk, merge_gap, embed_model, embed_backend="torch",
+                   strategy="time"):
+    # Quantised / ONNX embedders produce slightly different vectors, so the backend is part of the key
+    parts = (video_hash, whisper_model, max_chunk, merge_gap, embed_model)
+    if embed_backend != "torch":
+        parts += (embed_backend,)
+    if strategy != "time":
+        parts += (strategy,)
+    return ArtifactCache.make_key("embeddings", *parts)
@@ -14,10 +14,136 @@ class Config:
     PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
     MAX_VIDEO_LENGTH = 10 * 60
 
+    # Job execution: "thread" or "process" pool, running JOB_WORKERS jobs at once
+    # and holding at most JOB_QUEUE_LIMIT more before the API answers 429.
+    JOB_EXECUTOR = os.getenv("JOB_EXECUTOR", "thread").lower()
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "8"))
+
+    # Per-job workspaces: every artifact of a job lives in WORKSPACE_DIR/<job_id>/
+    WORKSPACE_DIR = os.path.join(PROCESSED_DIR, "workspaces")
+    WORKSPACE_RETENTION_HOURS = float(os.getenv("WORKSPACE_RETENTION_HOURS", "24"))
+    KEEP_INTERMEDIATE = os.getenv("KEEP_INTERMEDIATE", "false").lower() == "true"
+
+    # Long audio (> MAX_VIDEO_LENGTH) is split at quiet points into windows that
+    # are transcribed in parallel worker processes. TRANSCRIBE_MODE: auto | single | parallel
+    TRANSCRIBE_MODE = os.getenv("TRANSCRIBE_MODE", "auto").lower()
+    TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    TRANSCRIBE_WINDOW_SECONDS = float(os.getenv("TRANSCRIBE_WINDOW_SECONDS", "300"))
+    TRANSCRIBE_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2.0"))
+
+    # Streaming pipeline: transcribe STREAM_WINDOW_SECONDS windows as the audio is
+    # decoded, chunk + embed in STREAM_BATCH_SIZE micro-batches and publish
+    # provisional highlights in the job status before transcription finishes
+    STREAM_PIPELINE = os.getenv("STREAM_PIPELINE", "false").lower() == "true"
+    STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "30"))
+    STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "8"))
+
+    # Uploads are streamed to disk in UPLOAD_CHUNK_MB pieces; resumable parts live in UPLOAD_DIR
+    UPLOAD_DIR = os.path.join(RAW_DIR, "uploads")
+    UPLOAD_CHUNK_MB = int(os.getenv("UPLOAD_CHUNK_MB", "4"))
+
+    # Models and chunking parameters (also part of the artifact cache key)
+    WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny")
+    EMBED_MODEL = os.getenv("EMBED_MODEL", "all-mpnet-base-v2")
+    # Embedder throughput: EMBED_BACKEND torch | int8 | onnx; smaller models
+    # (e.g. EMBED_MODEL=all-MiniLM-L6-v2) trade some retrieval quality for speed
+    EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+    CHUNK_MAX_SECONDS = float(os.getenv("CHUNK_MAX_SECONDS", "25.0"))
+    CHUNK_MERGE_GAP = float(os.getenv("CHUNK_MERGE_GAP", "2.0"))
+    # CHUNK_STRATEGY: "time" (gap / max-length merge), "sliding" (overlapping
+    # CHUNK_WINDOW_SECONDS windows every CHUNK_STRIDE_SECONDS) or "semantic"
+    # (also split where adjacent segments' similarity drops CHUNK_SPLIT_DROP
+    # std below its mean, once a chunk is CHUNK_MIN_SECONDS long). The latter
+    # two embed segments once and pool them into the chunk vectors.
+    CHUNK_STRATEGY = os.getenv("CHUNK_STRATEGY", "time").lower()
+    CHUNK_WINDOW_SECONDS = float(os.getenv("CHUNK_WINDOW_SECONDS", "15.0"))
+    CHUNK_STRIDE_SECONDS = float(os.getenv("CHUNK_STRIDE_SECONDS", "7.5"))
+    CHUNK_SPLIT_DROP = float(os.getenv("CHUNK_SPLIT_DROP", "0.5"))
+    CHUNK_MIN_SECONDS = float(os.getenv("CHUNK_MIN_SECONDS", "5.0"))
+
+    # Highlight rendering: "ffmpeg" (single filtergraph, MoviePy fallback),
+    # "copy" (keyframe-snapped stream copy, no fades), "parallel" (per-segment
+    # encodes in a worker pool) or "moviepy"
+    RENDER_BACKEND = os.getenv("RENDER_BACKEND", "ffmpeg").lower()
+    RENDER_THREADS = int(os.getenv("RENDER_THREADS", "0"))  # 0 = let ffmpeg decide
+    RENDER_PRESET = os.getenv("RENDER_PRESET", "veryfast")
+    RENDER_CRF = int(os.getenv("RENDER_CRF", "23"))
+    # "copy" mode: max seconds a boundary may move to land on a keyframe
+    KEYFRAME_TOLERANCE = float(os.getenv("KEYFRAME_TOLERANCE", "1.0"))
+    # "parallel" mode: segments encoded concurrently, one ffmpeg each, then concat-copied
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 2)))
+    SEGMENT_CACHE_DIR = os.path.join(DATA_DIR, "segment_cache")
+    SEGMENT_CACHE_GB = float(os.getenv("SEGMENT_CACHE_GB", "10"))
+
+    # Content-addressed cache of transcripts, chunks and embeddings
+    CACHE_DIR = os.path.join(DATA_DIR, "cache")
+    CACHE_MAX_GB = float(os.getenv("CACHE_MAX_GB", "5"))
+
+    # Per-video store (index, chunks, embeddings, source video) for re-querying
+    # a processed video with new prompts; open indexes stay in memory per process
+    VIDEO_STORE_DIR = os.path.join(DATA_DIR, "videos")
+    VIDEO_STORE_GB = float(os.getenv("VIDEO_STORE_GB", "50"))
+    VIDEO_STORE_KEEP_VIDEO = os.getenv("VIDEO_STORE_KEEP_VIDEO", "true").lower() == "true"
+    VIDEO_SESSION_CACHE = int(os.getenv("VIDEO_SESSION_CACHE", "4"))
+
+    # Cross-video library: one ANN index over every processed video's chunks.
+    # LIBRARY_INDEX: hnsw | ivfpq | flat. IVF-PQ trains once LIBRARY_TRAIN_SIZE vectors exist.
+    LIBRARY_ENABLED = os.getenv("LIBRARY_ENABLED", "true").lower() == "true"
+    LIBRARY_DIR = os.path.join(DATA_DIR, "library")
+    LIBRARY_INDEX = os.getenv("LIBRARY_INDEX", "hnsw").lower()
+    LIBRARY_HNSW_M = int(os.getenv("LIBRARY_HNSW_M", "32"))
+    LIBRARY_EF_SEARCH = int(os.getenv("LIBRARY_EF_SEARCH", "128"))
+    LIBRARY_NLIST = int(os.getenv("LIBRARY_NLIST", "1024"))
+    LIBRARY_PQ_M = int(os.getenv("LIBRARY_PQ_M", "64"))
+    LIBRARY_NPROBE = int(os.getenv("LIBRARY_NPROBE", "16"))
+    LIBRARY_TRAIN_SIZE = int(os.getenv("LIBRARY_TRAIN_SIZE", "50000"))
+
+    # LLM rerank: OpenAI-compatible endpoint (LLM_BASE_URL for a local server),
+    # per-request timeout + retries, overall deadline before falling back to
+    # the retrieval ranking, and a TTL-bounded response cache
+    LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+    LLM_RETRIES = int(os.getenv("LLM_RETRIES", "1"))
+    LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "60"))
+    LLM_CACHE_DIR = os.path.join(DATA_DIR, "llm_cache")
+    LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+    LLM_CACHE_MB = float(os.getenv("LLM_CACHE_MB", "64"))
+    # compact: candidates as "id|start-end|text" lines within LLM_CANDIDATE_TOKENS, answer = ids
+    LLM_PROMPT_MODE = os.getenv("LLM_PROMPT_MODE", "compact").lower()
+    LLM_CANDIDATE_TOKENS = int(os.getenv("LLM_CANDIDATE_TOKENS", "1500"))
+
+    # Audio excitement: per-second loudness / spectral-flux rise over a rolling window,
+    # added to candidate scores as EXCITEMENT_WEIGHT * mean excitement of the segment
+    EXCITEMENT_ENABLED = os.getenv("EXCITEMENT_ENABLED", "true").lower() == "true"
+    EXCITEMENT_WINDOW_SECONDS = float(os.getenv("EXCITEMENT_WINDOW_SECONDS", "60"))
+    EXCITEMENT_WEIGHT = float(os.getenv("EXCITEMENT_WEIGHT", "0.1"))
+
+    # Visual signal: grayscale frames at VISUAL_FPS, VISUAL_WIDTH x VISUAL_HEIGHT -> per-second
+    # motion / shot-cut scores; segment edges snap to cuts within CUT_SNAP_SECONDS
+    VISUAL_ENABLED = os.getenv("VISUAL_ENABLED", "true").lower() == "true"
+    VISUAL_FPS = float(os.getenv("VISUAL_FPS", "4"))
+    VISUAL_WIDTH = int(os.getenv("VISUAL_WIDTH", "160"))
+    VISUAL_HEIGHT = int(os.getenv("VISUAL_HEIGHT", "90"))
+    VISUAL_WEIGHT = float(os.getenv("VISUAL_WEIGHT", "0.05"))
+    VISUAL_CUT_THRESHOLD = float(os.getenv("VISUAL_CUT_THRESHOLD", "0.35"))
+    CUT_SNAP_SECONDS = float(os.getenv("CUT_SNAP_SECONDS", "1.0"))
+
+    # Keyword boost: weighted per-domain term lists; KEYWORD_PROFILE picks one
+    KEYWORD_PROFILES_PATH = os.getenv("KEYWORD_PROFILES_PATH",
+                                      os.path.join(BASE_DIR, "src", "prompts", "keyword_profiles.json"))
+    KEYWORD_PROFILE = os.getenv("KEYWORD_PROFILE", "cricket").lower()
+
+    # Highlight rerank: "llm" (creative selection) or "local" (offline scoring + knapsack, no API call)
+    RERANK_BACKEND = os.getenv("RERANK_BACKEND", "llm").lower()
+
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
     @staticmethod
     def ensure_dirs():
         """Make sure all critical directories exist."""
         os.makedirs(Config.RAW_DIR, exist_ok=True)
-        os.makedirs(Config.PROCESSED_DIR, exist_ok=True)
\ No newline at end of file
+        os.makedirs(Config.PROCESSED_DIR, exist_ok=True)
+        os.makedirs(Config.WORKSPACE_DIR, exist_ok=True)
\ No newline at end of file
@@ -1,7 +1,17 @@
 import os
+import hashlib
 
 def create_dirs():
     dirs = ["data", "data/raw", "data/processed"]
     for d in dirs:
         if not os.path.exists(d):
-            os.makedirs(d)
\ No newline at end of file
+            os.makedirs(d)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash a file in fixed-size chunks (never loads it fully into memory)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
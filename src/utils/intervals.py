@@ -0,0 +1,97 @@
+import numpy as np
+
+# Interval operations on NumPy arrays of starts / ends (seconds): sort once,
+# then pad / clip / split and merge by group labels. Per-group values are
+# reduced with ufunc.reduceat; text is joined once per group at output time.
+
+
+def as_arrays(items, start="start", end="end"):
+    """(starts, ends) float64 arrays from a list of dicts."""
+    n = len(items)
+    starts = np.fromiter((float(x[start]) for x in items), dtype="f8", count=n)
+    ends = np.fromiter((float(x[end]) for x in items), dtype="f8", count=n)
+    return starts, ends
+
+
+def sort_order(starts):
+    """Stable chronological order (ties keep their input order)."""
+    return np.argsort(starts, kind="stable")
+
+
+def pad(starts, ends, before, after=None, lo=0.0, hi=None):
+    """Widen every interval, clipped to [lo, hi]."""
+    after = before if after is None else after
+    return clip(starts - before, ends + after, lo, hi)
+
+
+def clip(starts, ends, lo=0.0, hi=None):
+    """Clamp starts to >= lo and ends to <= hi (when given)."""
+    if lo is not None:
+        starts = np.maximum(starts, lo)
+    if hi:
+        ends = np.minimum(ends, hi)
+    return starts, ends
+
+
+def merge_groups(starts, ends, gap=0.0, strict=False):
+    """
+    Group labels for intervals sorted by start. An interval joins the current
+    group when its start is within `gap` of the furthest end so far
+    (start - reach <= gap, or < gap with strict=True).
+    """
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64)
+    reach = np.maximum.accumulate(ends)[:-1]
+    distance = starts[1:] - reach
+    new_group = distance >= gap if strict else distance > gap
+    return np.concatenate([[0], np.cumsum(new_group)]).astype(np.int64)
+
+
+def group_heads(labels):
+    """Index of the first member of each group (labels non-decreasing)."""
+    if not len(labels):
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+
+
+def reduce_groups(values, heads, ufunc=np.maximum):
+    """ufunc-reduce a column per group (e.g. furthest end, best score)."""
+    if not len(heads):
+        return np.zeros(0, dtype=np.asarray(values).dtype)
+    return ufunc.reduceat(np.asarray(values), heads)
+
+
+def merge(starts, ends, gap=0.0, strict=False):
+    """
+    Merge sorted intervals (see merge_groups).
+    Returns (merged_starts, merged_ends, heads); heads[i] is the first member of group i.
+    """
+    heads = group_heads(merge_groups(starts, ends, gap, strict))
+    return starts[heads], reduce_groups(ends, heads), heads
+
+
+def split_long(starts, ends, split_over=40.0, piece=20.0):
+    """
+    Split intervals longer than split_over seconds into `piece`-second parts.
+    Returns (starts, ends, parent) arrays; parent[i] is the source row.
+    """
+    lengths = ends - starts
+    counts = np.where(lengths > split_over, np.ceil(lengths / piece - 1e-9), 1).astype(int)
+    parent = np.repeat(np.arange(len(starts)), counts)
+    # Position of each part inside its interval: 0, 1, 2, ... per parent
+    part = np.arange(len(parent)) - np.repeat(np.cumsum(counts) - counts, counts)
+    split = counts[parent] > 1
+    new_starts = np.where(split, starts[parent] + part * piece, starts[parent])
+    new_ends = np.where(split, np.minimum(new_starts + piece, ends[parent]), ends[parent])
+    return new_starts, new_ends, parent
+
+
+def group_slices(heads, n):
+    """(first, stop) member range of every group, for building per-group output."""
+    bounds = list(heads) + [n]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def join_groups(texts, heads, sep=" "):
+    """One joined string per group, built once at output time."""
+    return [sep.join(texts[a:b]) for a, b in group_slices(heads, len(texts))]
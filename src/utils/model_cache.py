@@ -1,24 +1,76 @@
 # src/utils/model_cache.py
+import threading
 import torch
 from sentence_transformers import SentenceTransformer
 import whisper
+from src.utils.config import Config
+
+EMBED_BACKENDS = ("torch", "int8", "onnx")
+
+
+def build_embedder(model_name, backend="torch"):
+    """
+    SentenceTransformer for CPU inference.
+    "int8" applies dynamic int8 quantisation to the Linear layers;
+    "onnx" runs the model through onnxruntime (needs a sentence-transformers
+    release with backend= support and optimum[onnxruntime]).
+    The returned model's embed_backend attribute names the backend.
+    """
+    if backend == "torch":
+        model = SentenceTransformer(model_name)
+    elif backend == "int8":
+        model = SentenceTransformer(model_name, device="cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    elif backend == "onnx":
+        try:
+            model = SentenceTransformer(model_name, backend="onnx")
+        except TypeError as e:
+            raise RuntimeError("EMBED_BACKEND=onnx needs sentence-transformers>=3.2 and optimum[onnxruntime]") from e
+    else:
+        raise ValueError(f"Unknown embedder backend: {backend}")
+    model.embed_backend = backend
+    return model
+
 
 class ModelCache:
-    whisper_model = None
-    embed_model = None
+    # One instance per model name (and embedder backend), shared by every job in the process
+    whisper_models = {}
+    embed_models = {}
+    _lock = threading.Lock()
 
     @classmethod
     def load_whisper(cls, model_name="tiny"):
-        if cls.whisper_model is None:
-            print(f"🔹 Loading Whisper model: {model_name}")
-            cls.whisper_model = whisper.load_model(model_name)
-            print("✅ Whisper model loaded and cached.")
-        return cls.whisper_model
+        with cls._lock:
+            if model_name not in cls.whisper_models:
+                print(f"🔹 Loading Whisper model: {model_name}")
+                cls.whisper_models[model_name] = whisper.load_model(model_name)
+                print("✅ Whisper model loaded and cached.")
+            return cls.whisper_models[model_name]
+
+    @classmethod
+    def load_embedder(cls, model_name="all-mpnet-base-v2", backend=None):
+        backend = (backend or Config.EMBED_BACKEND).lower()
+        key = model_name if backend == "torch" else f"{model_name}:{backend}"
+        with cls._lock:
+            if key not in cls.embed_models:
+                print(f"🔹 Loading SentenceTransformer: {model_name} ({backend})")
+                try:
+                    cls.embed_models[key] = build_embedder(model_name, backend)
+                except (RuntimeError, ImportError, ValueError) as e:
+                    if backend == "torch":
+                        raise
+                    print(f"⚠️ {backend} embedder unavailable ({e}); using torch")
+                    cls.embed_models[key] = cls.embed_models.get(model_name) or build_embedder(model_name)
+                print("✅ SentenceTransformer loaded and cached.")
+            return cls.embed_models[key]
 
     @classmethod
-    def load_embedder(cls, model_name="all-mpnet-base-v2"):
-        if cls.embed_model is None:
-            print(f"🔹 Loading SentenceTransformer: {model_name}")
-            cls.embed_model = SentenceTransformer(model_name)
-            print("✅ SentenceTransformer loaded and cached.")
-        return cls.embed_model
+    def embed_backend(cls, model_name="all-mpnet-base-v2", backend=None):
+        """
+        Backend the embedder actually runs on, for cache keys: "int8" / "onnx"
+        fall back to "torch" when unavailable, and their vectors differ.
+        """
+        backend = (backend or Config.EMBED_BACKEND).lower()
+        if backend == "torch":
+            return backend
+        return getattr(cls.load_embedder(model_name, backend), "embed_backend", "torch")
@@ -0,0 +1,132 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+from src.utils.config import Config
+from src.utils.artifact_cache import ArtifactCache
+from src.utils.workspace import JobWorkspace
+
+
+class VideoStore(ArtifactCache):
+    """
+    Persistent retrieval artifacts per processed video, keyed by video id
+    (the upload's content hash): FAISS index, chunks, embeddings, metadata
+    and the source video itself, under VIDEO_STORE_DIR/<video_id>/.
+    Lets editors query a video again with new prompts without rerunning
+    the job. Least recently queried videos are evicted past VIDEO_STORE_GB:
+    only opening a session or the source video marks a video as used, the
+    read-only lookups (meta, list_videos, signal) leave the LRU order alone.
+    """
+
+    META = "meta.json"
+    SOURCE = "source"
+    INDEX_FILES = (JobWorkspace.INDEX, JobWorkspace.CHUNKS, JobWorkspace.EMBEDDINGS)
+    # Per-second signal arrays, stored when the job produced them
+    SIGNAL_FILES = (JobWorkspace.EXCITEMENT, JobWorkspace.VISUAL)
+
+    def __init__(self, root=None, max_bytes=None, max_sessions=None):
+        if max_bytes is None:
+            max_bytes = int(Config.VIDEO_STORE_GB * 1024 ** 3)
+        super().__init__(root or Config.VIDEO_STORE_DIR, max_bytes)
+        self.max_sessions = max_sessions or Config.VIDEO_SESSION_CACHE
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+    def put_link(self, key, name, src_path):
+        """Like put_file, but hardlinks when possible so large videos are not copied."""
+        entry = self.entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        tmp = os.path.join(tempfile.mkdtemp(dir=entry, prefix=".tmp-"), name)
+        try:
+            try:
+                os.link(src_path, tmp)
+            except OSError:
+                shutil.copyfile(src_path, tmp)
+            os.replace(tmp, os.path.join(entry, name))
+        finally:
+            shutil.rmtree(os.path.dirname(tmp), ignore_errors=True)
+        self.evict()
+        return os.path.join(entry, name)
+
+    # -----------------------------------------------------------
+    # Registration (end of the indexing stage of a job)
+    # -----------------------------------------------------------
+    def save(self, video_id, workspace, video_path, duration, keep_video=None):
+        from src.utils.model_cache import ModelCache
+        keep_video = Config.VIDEO_STORE_KEEP_VIDEO if keep_video is None else keep_video
+        for name in self.INDEX_FILES:
+            self.put_file(video_id, name, workspace.path(name))
+        for name in self.SIGNAL_FILES:
+            if os.path.exists(workspace.path(name)):
+                self.put_file(video_id, name, workspace.path(name))
+        source = None
+        if keep_video:
+            source = self.SOURCE + os.path.splitext(video_path)[1].lower()
+            self.put_link(video_id, source, video_path)
+        self.put_json(video_id, self.META, {
+            "video_id": video_id,
+            "duration": duration,
+            "source": source,
+            "embed_model": Config.EMBED_MODEL,
+            "embed_backend": ModelCache.embed_backend(Config.EMBED_MODEL),
+            "whisper_model": Config.WHISPER_MODEL,
+            "created": time.time(),
+        })
+        with self._sessions_lock:
+            self._sessions.pop(video_id, None)
+        print(f"🗂️ Stored index for video {video_id[:8]}")
+        return video_id
+
+    # -----------------------------------------------------------
+    # Lookups
+    # -----------------------------------------------------------
+    def meta(self, video_id):
+        if not self.has(video_id, self.META, *self.INDEX_FILES, touch=False):
+            return None
+        return self.load_json(video_id, self.META, touch=False)
+
+    def video_path(self, video_id):
+        """Stored source video for a render (marks the video as used) or None."""
+        meta = self.meta(video_id)
+        if not meta or not meta.get("source"):
+            return None
+        return self.get(video_id, meta["source"])
+
+    def signal(self, video_id, name):
+        """A stored per-second signal array (e.g. JobWorkspace.EXCITEMENT) or None."""
+        path = self.get(video_id, name, touch=False)
+        return np.load(path) if path else None
+
+    def list_videos(self):
+        return [m for m in (self.meta(key) for key in sorted(os.listdir(self.root))) if m]
+
+    def session(self, video_id):
+        """
+        An open RetrievalSession for the video, kept in memory for the next
+        prompt (LRU of max_sessions). None if the video is not stored.
+        """
+        from src.text.highlight_selector import RetrievalSession
+        with self._sessions_lock:
+            if video_id in self._sessions:
+                self._sessions.move_to_end(video_id)
+                self.touch(video_id)
+                return self._sessions[video_id]
+        meta = self.meta(video_id)
+        if meta is None:
+            return None
+        self.touch(video_id)
+        entry = self.entry_dir(video_id)
+        session = RetrievalSession.from_paths(
+            os.path.join(entry, JobWorkspace.INDEX),
+            os.path.join(entry, JobWorkspace.CHUNKS),
+            meta.get("embed_model") or Config.EMBED_MODEL,
+            embeddings_path=os.path.join(entry, JobWorkspace.EMBEDDINGS),
+        )
+        with self._sessions_lock:
+            self._sessions[video_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
@@ -0,0 +1,116 @@
+import os
+import time
+import shutil
+from src.utils.config import Config
+
+
+class JobWorkspace:
+    """
+    Isolated working directory for one job.
+    Every artifact (upload, audio, chunks, index, reel) is scoped to
+    WORKSPACE_DIR/<job_id>/ so concurrent jobs never share files.
+    """
+
+    AUDIO = "audio.wav"
+    TRANSCRIPT = "transcript_segments.json"
+    CHUNKS = "chunks.json"
+    INDEX = "faiss_index.bin"
+    EMBEDDINGS = "embeddings.npy"
+    EXCITEMENT = "excitement.npy"
+    VISUAL = "visual.npy"
+    RANKED = "ranked.json"
+    OUTPUT = "highlight_reel.mp4"
+
+    # Files kept after a successful job when intermediates are dropped
+    OUTPUTS = (RANKED, OUTPUT)
+
+    def __init__(self, job_id, root=None):
+        self.job_id = job_id
+        self.root = os.path.join(root or Config.WORKSPACE_DIR, job_id)
+
+    def create(self):
+        os.makedirs(self.root, exist_ok=True)
+        return self
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def video_path(self, filename):
+        """Upload location; keeps the original extension but never the client's path."""
+        ext = os.path.splitext(os.path.basename(filename or ""))[1] or ".mp4"
+        return self.path("input" + ext.lower())
+
+    @property
+    def audio_path(self):
+        return self.path(self.AUDIO)
+
+    @property
+    def transcript_path(self):
+        return self.path(self.TRANSCRIPT)
+
+    @property
+    def chunk_path(self):
+        return self.path(self.CHUNKS)
+
+    @property
+    def index_path(self):
+        return self.path(self.INDEX)
+
+    @property
+    def embeddings_path(self):
+        return self.path(self.EMBEDDINGS)
+
+    @property
+    def excitement_path(self):
+        return self.path(self.EXCITEMENT)
+
+    @property
+    def visual_path(self):
+        return self.path(self.VISUAL)
+
+    @property
+    def ranked_path(self):
+        return self.path(self.RANKED)
+
+    @property
+    def output_path(self):
+        return self.path(self.OUTPUT)
+
+    def cleanup(self, keep_outputs=True):
+        """
+        Remove intermediates (upload, audio, index...) and keep only the
+        final reel + ranked JSON, or drop the whole workspace.
+        """
+        if not os.path.isdir(self.root):
+            return
+        if not keep_outputs:
+            shutil.rmtree(self.root, ignore_errors=True)
+            return
+        for name in os.listdir(self.root):
+            if name in self.OUTPUTS:
+                continue
+            full = self.path(name)
+            if os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+            else:
+                os.remove(full)
+
+    @staticmethod
+    def purge_expired(max_age_hours=None, root=None):
+        """Delete workspaces untouched for longer than the retention window."""
+        root = root or Config.WORKSPACE_DIR
+        if max_age_hours is None:
+            max_age_hours = Config.WORKSPACE_RETENTION_HOURS
+        if max_age_hours <= 0 or not os.path.isdir(root):
+            return []
+
+        cutoff = time.time() - max_age_hours * 3600
+        removed = []
+        for name in os.listdir(root):
+            full = os.path.join(root, name)
+            if os.path.isdir(full) and os.path.getmtime(full) < cutoff:
+                shutil.rmtree(full, ignore_errors=True)
+                removed.append(name)
+        if removed:
+            print(f"🧹 Purged {len(removed)} expired job workspaces")
+        return removed
@@ -0,0 +1,28 @@
+import os
+from src.video.ffmpeg_render import run_ffmpeg
+
+
+def concat_copy(part_paths, output_path, timescale=None):
+    """
+    Join already-encoded parts losslessly with the concat demuxer (-c copy).
+    All parts must share codec parameters (codec, resolution, pix_fmt, timebase).
+    timescale sets the mp4/mov video track timescale (e.g. the source's).
+    """
+    if not part_paths:
+        return None
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    list_path = os.path.splitext(output_path)[0] + "_concat.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in part_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-y",
+           "-f", "concat", "-safe", "0", "-i", list_path,
+           "-map", "0", "-c", "copy", "-movflags", "+faststart"]
+    if timescale and output_path.lower().endswith((".mp4", ".mov", ".m4v")):
+        cmd += ["-video_track_timescale", str(timescale)]
+    try:
+        run_ffmpeg(cmd + [output_path])
+    finally:
+        os.remove(list_path)
+    return output_path
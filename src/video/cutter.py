@@ -2,8 +2,22 @@ import os
 import json
 from moviepy.editor import VideoFileClip, concatenate_videoclips
 from src.utils.config import Config
+from src.video.ffmpeg_render import render_with_ffmpeg
+from src.video.fast_cut import render_fast_cut
+from src.video.parallel_render import render_parallel
+from src.video.selection import select_segments
+from src.video.visual_signal import snap_to_cuts
+from src.utils.intervals import (
+    as_arrays, pad as pad_intervals, clip as clip_intervals, merge as merge_intervals, reduce_groups, group_slices,
+)
 import numpy as np
 
+FFMPEG_BACKENDS = {
+    "ffmpeg": render_with_ffmpeg,
+    "copy": render_fast_cut,
+    "parallel": render_parallel,
+}
+
 def load_highlight_candidates(path="data/processed/highlight_candidates.json"):
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
@@ -39,40 +53,14 @@ def extract_clips(video_path: str, highlights, fade_duration=0.3):
     # base_video.close()
     return clips, base_video
 
-def limit_highlight_duration(segments, max_total_seconds=360.0):
+def limit_highlight_duration(segments, max_total_seconds=360.0, min_clip=1.0, allow_trim=True):
     """
-    Trim or drop segments so total duration ≈ max_total_seconds.
-    Keeps segments in ranked order.
+    Pick the highest-scoring segments that fit in max_total_seconds
+    (long clips are split into 20 s parts first; see select_segments).
+    Returns them in chronological order.
     """
-
-    if not segments:
-        return []
-
-    # Keep chronological order
-    ranked = sorted(segments, key=lambda x: x["start"])
-    selected, total = [], 0.0
-    refined = []
-    # --- 1️⃣ Split long clips only
-    for seg in ranked:
-        start, end = float(seg["start"]), float(seg["end"])
-        dur = end - start
-        if dur > 40:
-            step = 20
-            for s in np.arange(start, end, step):
-                e = min(s + step, end)
-                refined.append({"start": s, "end": e, "score": seg["score"], "text": seg["text"]})
-        else:
-            refined.append(seg)
-
-    # --- 2️⃣ Pick sequentially until max_total_seconds
-    for seg in refined:
-        dur = seg["end"] - seg["start"]
-        if total + dur <= max_total_seconds:
-            selected.append(seg)
-            total += dur
-        else:
-            break
-
+    selected = select_segments(segments, max_total_seconds, min_clip=min_clip, allow_trim=allow_trim)
+    total = sum(seg["end"] - seg["start"] for seg in selected)
     print(f"🎯 Trimmed highlight duration to {total:.1f}s (target {max_total_seconds}s, {len(selected)} segments)")
     return selected
 ################# old Code #####################
@@ -97,50 +85,64 @@ def limit_highlight_duration(segments, max_total_seconds=360.0):
     # return selected
 
 
-def pad_and_merge_segments(segments, pad=1.5, merge_gap=2.0, video_duration=None):
+def _merge_texts(texts):
+    """
+    Same text as appending each non-empty member with (text + " " + t).strip(),
+    but joined once: each append trimmed the tail of what came before it.
+    """
+    parts = [texts[0]]
+    for t in texts[1:]:
+        if not t:
+            continue
+        if t.strip():
+            parts.append(t.rstrip())
+        else:
+            parts[-1] = parts[-1].rstrip()
+    return " ".join(parts).strip() if len(texts) > 1 and any(texts[1:]) else texts[0]
+
+
+def pad_and_merge_segments(segments, pad=1.5, merge_gap=2.0, video_duration=None, cuts=None, snap=None):
     """
     Smooth segments by adding padding and merging near-adjacent ones,
     while preserving metadata fields like 'score' and 'text'.
+    With `cuts` (shot-cut timestamps), padded edges within `snap` seconds
+    of a cut move onto it so clips start and end on real shot changes.
     """
     if not segments:
         return []
 
     segs = sorted(segments, key=lambda x: x["start"])
-    merged = []
-
-    for seg in segs:
-        s = max(0, seg["start"] - pad)
-        e = seg["end"] + pad
-        if video_duration:
-            e = min(e, video_duration)
-
-        # Preserve meta
-        new_seg = {
-            "start": s,
-            "end": e,
-            "text": seg.get("text", ""),
-            "score": seg.get("score", 0.0)
-        }
-
-        if not merged:
-            merged.append(new_seg)
-        else:
-            last = merged[-1]
-            if s - last["end"] <= merge_gap:
-                # Merge: extend the last segment and keep max score/text concatenation
-                last["end"] = max(last["end"], e)
-                last["score"] = max(last.get("score", 0.0), new_seg.get("score", 0.0))
-                if seg.get("text"):
-                    last["text"] = (last.get("text", "") + " " + seg["text"]).strip()
-            else:
-                merged.append(new_seg)
+    starts, ends = as_arrays(segs)
+    starts, ends = pad_intervals(starts, ends, pad)
+    if cuts is not None and len(cuts):
+        starts, ends = snap_to_cuts(starts, cuts, snap), snap_to_cuts(ends, cuts, snap)
+    starts, ends = clip_intervals(starts, ends, None, video_duration)
+
+    # Merge clips within merge_gap of each other, keeping the max score and the joined text
+    merged_starts, merged_ends, heads = merge_intervals(starts, ends, gap=merge_gap)
+    scores = reduce_groups([seg.get("score", 0.0) for seg in segs], heads)
+    texts = [seg.get("text", "") for seg in segs]
+    merged = [{
+        "start": s,
+        "end": e,
+        "text": _merge_texts(texts[a:b]),
+        "score": sc,
+    } for (a, b), s, e, sc in zip(group_slices(heads, len(segs)), merged_starts.tolist(),
+                                  merged_ends.tolist(), scores.tolist())]
 
     print(f"🪄 Padded {len(segs)} → {len(merged)} merged segments (pad={pad}s, gap={merge_gap}s)")
     return merged
 
 
 
-def create_highlight_reel(video_path, highlights=None, highlight_file="data/processed/highlight_candidates.json"):
+def create_highlight_reel(video_path, highlights=None, highlight_file="data/processed/highlight_candidates.json",
+                          output_path=None, backend=None, video_hash=None):
+    """
+    Render the highlight reel with the configured backend:
+    "ffmpeg" (single-pass filtergraph), "copy" (keyframe-snapped stream copy,
+    no fades), "parallel" (per-segment encodes + concat, cached by video_hash)
+    or "moviepy". The ffmpeg-based modes fall back to MoviePy on error.
+    """
     if highlights is None:
         highlights = load_highlight_candidates(highlight_file)
     else:
@@ -153,6 +155,28 @@ def create_highlight_reel(video_path, highlights=None, highlight_file="data/proc
     highlights = sorted(highlights, key=lambda x: x["start"])
     print(f"🎯 Loaded {len(highlights)} highlight candidates")
 
+    if output_path is None:
+        output_path = os.path.join(Config.PROCESSED_DIR, "highlight_reel.mp4")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    backend = (backend or Config.RENDER_BACKEND).lower()
+    if backend in FFMPEG_BACKENDS:
+        try:
+            kwargs = {"video_hash": video_hash} if backend == "parallel" else {}
+            result = FFMPEG_BACKENDS[backend](video_path, highlights, output_path, **kwargs)
+            if result:
+                print(f"✅ Highlight reel created: {output_path}")
+            return result
+        except Exception as e:
+            print(f"⚠️ {backend} render failed, falling back to MoviePy: {e}")
+    elif backend != "moviepy":
+        raise ValueError(f"Unknown render backend: {backend}")
+
+    return render_with_moviepy(video_path, highlights, output_path)
+
+
+def render_with_moviepy(video_path, highlights, output_path):
+    """Original path: decode every frame through MoviePy, fade in Python, re-encode."""
     clips, base_video = extract_clips(video_path, highlights)
     if not clips:
         print("No valid highlight clips found.")
@@ -160,13 +184,14 @@ def create_highlight_reel(video_path, highlights=None, highlight_file="data/proc
     for i, clip in enumerate(clips):
         clips[i] = clip.crossfadein(0.3).crossfadeout(0.3)
     final = concatenate_videoclips(clips, method="compose")
-    output_path = os.path.join(Config.PROCESSED_DIR, "highlight_reel.mp4")
+    # Temp audio next to the output so parallel renders don't share it
+    temp_audio = os.path.splitext(output_path)[0] + "_temp-audio.m4a"
 
     final.write_videofile(
         output_path,
         codec="libx264",
         audio_codec="aac",
-        temp_audiofile="temp-audio.m4a",
+        temp_audiofile=temp_audio,
         remove_temp=True,
         threads=2,
         write_logfile=False,
@@ -0,0 +1,144 @@
+import os
+import bisect
+import shutil
+from src.utils.config import Config
+from src.video.probe import probe_video, probe_keyframes
+from src.video.ffmpeg_render import clamp_segments, run_ffmpeg
+from src.video.assembler import concat_copy
+
+# Sources whose parts we can re-encode to match the stream-copied ones
+MATCHABLE_VCODECS = ("h264",)
+MATCHABLE_ACODECS = ("aac", None)
+# ffprobe H.264 profile names -> x264 -profile:v
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+
+
+def _nearest_keyframe(keyframes, t, tolerance):
+    """Closest keyframe to t within tolerance seconds, else None."""
+    i = bisect.bisect_left(keyframes, t)
+    best = None
+    for k in keyframes[max(0, i - 1):i + 1]:
+        if abs(k - t) <= tolerance and (best is None or abs(k - t) < abs(best - t)):
+            best = k
+    return best
+
+
+def _previous_keyframe(keyframes, t):
+    i = bisect.bisect_right(keyframes, t)
+    return keyframes[i - 1] if i else 0.0
+
+
+def snap_to_keyframes(segments, keyframes, tolerance=None, force_copy=False):
+    """
+    Plan a fast cut for [(start, end)] segments.
+    A start within `tolerance` of a keyframe moves onto it and the segment is
+    stream-copied; otherwise it keeps its exact start and is re-encoded.
+    Ends snap to the nearest keyframe within tolerance too. With force_copy,
+    starts always fall back to the previous keyframe (nothing is re-encoded).
+    Returns chronological, non-overlapping [{"start", "end", "copy"}].
+    """
+    tolerance = Config.KEYFRAME_TOLERANCE if tolerance is None else tolerance
+    plan = []
+    for start, end in sorted(segments):
+        k_start = _nearest_keyframe(keyframes, start, tolerance)
+        copy = k_start is not None or force_copy
+        if k_start is None and force_copy:
+            k_start = _previous_keyframe(keyframes, start)
+        new_start = k_start if copy else start
+
+        k_end = _nearest_keyframe(keyframes, end, tolerance)
+        new_end = k_end if k_end is not None and k_end > new_start else end
+
+        if plan and new_start <= plan[-1]["end"]:
+            # Snapping made neighbours touch: extend instead of duplicating frames
+            plan[-1]["end"] = max(plan[-1]["end"], new_end)
+            plan[-1]["copy"] = plan[-1]["copy"] and copy
+            continue
+        plan.append({"start": new_start, "end": new_end, "copy": copy})
+    return plan
+
+
+def source_timescale(info):
+    """Video timebase denominator of the source (mp4 track timescale)."""
+    return str(info.get("time_base", "1/90000")).partition("/")[2] or "90000"
+
+
+def matchable(info):
+    """True when re-encoded parts can reproduce the source's codec, profile and level."""
+    return (info["vcodec"] in MATCHABLE_VCODECS and info["acodec"] in MATCHABLE_ACODECS
+            and info.get("profile") in X264_PROFILES and info.get("level", 0) > 0)
+
+
+def matched_encode_args(info):
+    """
+    x264/aac settings that reproduce the source's stream layout (profile,
+    level, pix_fmt, frame rate, audio format) so parts concat with -c copy.
+    """
+    args = [
+        "-c:v", "libx264", "-preset", Config.RENDER_PRESET, "-crf", str(Config.RENDER_CRF),
+        "-pix_fmt", info["pix_fmt"],
+        "-profile:v", X264_PROFILES[info["profile"]], "-level:v", f"{info['level'] / 10:.1f}",
+    ]
+    if info.get("fps"):
+        args += ["-r", f"{info['fps']:.6f}"]
+    if info.get("has_audio"):
+        args += ["-c:a", "aac", "-ar", str(info["sample_rate"]), "-ac", str(info["channels"])]
+    return args
+
+
+def cut_segment(video_path, start, end, out_path, copy, info):
+    """Write one part: stream copy from a keyframe, or an exact re-encode with matched parameters."""
+    # A hair past the keyframe so input seeking cannot land on the previous GOP
+    seek = start + 0.001 if copy else start
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-y",
+           "-ss", f"{seek:.3f}", "-i", video_path, "-t", f"{end - start:.3f}",
+           "-map", "0:v:0", "-map", "0:a:0?"]
+    if copy:
+        cmd += ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+    else:
+        cmd += matched_encode_args(info)
+    # MPEG-TS parts carry SPS/PPS in-band, so copied and re-encoded parts concat cleanly
+    cmd += ["-f", "mpegts", out_path]
+    run_ffmpeg(cmd)
+    return out_path
+
+
+def render_fast_cut(video_path, highlights, output_path, tolerance=None):
+    """
+    Cut the reel without fades: keyframe-aligned segments are stream-copied,
+    only segments that need a frame-accurate start are re-encoded, and the
+    parts are joined with the concat demuxer.
+    """
+    info = probe_video(video_path)
+    segments = clamp_segments(highlights, info["duration"])
+    if not segments:
+        print("No valid highlight clips found.")
+        return None
+
+    keyframes = probe_keyframes(video_path)
+    can_match = matchable(info)
+    if not can_match:
+        print(f"⚠️ {info['vcodec']} ({info.get('profile')}, level {info.get('level')})/{info['acodec']} parts "
+              f"can't be re-encoded to match; snapping every cut to a keyframe")
+    plan = snap_to_keyframes(segments, keyframes, tolerance, force_copy=not can_match)
+
+    parts_dir = os.path.splitext(output_path)[0] + "_parts"
+    os.makedirs(parts_dir, exist_ok=True)
+    try:
+        parts = []
+        for i, seg in enumerate(plan):
+            part = os.path.join(parts_dir, f"part_{i:04d}.ts")
+            parts.append(cut_segment(video_path, seg["start"], seg["end"], part, seg["copy"], info))
+        copied = sum(1 for seg in plan if seg["copy"])
+        print(f"✂️ Fast cut: {copied} stream-copied, {len(plan) - copied} re-encoded segments")
+        return concat_copy(parts, output_path, timescale=source_timescale(info))
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
@@ -0,0 +1,140 @@
+import os
+import subprocess
+from src.utils.config import Config
+from src.video.probe import probe_video
+
+# Same floor as cutter.extract_clips: shorter clips are skipped
+MIN_CLIP_SECONDS = 2.0
+
+
+def clamp_segments(highlights, video_duration=None, min_len=MIN_CLIP_SECONDS):
+    """Clamp highlights to the video and drop clips shorter than min_len. Returns [(start, end)]."""
+    segments = []
+    for h in highlights:
+        start = max(0.0, float(h["start"]))
+        end = float(h["end"])
+        if video_duration:
+            end = min(video_duration, end)
+        if end - start < min_len:
+            print(f"Skipping short segment {start:.2f}-{end:.2f}s")
+            continue
+        segments.append((start, end))
+    return segments
+
+
+def clip_fade_filters(length, fade):
+    """Fade-through-black in/out filters for one clip of `length` seconds. Returns (video, audio)."""
+    out_st = max(0.0, length - fade)
+    return (
+        f"fade=t=in:st=0:d={fade:.3f},fade=t=out:st={out_st:.3f}:d={fade:.3f}",
+        f"afade=t=in:st=0:d={fade:.3f},afade=t=out:st={out_st:.3f}:d={fade:.3f}",
+    )
+
+
+def build_filtergraph(durations, fade_duration=0.3, has_audio=True, crossfade=True, fps=None):
+    """
+    Build one filtergraph over N inputs, where input i is segment i already
+    seeked to its start (timestamps begin at 0).
+    crossfade=True chains xfade / acrossfade between consecutive clips;
+    otherwise each clip fades through black and the clips are concatenated.
+    Returns (filtergraph, video_label, audio_label or None).
+    """
+    n = len(durations)
+    fade = min(fade_duration, min(durations) / 2.0) if fade_duration > 0 else 0.0
+    use_xfade = crossfade and fade > 0 and n > 1
+    parts = []
+
+    for i, length in enumerate(durations):
+        vchain = "setpts=PTS-STARTPTS"
+        if use_xfade and fps:
+            vchain += f",fps={fps:.3f}"  # xfade needs a constant, shared frame rate
+        vchain += ",format=yuv420p,settb=AVTB"
+        achain = "asetpts=PTS-STARTPTS,aresample=async=1"
+        if fade > 0 and not use_xfade:
+            vfade, afade = clip_fade_filters(length, fade)
+            vchain += "," + vfade
+            achain += "," + afade
+        parts.append(f"[{i}:v]{vchain}[v{i}]")
+        if has_audio:
+            parts.append(f"[{i}:a]{achain}[a{i}]")
+
+    if not use_xfade:
+        inputs = "".join(f"[v{i}]" + (f"[a{i}]" if has_audio else "") for i in range(n))
+        outputs = "[vout]" + ("[aout]" if has_audio else "")
+        parts.append(f"{inputs}concat=n={n}:v=1:a={1 if has_audio else 0}{outputs}")
+        return ";".join(parts), "vout", "aout" if has_audio else None
+
+    # Chain transitions: each xfade starts `fade` seconds before the running reel ends
+    v_prev, a_prev, total = "v0", "a0", durations[0]
+    for i in range(1, n):
+        offset = total - fade
+        v_out, a_out = f"vx{i}", f"ax{i}"
+        parts.append(f"[{v_prev}][v{i}]xfade=transition=fade:duration={fade:.3f}:offset={offset:.3f}[{v_out}]")
+        if has_audio:
+            parts.append(f"[{a_prev}][a{i}]acrossfade=d={fade:.3f}[{a_out}]")
+        v_prev, a_prev = v_out, a_out
+        total = total + durations[i] - fade
+
+    # Fade in from / out to black at the reel edges, like the MoviePy path
+    out_st = max(0.0, total - fade)
+    parts.append(f"[{v_prev}]fade=t=in:st=0:d={fade:.3f},fade=t=out:st={out_st:.3f}:d={fade:.3f}[vout]")
+    if has_audio:
+        parts.append(f"[{a_prev}]afade=t=in:st=0:d={fade:.3f},afade=t=out:st={out_st:.3f}:d={fade:.3f}[aout]")
+    return ";".join(parts), "vout", "aout" if has_audio else None
+
+
+def encoder_args(threads=None, preset=None, crf=None, has_audio=True):
+    """libx264 / aac output settings shared by every ffmpeg render mode."""
+    threads = Config.RENDER_THREADS if threads is None else threads
+    args = [
+        "-c:v", "libx264",
+        "-preset", preset or Config.RENDER_PRESET,
+        "-crf", str(Config.RENDER_CRF if crf is None else crf),
+        "-pix_fmt", "yuv420p",
+    ]
+    if threads:
+        args += ["-threads", str(threads)]
+    if has_audio:
+        args += ["-c:a", "aac", "-b:a", "128k", "-ar", "44100", "-ac", "2"]
+    return args
+
+
+def run_ffmpeg(cmd):
+    """Run an ffmpeg command, raising RuntimeError with the tail of stderr on failure."""
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        tail = proc.stderr.decode("utf-8", "replace").strip().splitlines()[-5:]
+        raise RuntimeError("ffmpeg failed: " + " | ".join(tail))
+
+
+def render_with_ffmpeg(video_path, highlights, output_path, fade_duration=0.3,
+                       threads=None, preset=None, crf=None, crossfade=True):
+    """
+    Render the whole reel in one ffmpeg process: every segment is an input
+    seeked with -ss/-t (so only the selected ranges are decoded), joined by a
+    single xfade/acrossfade (or fade + concat) filtergraph and encoded once.
+    """
+    info = probe_video(video_path)
+    segments = clamp_segments(highlights, info["duration"])
+    if not segments:
+        print("No valid highlight clips found.")
+        return None
+
+    durations = [e - s for s, e in segments]
+    graph, v_label, a_label = build_filtergraph(
+        durations, fade_duration, has_audio=info["has_audio"], crossfade=crossfade, fps=info["fps"]
+    )
+
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-y"]
+    for start, end in segments:
+        cmd += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", video_path]
+    cmd += ["-filter_complex", graph, "-map", f"[{v_label}]"]
+    if a_label:
+        cmd += ["-map", f"[{a_label}]"]
+    cmd += encoder_args(threads, preset, crf, has_audio=a_label is not None)
+    cmd += ["-movflags", "+faststart", output_path]
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    print(f"🎬 ffmpeg rendering {len(segments)} segments in one pass...")
+    run_ffmpeg(cmd)
+    return output_path
@@ -0,0 +1,82 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.config import Config
+from src.utils.helpers import file_sha256
+from src.utils.artifact_cache import ArtifactCache
+from src.video.probe import probe_video
+from src.video.ffmpeg_render import clamp_segments, clip_fade_filters, encoder_args, run_ffmpeg
+from src.video.assembler import concat_copy
+
+PART_NAME = "segment.ts"
+_SEGMENT_CACHE = None
+
+
+def segment_cache():
+    global _SEGMENT_CACHE
+    if _SEGMENT_CACHE is None:
+        _SEGMENT_CACHE = ArtifactCache(Config.SEGMENT_CACHE_DIR, int(Config.SEGMENT_CACHE_GB * 1024 ** 3))
+    return _SEGMENT_CACHE
+
+
+def encode_segment(video_path, start, end, out_path, has_audio, fade_duration=0.3, threads=1):
+    """Encode one faded segment with the shared encoder settings, so every part concat-copies."""
+    length = end - start
+    fade = min(fade_duration, length / 2.0)
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-y",
+           "-ss", f"{start:.3f}", "-t", f"{length:.3f}", "-i", video_path, "-map", "0:v:0"]
+    vfade, afade = clip_fade_filters(length, fade) if fade > 0 else (None, None)
+    if vfade:
+        cmd += ["-vf", vfade]
+    if has_audio:
+        cmd += ["-map", "0:a:0"]
+        if afade:
+            cmd += ["-af", afade]
+    cmd += encoder_args(threads=threads, has_audio=has_audio)
+    cmd += ["-f", "mpegts", out_path]
+    run_ffmpeg(cmd)
+    return out_path
+
+
+def render_parallel(video_path, highlights, output_path, workers=None, fade_duration=0.3, video_hash=None):
+    """
+    Encode every highlight segment independently (one ffmpeg per segment,
+    `workers` at a time) and join the parts with a lossless concat.
+    Encoded parts are cached by source content hash + bounds + encoder
+    settings, so a later job cutting the same range reuses them.
+    """
+    info = probe_video(video_path)
+    segments = clamp_segments(highlights, info["duration"])
+    if not segments:
+        print("No valid highlight clips found.")
+        return None
+
+    workers = max(1, min(workers or Config.RENDER_WORKERS, len(segments)))
+    # Split the cores between concurrent encoders instead of oversubscribing
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    video_hash = video_hash or file_sha256(video_path)
+    cache = segment_cache()
+    settings = (Config.RENDER_PRESET, Config.RENDER_CRF, info["has_audio"], fade_duration)
+
+    parts_dir = os.path.splitext(output_path)[0] + "_parts"
+    os.makedirs(parts_dir, exist_ok=True)
+
+    def render_one(i, start, end):
+        part = os.path.join(parts_dir, f"part_{i:04d}.ts")
+        key = ArtifactCache.make_key("segment", video_hash, round(start, 3), round(end, 3), settings)
+        if cache.fetch(key, PART_NAME, part):
+            return part, True
+        encode_segment(video_path, start, end, part, info["has_audio"], fade_duration, threads)
+        cache.put_file(key, PART_NAME, part)
+        return part, False
+
+    try:
+        print(f"🎬 Rendering {len(segments)} segments with {workers} parallel encoders...")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_one, i, s, e) for i, (s, e) in enumerate(segments)]
+            results = [f.result() for f in futures]
+        reused = sum(1 for _, hit in results if hit)
+        print(f"♻️ Reused {reused}/{len(results)} cached segments")
+        return concat_copy([part for part, _ in results], output_path)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
@@ -0,0 +1,59 @@
+import subprocess
+import ffmpeg
+
+
+def probe_video(video_path: str) -> dict:
+    """
+    Read duration and stream parameters with ffprobe.
+    Returns duration, has_audio and the main video/audio codec settings.
+    """
+    info = ffmpeg.probe(video_path)
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video is None:
+        raise ValueError(f"No video stream found in {video_path}")
+
+    duration = float(info.get("format", {}).get("duration") or video.get("duration") or 0.0)
+    return {
+        "duration": duration,
+        "width": int(video.get("width", 0)),
+        "height": int(video.get("height", 0)),
+        "fps": _parse_rate(video.get("avg_frame_rate") or video.get("r_frame_rate")),
+        "pix_fmt": video.get("pix_fmt", "yuv420p"),
+        "vcodec": video.get("codec_name"),
+        "profile": video.get("profile"),
+        "level": int(video.get("level", 0) or 0),
+        "time_base": video.get("time_base", "1/90000"),
+        "has_audio": audio is not None,
+        "acodec": audio.get("codec_name") if audio else None,
+        "sample_rate": int(audio.get("sample_rate", 0)) if audio else 0,
+        "channels": int(audio.get("channels", 0)) if audio else 0,
+    }
+
+
+def _parse_rate(rate):
+    """'30000/1001' -> 29.97"""
+    try:
+        num, _, den = str(rate).partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def probe_keyframes(video_path: str) -> list:
+    """
+    Keyframe timestamps (seconds) of the first video stream.
+    Reads packet flags only, so nothing is decoded.
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path,
+    ]
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    keyframes = []
+    for line in out.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" in flags and pts not in ("", "N/A"):
+            keyframes.append(float(pts))
+    return sorted(keyframes)
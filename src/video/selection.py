@@ -0,0 +1,89 @@
+import numpy as np
+from src.utils.intervals import as_arrays, split_long
+
+SLOT_SECONDS = 0.5        # time resolution of the knapsack
+MAX_SLOTS = 4000          # coarser slots for very long budgets keep the DP table small
+
+
+def knapsack_select(values, costs, capacity, slot=SLOT_SECONDS):
+    """
+    0/1 knapsack: indices maximising sum(values) with sum(costs) <= capacity.
+    Costs are rounded up to `slot` seconds, so the picked set never exceeds the
+    budget. O(n * capacity / slot) with one vectorised row update per item;
+    deterministic (ties keep the earlier item). Returns sorted indices.
+    """
+    n = len(values)
+    values = np.asarray(values, dtype="float64")
+    slot = max(slot, capacity / MAX_SLOTS) if capacity > 0 else slot
+    weights = np.ceil(np.asarray(costs, dtype="float64") / slot - 1e-9).astype(int)
+    cap = int(capacity // slot)
+    if n == 0 or cap <= 0:
+        return []
+    best = np.zeros(cap + 1)
+    take = np.zeros((n, cap + 1), dtype=bool)
+    for i in range(n):
+        w = weights[i]
+        if w > cap:
+            continue
+        # Every capacity at once; the right-hand side still holds the previous row
+        with_item = best[:cap + 1 - w] + values[i]
+        better = with_item > best[w:] + 1e-12
+        take[i, w:] = better
+        best[w:] = np.where(better, with_item, best[w:])
+
+    picked, c = [], int(np.argmax(best))
+    for i in range(n - 1, -1, -1):
+        if take[i, c]:
+            picked.append(i)
+            c -= weights[i]
+    return sorted(picked)
+
+
+def select_segments(segments, max_total_seconds, min_clip=1.0, split_over=40.0, piece=20.0,
+                    allow_trim=True, slot=SLOT_SECONDS):
+    """
+    Highest-scoring set of segments whose total length fits max_total_seconds.
+
+    Clips over split_over seconds are first cut into `piece`-second parts and
+    parts shorter than min_clip are dropped. Each part is worth score x length
+    (so the budget goes to the best-scored airtime) and the set is chosen by
+    knapsack_select. Parts that still fit the leftover budget whole are added;
+    then, with allow_trim, leftover budget of at least min_clip is filled with
+    the start of the best remaining part. Output is chronological.
+    """
+    if not segments:
+        return []
+    starts, ends = as_arrays(segments)
+    scores = np.array([float(s.get("score", 0.0) or 0.0) for s in segments])
+    starts, ends, parent = split_long(starts, ends, split_over, piece)
+    lengths = ends - starts
+    keep = np.flatnonzero(lengths >= min_clip)
+
+    # Zero / negative scores still count a little so spare budget is used
+    values = (np.maximum(scores[parent[keep]], 0.0) + 1e-3) * lengths[keep]
+    picked = [int(keep[i]) for i in knapsack_select(values, lengths[keep], max_total_seconds, slot)]
+
+    # Slot rounding can leave out parts that fit the real leftover time: add
+    # those whole (best score first), then trim the best remaining part
+    remaining = max_total_seconds - lengths[picked].sum()
+    rest = np.setdiff1d(keep, picked)
+    rest = rest[np.argsort(-scores[parent[rest]], kind="stable")]
+    for i in rest.tolist():
+        if lengths[i] <= remaining + 1e-9:
+            picked.append(i)
+            remaining -= lengths[i]
+    if allow_trim and remaining >= min_clip:
+        rest = np.setdiff1d(rest, picked)
+        if len(rest):
+            best = int(rest[np.argmax(scores[parent[rest]])])
+            ends[best] = min(ends[best], starts[best] + remaining)
+            picked.append(best)
+
+    selected = []
+    for i in sorted(picked, key=lambda i: (starts[i], i)):
+        seg = segments[parent[i]]
+        if starts[i] == float(seg["start"]) and ends[i] == float(seg["end"]):
+            selected.append(seg)
+        else:
+            selected.append(dict(seg, start=float(starts[i]), end=float(ends[i])))
+    return selected
@@ -0,0 +1,131 @@
+import subprocess
+import numpy as np
+from src.utils.config import Config
+
+# Columns of the per-second visual signal
+MOTION, CUT, CUT_TIME = 0, 1, 2
+HIST_BINS = 32
+BLOCK_FRAMES = 256
+
+
+def _open_frames(video_path, fps, width, height):
+    """ffmpeg decoding the first video stream to downscaled grayscale raw frames on stdout."""
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "error",
+           "-i", video_path, "-map", "0:v:0", "-an",
+           "-vf", f"fps={fps},scale={width}:{height}:flags=area",
+           "-pix_fmt", "gray", "-f", "rawvideo", "pipe:1"]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def iter_frame_blocks(video_path, fps=None, width=None, height=None, block=BLOCK_FRAMES):
+    """Yield uint8 arrays of shape (n, height, width), up to `block` frames at a time."""
+    fps = fps or Config.VISUAL_FPS
+    width = width or Config.VISUAL_WIDTH
+    height = height or Config.VISUAL_HEIGHT
+    frame_bytes = width * height
+    proc = _open_frames(video_path, fps, width, height)
+    complete = False
+    try:
+        while True:
+            buf = proc.stdout.read(frame_bytes * block)
+            n = len(buf) // frame_bytes
+            if n:
+                yield np.frombuffer(buf, dtype=np.uint8, count=n * frame_bytes).reshape(n, height, width)
+            if len(buf) < frame_bytes * block:
+                break
+        complete = True
+    finally:
+        if not complete:
+            proc.kill()
+        proc.stdout.close()
+        err = proc.stderr.read().decode("utf-8", "replace").strip()
+        proc.stderr.close()
+        if proc.wait() != 0 and complete:
+            raise RuntimeError("ffmpeg video decode failed: " + " | ".join(err.splitlines()[-5:]))
+
+
+def frame_changes(frames, prev=None):
+    """
+    Change of each frame against the one before it (prev = last frame of the
+    previous block): mean absolute pixel difference in [0, 1] (motion) and
+    half the L1 distance of 32-bin gray histograms in [0, 1] (shot cuts).
+    """
+    n = len(frames)
+    flat = frames.reshape(n, -1)
+    before = np.concatenate([flat[:1] if prev is None else prev.reshape(1, -1), flat[:-1]])
+    motion = np.abs(flat.astype(np.int16) - before).mean(axis=1) / 255.0
+
+    # All histograms in one bincount: bin index offset by frame number
+    bins = (flat >> 3).astype(np.int64) + HIST_BINS * np.arange(n)[:, None]
+    hist = np.bincount(bins.ravel(), minlength=n * HIST_BINS).reshape(n, HIST_BINS) / flat.shape[1]
+    if prev is None:
+        prev_hist = hist[:1]
+    else:
+        prev_hist = np.bincount(prev.ravel() >> 3, minlength=HIST_BINS)[None, :] / flat.shape[1]
+    hist_before = np.concatenate([prev_hist, hist[:-1]])
+    cut = 0.5 * np.abs(hist - hist_before).sum(axis=1)
+    return motion, cut
+
+
+def visual_signal(video_path, fps=None):
+    """
+    Per-second visual signal, float32 array (seconds, 3):
+      MOTION   mean frame-to-frame pixel change in that second,
+      CUT      largest histogram distance between consecutive frames,
+      CUT_TIME timestamp (s) of that largest change.
+    Decodes at VISUAL_FPS / VISUAL_WIDTH x VISUAL_HEIGHT through an ffmpeg pipe.
+    """
+    fps = fps or Config.VISUAL_FPS
+    motion, cut, prev = [], [], None
+    for frames in iter_frame_blocks(video_path, fps):
+        m, c = frame_changes(frames, prev)
+        motion.append(m)
+        cut.append(c)
+        prev = frames[-1]
+    if not motion:
+        return np.zeros((0, 3), dtype=np.float32)
+    motion, cut = np.concatenate(motion), np.concatenate(cut)
+
+    times = np.arange(len(cut)) / float(fps)
+    second = times.astype(int)
+    seconds = int(second[-1]) + 1
+    counts = np.maximum(np.bincount(second, minlength=seconds), 1)
+    signal = np.zeros((seconds, 3), dtype=np.float32)
+    signal[:, MOTION] = np.bincount(second, weights=motion, minlength=seconds) / counts
+    # Strongest change per second: sort by (second, cut) and take each second's last row
+    order = np.lexsort((cut, second))
+    last = order[np.r_[np.flatnonzero(np.diff(second[order])), len(order) - 1]]
+    signal[second[last], CUT] = cut[last]
+    signal[second[last], CUT_TIME] = times[last]
+    return signal
+
+
+def shot_cuts(signal, threshold=None):
+    """Timestamps of shot cuts: seconds whose strongest histogram change reaches threshold."""
+    threshold = Config.VISUAL_CUT_THRESHOLD if threshold is None else threshold
+    if signal is None or not len(signal):
+        return np.zeros(0)
+    hit = signal[:, CUT] >= threshold
+    return np.sort(signal[hit, CUT_TIME].astype(np.float64))
+
+
+def visual_curve(signal):
+    """Per-second visual activity in [0, 1]: motion (scaled by its 95th percentile) plus cut strength."""
+    if signal is None or not len(signal):
+        return None
+    motion = signal[:, MOTION]
+    scale = np.percentile(motion, 95) or 1.0
+    return (0.7 * np.clip(motion / scale, 0.0, 1.0) + 0.3 * signal[:, CUT]).astype(np.float32)
+
+
+def snap_to_cuts(times, cuts, tolerance=None):
+    """Move each time onto the nearest shot cut within tolerance seconds (vectorised)."""
+    tolerance = Config.CUT_SNAP_SECONDS if tolerance is None else tolerance
+    times = np.asarray(times, dtype=np.float64)
+    if cuts is None or not len(cuts) or tolerance <= 0:
+        return times
+    cuts = np.asarray(cuts, dtype=np.float64)
+    i = np.searchsorted(cuts, times)
+    left, right = cuts[np.clip(i - 1, 0, len(cuts) - 1)], cuts[np.clip(i, 0, len(cuts) - 1)]
+    nearest = np.where(np.abs(times - left) <= np.abs(right - times), left, right)
+    return np.where(np.abs(nearest - times) <= tolerance, nearest, times)
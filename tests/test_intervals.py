@@ -0,0 +1,250 @@
+"""
+Randomised (seeded) property tests for src/utils/intervals.py and the
+wrappers built on it: every operation is compared with the per-segment loop
+it replaced, and the merge invariants are checked directly.
+
+    python -m pytest tests
+"""
+import io
+import contextlib
+import numpy as np
+import pytest
+from src.utils import intervals
+from src.text.candidates import CandidateTable
+
+TRIALS = 300
+
+
+def random_intervals(rng, n=None):
+    """Unsorted intervals with ties, zero-length ones and overlaps."""
+    n = int(rng.integers(0, 30)) if n is None else n
+    starts = np.where(rng.random(n) < 0.3, rng.integers(0, 60, n).astype("f8"), rng.uniform(0, 120, n))
+    lengths = rng.choice([0.0, 0.5, 1.0, 2.0], n) * (rng.random(n) < 0.4) + rng.uniform(0, 25, n) * (rng.random(n) >= 0.4)
+    return starts, starts + lengths
+
+
+def random_segments(rng, n=None):
+    starts, ends = random_intervals(rng, n)
+    texts = rng.choice(["", "a", "b c", " x ", "  ", " y", "z  "], len(starts))
+    scores = rng.choice([0.1, 0.5, 0.9], len(starts)) * (rng.random(len(starts)) < 0.5) + \
+        rng.random(len(starts)) * (rng.random(len(starts)) >= 0.5)
+    return [{"start": float(s), "end": float(e), "text": str(t), "score": float(sc)}
+            for s, e, t, sc in zip(starts, ends, texts, scores)]
+
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+# -----------------------------------------------------------
+# The loops the interval engine replaced
+# -----------------------------------------------------------
+def loop_merge(starts, ends, gap=0.0, strict=False):
+    """Sorted input; an interval joins the last group when start - group end <= gap (< with strict)."""
+    groups = []
+    for i, (s, e) in enumerate(zip(starts.tolist(), ends.tolist())):
+        if groups and (s - groups[-1][1] < gap if strict else s - groups[-1][1] <= gap):
+            groups[-1][1] = max(groups[-1][1], e)
+        else:
+            groups.append([s, e, i])
+    return groups
+
+
+def loop_clean(highlights, min_duration=1.0, merge_short=True):
+    cleaned = [{"start": float(s["start"]), "end": float(s["end"]), "text": s.get("text", ""), "score": s.get("score", 0)}
+               for s in highlights if s["end"] > s["start"] and s["end"] - s["start"] >= min_duration]
+    cleaned.sort(key=lambda x: x["start"])
+    if not cleaned or not merge_short:
+        return cleaned
+    merged = [cleaned[0]]
+    for seg in cleaned[1:]:
+        if seg["start"] - merged[-1]["end"] < 1.0:
+            merged[-1]["end"] = max(merged[-1]["end"], seg["end"])
+            merged[-1]["score"] = max(merged[-1]["score"], seg["score"])
+            merged[-1]["text"] += " " + seg.get("text", "")
+        else:
+            merged.append(seg)
+    return merged
+
+
+def loop_pad_and_merge(segments, pad=1.5, merge_gap=2.0, video_duration=None):
+    merged = []
+    for seg in sorted(segments, key=lambda x: x["start"]):
+        s = max(0, seg["start"] - pad)
+        e = seg["end"] + pad
+        if video_duration:
+            e = min(e, video_duration)
+        if merged and s - merged[-1]["end"] <= merge_gap:
+            last = merged[-1]
+            last["end"] = max(last["end"], e)
+            last["score"] = max(last["score"], seg.get("score", 0.0))
+            if seg.get("text"):
+                last["text"] = (last["text"] + " " + seg["text"]).strip()
+        else:
+            merged.append({"start": s, "end": e, "text": seg.get("text", ""), "score": seg.get("score", 0.0)})
+    return merged
+
+
+# -----------------------------------------------------------
+# Interval engine
+# -----------------------------------------------------------
+@pytest.mark.parametrize("gap,strict", [(0.0, False), (0.0, True), (1.0, True), (2.0, False)])
+def test_merge_matches_loop(gap, strict):
+    rng = np.random.default_rng(0)
+    for _ in range(TRIALS):
+        starts, ends = random_intervals(rng)
+        order = intervals.sort_order(starts)
+        starts, ends = starts[order], ends[order]
+        merged_starts, merged_ends, heads = intervals.merge(starts, ends, gap, strict)
+        expected = loop_merge(starts, ends, gap, strict)
+        assert merged_starts.tolist() == [g[0] for g in expected]
+        assert merged_ends.tolist() == [g[1] for g in expected]
+        assert heads.tolist() == [g[2] for g in expected]
+
+
+@pytest.mark.parametrize("gap", [0.0, 2.0])
+def test_merge_invariants(gap):
+    rng = np.random.default_rng(1)
+    for _ in range(TRIALS):
+        starts, ends = random_intervals(rng)
+        order = intervals.sort_order(starts)
+        starts, ends = starts[order], ends[order]
+        labels = intervals.merge_groups(starts, ends, gap)
+        merged_starts, merged_ends, heads = intervals.merge(starts, ends, gap)
+        # Labels start at 0 and grow by at most one
+        assert len(labels) == 0 or (labels[0] == 0 and set(np.diff(labels).tolist()) <= {0, 1})
+        # Sorted, and groups stay more than `gap` apart
+        assert np.all(np.diff(merged_starts) > 0)
+        assert np.all(merged_starts[1:] - merged_ends[:-1] > gap)
+        # Every input lies inside its group and groups are spanned by their members
+        assert np.all(starts >= merged_starts[labels]) and np.all(ends <= merged_ends[labels])
+        for g in range(len(heads)):
+            members = labels == g
+            assert starts[members].min() == merged_starts[g] and ends[members].max() == merged_ends[g]
+
+
+def test_reduce_groups_takes_group_maximum():
+    rng = np.random.default_rng(2)
+    for _ in range(TRIALS):
+        starts, ends = random_intervals(rng)
+        order = intervals.sort_order(starts)
+        starts, ends = starts[order], ends[order]
+        scores = rng.random(len(starts))
+        labels = intervals.merge_groups(starts, ends)
+        heads = intervals.group_heads(labels)
+        best = intervals.reduce_groups(scores, heads)
+        assert best.tolist() == [scores[labels == g].max() for g in range(len(heads))]
+        lowest = intervals.reduce_groups(scores, heads, np.minimum)
+        assert lowest.tolist() == [scores[labels == g].min() for g in range(len(heads))]
+
+
+def test_sort_order_is_stable():
+    starts = np.array([3.0, 1.0, 3.0, 1.0, 2.0])
+    assert intervals.sort_order(starts).tolist() == [1, 3, 4, 0, 2]
+
+
+def test_pad_and_clip():
+    rng = np.random.default_rng(3)
+    for _ in range(TRIALS):
+        starts, ends = random_intervals(rng)
+        before, after = rng.uniform(0, 3, 2)
+        hi = float(rng.choice([0.0, 50.0, 200.0]))   # 0 = no upper bound, as with video_duration=None
+        padded_starts, padded_ends = intervals.pad(starts, ends, before, after, hi=hi or None)
+        assert padded_starts.tolist() == [max(0.0, s - before) for s in starts]
+        assert padded_ends.tolist() == [min(e + after, hi) if hi else e + after for e in ends]
+        clipped_starts, clipped_ends = intervals.clip(starts - 5, ends, lo=None, hi=hi)
+        assert np.array_equal(clipped_starts, starts - 5)
+        assert np.all(clipped_ends <= (hi if hi else np.inf))
+
+
+def test_split_long_partitions_each_interval():
+    rng = np.random.default_rng(4)
+    for _ in range(TRIALS):
+        starts, ends = random_intervals(rng)
+        ends = ends + rng.uniform(0, 90, len(ends)) * (rng.random(len(ends)) < 0.3)
+        new_starts, new_ends, parent = intervals.split_long(starts, ends, split_over=40.0, piece=20.0)
+        assert np.all(np.diff(parent) >= 0)
+        for i in range(len(starts)):
+            parts = parent == i
+            assert parts.any()
+            if ends[i] - starts[i] <= 40.0:
+                assert parts.sum() == 1
+                assert (new_starts[parts][0], new_ends[parts][0]) == (starts[i], ends[i])
+                continue
+            # Contiguous pieces of at most 20 s covering exactly the source
+            s, e = new_starts[parts], new_ends[parts]
+            assert s[0] == starts[i] and e[-1] == ends[i]
+            assert np.allclose(s[1:], e[:-1])
+            assert np.all(e - s <= 20.0 + 1e-9) and np.all(e - s > 0)
+
+
+def test_join_groups():
+    texts = ["a", "b", "c", "d"]
+    heads = np.array([0, 1, 3])
+    assert intervals.group_slices(heads, 4) == [(0, 1), (1, 3), (3, 4)]
+    assert intervals.join_groups(texts, heads) == ["a", "b c", "d"]
+    assert intervals.join_groups([], np.zeros(0, dtype=int)) == []
+
+
+# -----------------------------------------------------------
+# Wrappers: same output as the loops they replaced
+# -----------------------------------------------------------
+def test_candidate_table_merge_overlaps_matches_loop():
+    rng = np.random.default_rng(5)
+    for _ in range(TRIALS):
+        starts, ends = random_intervals(rng, int(rng.integers(1, 30)))
+        table = CandidateTable.empty(len(starts), [{"text": f"chunk {i}"} for i in range(len(starts))])
+        table.rows["start"], table.rows["end"] = starts, ends
+        table.rows["chunk_id"] = np.arange(len(starts))
+        table.rows["similarity"] = table.rows["score"] = rng.random(len(starts))
+        table.rows["keyword"] = rng.random(len(starts))
+
+        rows = sorted(table.to_dicts(), key=lambda r: r["start"])
+        keyword = table.rows["keyword"]
+        expected = []
+        for r in rows:
+            if expected and r["start"] <= expected[-1]["end"]:
+                last = expected[-1]
+                last["end"] = max(last["end"], r["end"])
+                last["score"] = max(last["score"], r["score"])
+                last["keyword"] = max(last["keyword"], keyword[r["chunk_id"]])
+            else:
+                expected.append(dict(r, keyword=keyword[r["chunk_id"]]))
+
+        merged = table.merge_overlaps().rows
+        assert merged["chunk_id"].tolist() == [r["chunk_id"] for r in expected]
+        assert merged["end"].tolist() == [r["end"] for r in expected]
+        assert merged["score"].tolist() == [r["score"] for r in expected]
+        assert merged["keyword"].tolist() == [r["keyword"] for r in expected]
+
+
+@pytest.mark.parametrize("merge_short", [True, False])
+def test_clean_segments_matches_loop(merge_short):
+    clean_segments = pytest.importorskip("src.text.highlight_selector").clean_segments
+    rng = np.random.default_rng(6)
+    for _ in range(TRIALS):
+        segments = random_segments(rng)
+        result = quiet(clean_segments, [dict(s) for s in segments], merge_short=merge_short)
+        assert result == loop_clean([dict(s) for s in segments], merge_short=merge_short)
+        # Invariants: chronological, and with merging no two clips closer than 1 s
+        assert all(a["start"] <= b["start"] for a, b in zip(result, result[1:]))
+        if merge_short:
+            assert all(b["start"] - a["end"] >= 1.0 for a, b in zip(result, result[1:]))
+
+
+@pytest.mark.parametrize("video_duration", [None, 150.0])
+def test_pad_and_merge_segments_matches_loop(video_duration):
+    pad_and_merge_segments = pytest.importorskip("src.video.cutter").pad_and_merge_segments
+    rng = np.random.default_rng(7)
+    for _ in range(TRIALS):
+        segments = random_segments(rng, int(rng.integers(1, 30)))
+        result = quiet(pad_and_merge_segments, [dict(s) for s in segments], video_duration=video_duration)
+        assert result == loop_pad_and_merge([dict(s) for s in segments], video_duration=video_duration)
+        # Invariants: merged clips over 2 s apart, best score kept, every padded input inside one clip
+        assert all(b["start"] - a["end"] > 2.0 for a, b in zip(result, result[1:]))
+        assert max(r["score"] for r in result) == max(s["score"] for s in segments)
+        if video_duration is None:
+            for s in segments:
+                start, end = max(0.0, s["start"] - 1.5), s["end"] + 1.5
+                assert any(r["start"] <= start and end <= r["end"] for r in result)
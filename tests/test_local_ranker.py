@@ -0,0 +1,26 @@
+"""
+Feature scaling in src/text/local_ranker.py.
+
+    python -m pytest tests
+"""
+import numpy as np
+from src.text import local_ranker
+
+
+def novelty(results):
+    return local_ranker.score_candidates(results, weights={"novelty": 1.0})
+
+
+def test_novelty_stays_in_unit_range_with_fewer_results_than_picks():
+    # 15 MMR picks, but merging / candidates[:12] left 4 clips with late ranks
+    results = [{"start": 10.0 * i, "end": 10.0 * i + 5, "text": "x", "score": 0.5, "mmr_rank": rank}
+               for i, rank in enumerate([14, 3, 11, 0])]
+    values = novelty(results)
+    assert np.all((values >= 0) & (values <= 1))
+    # Earlier picks keep more novelty
+    assert values.argsort().tolist() == [0, 2, 1, 3]
+
+
+def test_novelty_without_ranks_is_full():
+    results = [{"start": 0.0, "end": 5.0, "score": 0.1}, {"start": 9.0, "end": 12.0, "score": 0.9}]
+    assert novelty(results).tolist() == [1.0, 1.0]